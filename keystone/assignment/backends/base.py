@@ -101,15 +101,38 @@ class AssignmentDriverBase(object):
     def list_role_assignments(self, role_id=None,
                               user_id=None, group_ids=None,
                               domain_id=None, project_ids=None,
-                              inherited_to_projects=None):
+                              inherited_to_projects=None, role_ids=None):
         """Return a list of role assignments for actors on targets.
 
         Available parameters represent values in which the returned role
-        assignments attributes need to be filtered on.
+        assignments attributes need to be filtered on. If role_ids is not
+        None, the assignments of any of those roles are returned, and role_id
+        is ignored.
 
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_role_assignments_matching_any(self, filters):
+        """Return the role assignments matching any of several sets of filters.
+
+        Drivers that can list role assignments matching several sets of
+        filters at once, rather than by repeated calls to
+        :meth:`list_role_assignments`, should override this.
+
+        :param list filters: Dictionaries of the keyword arguments of
+                             :meth:`list_role_assignments`. The sets of
+                             filters are expected to match distinct
+                             assignments.
+
+        :returns: the role assignments, in no particular order.
+        :rtype: list of dict
+
+        """
+        refs = []
+        for kwargs in filters:
+            refs += self.list_role_assignments(**kwargs)
+        return refs
+
     @abc.abstractmethod
     def delete_project_assignments(self, project_id):
         """Delete all assignments for a project.
@@ -12,6 +12,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import sqlalchemy
+
 from keystone.assignment.backends import base
 from keystone.common import sql
 from keystone import exception
@@ -190,64 +192,100 @@ class Assignment(base.AssignmentDriverBase):
 
         return actor_types or target_types
 
+    def _role_assignment_conditions(self, role_id=None, user_id=None,
+                                    group_ids=None, domain_id=None,
+                                    project_ids=None,
+                                    inherited_to_projects=None,
+                                    role_ids=None):
+        """Return the conditions role assignments must meet for a query."""
+        assignment_types = self._get_assignment_types(
+            user_id, group_ids, project_ids, domain_id)
+
+        targets = None
+        if project_ids:
+            targets = project_ids
+        elif domain_id:
+            targets = [domain_id]
+
+        actors = None
+        if group_ids:
+            actors = group_ids
+        elif user_id:
+            actors = [user_id]
+
+        conditions = []
+        if role_ids is not None:
+            conditions.append(RoleAssignment.role_id.in_(role_ids))
+        elif role_id:
+            conditions.append(RoleAssignment.role_id == role_id)
+        if actors:
+            conditions.append(RoleAssignment.actor_id.in_(actors))
+        if targets:
+            conditions.append(RoleAssignment.target_id.in_(targets))
+        if assignment_types:
+            conditions.append(RoleAssignment.type.in_(assignment_types))
+        if inherited_to_projects is not None:
+            conditions.append(
+                RoleAssignment.inherited == inherited_to_projects)
+        return conditions
+
+    @staticmethod
+    def _denormalize_role_assignment(ref):
+        assignment = {}
+        if ref.type == AssignmentType.USER_PROJECT:
+            assignment['user_id'] = ref.actor_id
+            assignment['project_id'] = ref.target_id
+        elif ref.type == AssignmentType.USER_DOMAIN:
+            assignment['user_id'] = ref.actor_id
+            assignment['domain_id'] = ref.target_id
+        elif ref.type == AssignmentType.GROUP_PROJECT:
+            assignment['group_id'] = ref.actor_id
+            assignment['project_id'] = ref.target_id
+        elif ref.type == AssignmentType.GROUP_DOMAIN:
+            assignment['group_id'] = ref.actor_id
+            assignment['domain_id'] = ref.target_id
+        else:
+            raise exception.Error(message=_(
+                'Unexpected assignment type encountered, %s') %
+                ref.type)
+        assignment['role_id'] = ref.role_id
+        if ref.inherited:
+            assignment['inherited_to_projects'] = 'projects'
+        return assignment
+
     def list_role_assignments(self, role_id=None,
                               user_id=None, group_ids=None,
                               domain_id=None, project_ids=None,
-                              inherited_to_projects=None):
-
-        def denormalize_role(ref):
-            assignment = {}
-            if ref.type == AssignmentType.USER_PROJECT:
-                assignment['user_id'] = ref.actor_id
-                assignment['project_id'] = ref.target_id
-            elif ref.type == AssignmentType.USER_DOMAIN:
-                assignment['user_id'] = ref.actor_id
-                assignment['domain_id'] = ref.target_id
-            elif ref.type == AssignmentType.GROUP_PROJECT:
-                assignment['group_id'] = ref.actor_id
-                assignment['project_id'] = ref.target_id
-            elif ref.type == AssignmentType.GROUP_DOMAIN:
-                assignment['group_id'] = ref.actor_id
-                assignment['domain_id'] = ref.target_id
-            else:
-                raise exception.Error(message=_(
-                    'Unexpected assignment type encountered, %s') %
-                    ref.type)
-            assignment['role_id'] = ref.role_id
-            if ref.inherited:
-                assignment['inherited_to_projects'] = 'projects'
-            return assignment
-
+                              inherited_to_projects=None, role_ids=None):
         with sql.session_for_read() as session:
-            assignment_types = self._get_assignment_types(
-                user_id, group_ids, project_ids, domain_id)
-
-            targets = None
-            if project_ids:
-                targets = project_ids
-            elif domain_id:
-                targets = [domain_id]
-
-            actors = None
-            if group_ids:
-                actors = group_ids
-            elif user_id:
-                actors = [user_id]
-
             query = session.query(RoleAssignment)
-
-            if role_id:
-                query = query.filter_by(role_id=role_id)
-            if actors:
-                query = query.filter(RoleAssignment.actor_id.in_(actors))
-            if targets:
-                query = query.filter(RoleAssignment.target_id.in_(targets))
-            if assignment_types:
-                query = query.filter(RoleAssignment.type.in_(assignment_types))
-            if inherited_to_projects is not None:
-                query = query.filter_by(inherited=inherited_to_projects)
-
-            return [denormalize_role(ref) for ref in query.all()]
+            conditions = self._role_assignment_conditions(
+                role_id=role_id, user_id=user_id, group_ids=group_ids,
+                domain_id=domain_id, project_ids=project_ids,
+                inherited_to_projects=inherited_to_projects,
+                role_ids=role_ids)
+            if conditions:
+                query = query.filter(sqlalchemy.and_(*conditions))
+            return [self._denormalize_role_assignment(ref)
+                    for ref in query.all()]
+
+    def list_role_assignments_matching_any(self, filters):
+        if not filters:
+            return []
+        clauses = []
+        for kwargs in filters:
+            conditions = self._role_assignment_conditions(**kwargs)
+            if not conditions:
+                # NOTE: These filters match every assignment.
+                clauses = None
+                break
+            clauses.append(sqlalchemy.and_(*conditions))
+        with sql.session_for_read() as session:
+            query = session.query(RoleAssignment)
+            if clauses:
+                query = query.filter(sqlalchemy.or_(*clauses))
+            return [self._denormalize_role_assignment(ref)
+                    for ref in query.all()]
 
     def delete_project_assignments(self, project_id):
         with sql.session_for_write() as session:
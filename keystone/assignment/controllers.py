@@ -24,6 +24,7 @@ from six.moves import urllib
 from keystone.assignment import schema
 from keystone.common import controller
 from keystone.common import dependency
+from keystone.common import driver_hints
 from keystone.common import utils
 from keystone.common import validation
 from keystone.common import wsgi
@@ -705,6 +706,40 @@ class RoleAssignmentV3(controller.V3Controller):
         # the wrapper as have already included the links in the entities
         pass
 
+    @classmethod
+    def pagination_key(cls, ref):
+        # Role assignments have no ID, but the links uniquely identify each
+        # one, so use them to build an opaque key to paginate by. Compact
+        # listings have no links, in which case the actor, target and role
+        # identify each assignment instead.
+        links = ref.get('links')
+        if links:
+            return '|'.join([links['assignment'],
+                             links.get('membership', ''),
+                             links.get('prior_role', '')])
+        return cls._compact_key(ref)
+
+    @staticmethod
+    def _compact_key(ref):
+        actor = ref.get('user') or ref['group']
+        scope = ref['scope']
+        target = scope.get('project') or scope['domain']
+        return '|'.join(['user' if 'user' in ref else 'group', actor['id'],
+                         'project' if 'project' in scope else 'domain',
+                         target['id'], ref['role']['id'],
+                         scope.get('OS-INHERIT:inherited_to', '')])
+
+    def _compact(self, formatted_refs):
+        """Strip the links from assignments.
+
+        The assignment manager has already collapsed the assignments reaching
+        an actor in more than one way, which the links would tell apart.
+
+        """
+        for ref in formatted_refs:
+            ref.pop('links', None)
+        return formatted_refs
+
     def _format_entity(self, context, entity):
         """Format an assignment entity for API response.
 
@@ -912,6 +947,8 @@ class RoleAssignmentV3(controller.V3Controller):
             self.query_filter_is_true(params['effective']))
         include_names = ('include_names' in params and
                          self.query_filter_is_true(params['include_names']))
+        compact = ('compact' in params and
+                   self.query_filter_is_true(params['compact']))
 
         if 'scope.OS-INHERIT:inherited_to' in params:
             inherited = (
@@ -939,12 +976,19 @@ class RoleAssignmentV3(controller.V3Controller):
             project_id=params.get('scope.project.id'),
             include_subtree=include_subtree,
             inherited=inherited, effective=effective,
-            include_names=include_names)
+            include_names=include_names, compact=compact)
 
         formatted_refs = [self._format_entity(request.context_dict, ref)
                           for ref in refs]
-
-        return self.wrap_collection(request.context_dict, formatted_refs)
+        if compact:
+            formatted_refs = self._compact(formatted_refs)
+
+        # Only the pagination directives are taken from the query, since the
+        # filters have already been applied by the assignment manager.
+        hints = driver_hints.Hints()
+        self._set_pagination_in_hints(hints, dict(params))
+        return self.wrap_collection(request.context_dict, formatted_refs,
+                                    hints=hints)
 
     @controller.filterprotected('group.id', 'role.id',
                                 'scope.domain.id', 'scope.project.id',
@@ -14,6 +14,7 @@
 
 """Main entry point into the Assignment service."""
 
+import collections
 import copy
 import functools
 
@@ -679,6 +680,21 @@ class Manager(manager.Manager):
                 filter_results.append(ref)
         return filter_results
 
+    def _collapse_role_assignments(self, role_refs):
+        """Drop how each role assignment was obtained, then any duplicates.
+
+        In effective mode the same role on the same target can reach an actor
+        in more than one way, for instance via a direct assignment and via
+        group membership. Without their indirect details these are identical,
+        so only one of them is kept.
+
+        """
+        collapsed = collections.OrderedDict()
+        for ref in role_refs:
+            ref.pop('indirect', None)
+            collapsed.setdefault(tuple(sorted(ref.items())), ref)
+        return list(collapsed.values())
+
     def _strip_domain_roles(self, role_refs):
         """Post process assignment list for domain roles.
 
@@ -687,20 +703,48 @@ class Manager(manager.Manager):
         remove any assignments that include a domain role.
 
         """
-        def _role_is_global(role_id):
-            ref = self.role_api.get_role(role_id)
-            return (ref['domain_id'] is None)
+        role_ids = set(ref['role_id'] for ref in role_refs)
+        if not role_ids:
+            return []
+        global_role_ids = set(
+            role['id'] for role in self.role_api.list_roles_from_ids(
+                list(role_ids))
+            if role.get('domain_id') is None)
+        return [ref for ref in role_refs
+                if ref['role_id'] in global_role_ids]
 
-        filter_results = []
-        for ref in role_refs:
-            if _role_is_global(ref['role_id']):
-                filter_results.append(ref)
-        return filter_results
+    def _list_prior_role_ids(self, role_id):
+        """List the roles that could result in an assignment of a role.
+
+        This is the role itself, plus any roles that imply it, either directly
+        or through a chain of inference rules.
+
+        """
+        if not CONF.token.infer_roles:
+            return [role_id]
+        try:
+            rules = self.role_api.list_role_inference_rules()
+        except exception.NotImplemented:
+            return [role_id]
+
+        priors_by_implied = {}
+        for rule in rules:
+            priors_by_implied.setdefault(
+                rule['implied_role_id'], []).append(rule['prior_role_id'])
+
+        role_ids = [role_id]
+        to_check = [role_id]
+        while to_check:
+            for prior_role_id in priors_by_implied.get(to_check.pop(), []):
+                if prior_role_id not in role_ids:
+                    role_ids.append(prior_role_id)
+                    to_check.append(prior_role_id)
+        return role_ids
 
     def _list_effective_role_assignments(self, role_id, user_id, group_id,
                                          domain_id, project_id, subtree_ids,
                                          inherited, source_from_group_ids,
-                                         strip_domain_roles):
+                                         strip_domain_roles, compact=False):
         """List role assignments in effective mode.
 
         When using effective mode, besides the direct assignments, the indirect
@@ -719,16 +763,16 @@ class Manager(manager.Manager):
         specified, hence avoiding retrieving a huge list.
 
         """
-        def list_role_assignments_for_actor(
-                role_id, inherited, user_id=None, group_ids=None,
+        def filters_for_actor(
+                role_ids, inherited, user_id=None, group_ids=None,
                 project_id=None, subtree_ids=None, domain_id=None):
-            """List role assignments for actor on target.
+            """Build the filters of role assignments for actor on target.
 
-            List direct and indirect assignments for an actor, optionally
-            for a given target (i.e. projects or domain).
+            The filters select direct and indirect assignments for an actor,
+            optionally for a given target (i.e. projects or domain).
 
-            :param role_id: List for a specific role, can be None meaning all
-                            roles
+            :param role_ids: List for a specific set of roles, can be None
+                             meaning all roles
             :param inherited: Indicates whether inherited assignments or only
                               direct assignments are required.  If None, then
                               both are required.
@@ -751,11 +795,16 @@ class Manager(manager.Manager):
                               that affect this domain - by definition this will
                               not include any inherited assignments
 
-            :returns: List of assignments matching the criteria. Any inherited
-                      or group assignments that could affect the resulting
-                      response are included.
+            :returns: List of the keyword arguments of the driver's
+                      list_role_assignments(), each selecting distinct
+                      assignments. Together they select any inherited or
+                      group assignments that could affect the resulting
+                      response.
 
             """
+            actor = dict(role_ids=role_ids, user_id=user_id,
+                         group_ids=group_ids)
+
             project_ids_of_interest = None
             if project_id:
                 if subtree_ids:
@@ -763,18 +812,21 @@ class Manager(manager.Manager):
                 else:
                     project_ids_of_interest = [project_id]
 
-            # List direct project role assignments
-            non_inherited_refs = []
+            if inherited is None and not project_id and not domain_id:
+                # Neither direct nor inherited assignments are filtered by
+                # target, so they are selected by the same filters.
+                return [dict(actor)]
+
+            filters = []
             if inherited is False or inherited is None:
-                # Get non inherited assignments
-                non_inherited_refs = self.driver.list_role_assignments(
-                    role_id=role_id, domain_id=domain_id,
-                    project_ids=project_ids_of_interest, user_id=user_id,
-                    group_ids=group_ids, inherited_to_projects=False)
+                # Non inherited assignments
+                filters.append(dict(
+                    actor, domain_id=domain_id,
+                    project_ids=project_ids_of_interest,
+                    inherited_to_projects=False))
 
-            inherited_refs = []
             if inherited is True or inherited is None:
-                # Get inherited assignments
+                # Inherited assignments
                 if project_id:
                     # The project and any subtree are guaranteed to be owned by
                     # the same domain, so since we are filtering by these
@@ -782,13 +834,12 @@ class Manager(manager.Manager):
                     # assignments from their common domain or from any of
                     # their parents projects.
 
-                    # List inherited assignments from the project's domain
+                    # Inherited assignments from the project's domain
                     proj_domain_id = self.resource_api.get_project(
                         project_id)['domain_id']
-                    inherited_refs += self.driver.list_role_assignments(
-                        role_id=role_id, domain_id=proj_domain_id,
-                        user_id=user_id, group_ids=group_ids,
-                        inherited_to_projects=True)
+                    filters.append(dict(
+                        actor, domain_id=proj_domain_id,
+                        inherited_to_projects=True))
 
                     # For inherited assignments from projects, since we know
                     # they are from the same tree the only places these can
@@ -800,17 +851,14 @@ class Manager(manager.Manager):
                     if subtree_ids:
                         source_ids += project_ids_of_interest
                     if source_ids:
-                        inherited_refs += self.driver.list_role_assignments(
-                            role_id=role_id, project_ids=source_ids,
-                            user_id=user_id, group_ids=group_ids,
-                            inherited_to_projects=True)
+                        filters.append(dict(
+                            actor, project_ids=source_ids,
+                            inherited_to_projects=True))
                 else:
-                    # List inherited assignments without filtering by target
-                    inherited_refs = self.driver.list_role_assignments(
-                        role_id=role_id, user_id=user_id, group_ids=group_ids,
-                        inherited_to_projects=True)
+                    # Inherited assignments without filtering by target
+                    filters.append(dict(actor, inherited_to_projects=True))
 
-            return non_inherited_refs + inherited_refs
+            return filters
 
         # If filtering by group or inherited domain assignment the list is
         # guaranteed to be empty
@@ -828,35 +876,51 @@ class Manager(manager.Manager):
         # relevant, since domains don't inherit assignments
         inherited = False if domain_id else inherited
 
-        # List user or explicit group assignments.
-        # Due to the need to expand implied roles, this call will skip
-        # filtering by role_id and instead return the whole set of roles.
-        # Matching on the specified role is performed at the end.
-        direct_refs = list_role_assignments_for_actor(
-            role_id=None, user_id=user_id, group_ids=source_from_group_ids,
-            project_id=project_id, subtree_ids=subtree_ids,
-            domain_id=domain_id, inherited=inherited)
+        # Due to the need to expand implied roles, we can't simply ask the
+        # driver for assignments of the specified role. Instead we ask for
+        # assignments of that role and of any role that implies it, and the
+        # exact matching on the specified role is performed at the end.
+        role_ids = None
+        if role_id:
+            role_ids = self._list_prior_role_ids(role_id)
+
+        # Filters of user or explicit group assignments.
+        filters = filters_for_actor(
+            role_ids=role_ids, user_id=user_id,
+            group_ids=source_from_group_ids, project_id=project_id,
+            subtree_ids=subtree_ids, domain_id=domain_id, inherited=inherited)
 
         # And those from the user's groups, so long as we are not restricting
         # to a set of source groups (in which case we already got those
         # assignments in the direct listing above).
-        group_refs = []
         if not source_from_group_ids and user_id:
             group_ids = self._get_group_ids_for_user_id(user_id)
             if group_ids:
-                group_refs = list_role_assignments_for_actor(
-                    role_id=None, project_id=project_id,
+                filters += filters_for_actor(
+                    role_ids=role_ids, project_id=project_id,
                     subtree_ids=subtree_ids, group_ids=group_ids,
                     domain_id=domain_id, inherited=inherited)
 
+        # All of them are listed with a single call to the driver, which the
+        # SQL driver turns into a single query.
+        assignment_refs = self.driver.list_role_assignments_matching_any(
+            filters)
+
         # Expand grouping and inheritance on retrieved role assignments
         refs = []
         expand_groups = (source_from_group_ids is None)
-        for ref in (direct_refs + group_refs):
+        for ref in assignment_refs:
             refs += self._expand_indirect_assignment(
                 ref, user_id, project_id, subtree_ids, expand_groups)
 
+        # In compact mode, the assignments reaching an actor in several ways
+        # are collapsed before, as well as after, their implied roles are
+        # expanded, so that the implied roles of each are only expanded once.
+        if compact:
+            refs = self._collapse_role_assignments(refs)
         refs = self.add_implied_roles(refs)
+        if compact:
+            refs = self._collapse_role_assignments(refs)
         if strip_domain_roles:
             refs = self._strip_domain_roles(refs)
         if role_id:
@@ -892,7 +956,7 @@ class Manager(manager.Manager):
                               include_subtree=False, inherited=None,
                               effective=None, include_names=False,
                               source_from_group_ids=None,
-                              strip_domain_roles=True):
+                              strip_domain_roles=True, compact=False):
         """List role assignments, honoring effective mode and provided filters.
 
         Returns a list of role assignments, where their attributes match the
@@ -930,6 +994,12 @@ class Manager(manager.Manager):
         which is useful for internal calls like trusts which need to examine
         the full set of roles.
 
+        In effective mode, compact=True drops the details of how each
+        assignment was obtained (the indirect dict), and the assignments which
+        are then identical. Those are collapsed as soon as group membership
+        and inheritance are expanded, so that implied roles, domain role
+        stripping and names are only processed once for each of them.
+
         If OS-INHERIT extension is disabled or the used driver does not support
         inherited roles retrieval, inherited role assignments will be ignored.
 
@@ -949,7 +1019,7 @@ class Manager(manager.Manager):
             role_assignments = self._list_effective_role_assignments(
                 role_id, user_id, group_id, domain_id, project_id,
                 subtree_ids, inherited, source_from_group_ids,
-                strip_domain_roles)
+                strip_domain_roles, compact)
         else:
             role_assignments = self._list_direct_role_assignments(
                 role_id, user_id, group_id, domain_id, project_id,
@@ -960,41 +1030,95 @@ class Manager(manager.Manager):
         return role_assignments
 
     def _get_names_from_role_assignments(self, role_assignments):
-        role_assign_list = []
+        """Add the names of the entities to a list of role assignments.
+
+        The entities are read in bulk, with one lookup per entity type,
+        rather than one per assignment.
+
+        """
+        def list_from_ids(list_func, id_set):
+            if not id_set:
+                return {}
+            return dict((ref['id'], ref) for ref in list_func(list(id_set)))
+
+        def get_from_index(index, id_, not_found):
+            try:
+                return index[id_]
+            except KeyError:
+                raise not_found(id_)
+
+        ids = {'user_id': set(), 'group_id': set(), 'project_id': set(),
+               'domain_id': set(), 'role_id': set()}
+        for role_asgmt in role_assignments:
+            for id_type, id_set in ids.items():
+                if id_type in role_asgmt:
+                    id_set.add(role_asgmt[id_type])
 
+        users = list_from_ids(
+            self.identity_api.list_users_from_ids, ids['user_id'])
+        groups = list_from_ids(
+            self.identity_api.list_groups_from_ids, ids['group_id'])
+        projects = list_from_ids(
+            self.resource_api.list_projects_from_ids, ids['project_id'])
+        roles = list_from_ids(
+            self.role_api.list_roles_from_ids, ids['role_id'])
+
+        domain_ids = set(ids['domain_id'])
+        for index in (users, groups, projects):
+            domain_ids.update(ref['domain_id'] for ref in index.values())
+        domains = list_from_ids(
+            self.resource_api.list_domains_from_ids, domain_ids)
+
+        def user_not_found(id_):
+            return exception.UserNotFound(user_id=id_)
+
+        def group_not_found(id_):
+            return exception.GroupNotFound(group_id=id_)
+
+        def project_not_found(id_):
+            return exception.ProjectNotFound(project_id=id_)
+
+        def domain_not_found(id_):
+            return exception.DomainNotFound(domain_id=id_)
+
+        def role_not_found(id_):
+            return exception.RoleNotFound(role_id=id_)
+
+        def domain_name(domain_id):
+            return get_from_index(domains, domain_id, domain_not_found)['name']
+
+        role_assign_list = []
         for role_asgmt in role_assignments:
             new_assign = {}
             for id_type, id_ in role_asgmt.items():
                 if id_type == 'domain_id':
-                    _domain = self.resource_api.get_domain(id_)
+                    _domain = get_from_index(domains, id_, domain_not_found)
                     new_assign['domain_id'] = _domain['id']
                     new_assign['domain_name'] = _domain['name']
                 elif id_type == 'user_id':
-                    _user = self.identity_api.get_user(id_)
+                    _user = get_from_index(users, id_, user_not_found)
                     new_assign['user_id'] = _user['id']
                     new_assign['user_name'] = _user['name']
                     new_assign['user_domain_id'] = _user['domain_id']
                     new_assign['user_domain_name'] = (
-                        self.resource_api.get_domain(_user['domain_id'])
-                        ['name'])
+                        domain_name(_user['domain_id']))
                 elif id_type == 'group_id':
-                    _group = self.identity_api.get_group(id_)
+                    _group = get_from_index(groups, id_, group_not_found)
                     new_assign['group_id'] = _group['id']
                     new_assign['group_name'] = _group['name']
                     new_assign['group_domain_id'] = _group['domain_id']
                     new_assign['group_domain_name'] = (
-                        self.resource_api.get_domain(_group['domain_id'])
-                        ['name'])
+                        domain_name(_group['domain_id']))
                 elif id_type == 'project_id':
-                    _project = self.resource_api.get_project(id_)
+                    _project = get_from_index(projects, id_,
+                                              project_not_found)
                     new_assign['project_id'] = _project['id']
                     new_assign['project_name'] = _project['name']
                     new_assign['project_domain_id'] = _project['domain_id']
                     new_assign['project_domain_name'] = (
-                        self.resource_api.get_domain(_project['domain_id'])
-                        ['name'])
+                        domain_name(_project['domain_id']))
                 elif id_type == 'role_id':
-                    _role = self.role_api.get_role(id_)
+                    _role = get_from_index(roles, id_, role_not_found)
                     new_assign['role_id'] = _role['id']
                     new_assign['role_name'] = _role['name']
             role_assign_list.append(new_assign)
@@ -22,9 +22,11 @@ from oslo_utils import importutils
 import six
 import stevedore
 
+from keystone.auth import schema
 from keystone.common import controller
 from keystone.common import dependency
 from keystone.common import utils
+from keystone.common import validation
 from keystone.common import wsgi
 import keystone.conf
 from keystone import exception
@@ -556,11 +558,39 @@ class Auth(controller.V3Controller):
         token_id = request.context_dict.get('subject_token_id')
         include_catalog = 'nocatalog' not in request.params
         token_data = self.token_provider_api.validate_v3_token(
-            token_id)
+            token_id, minimal='minimal' in request.params)
         if not include_catalog and 'catalog' in token_data['token']:
-            del token_data['token']['catalog']
+            # NOTE: The token data may be cached, don't modify it.
+            token = dict(token_data['token'])
+            del token['catalog']
+            token_data = {'token': token}
         return render_token_data_response(token_id, token_data)
 
+    @controller.protected()
+    def validate_tokens(self, request, tokens):
+        validation.lazy_validate(schema.token_validate_batch, tokens)
+        if len(tokens) > CONF.token.max_batch_validation:
+            raise exception.ValidationSizeError(
+                attribute='tokens', size=CONF.token.max_batch_validation)
+        include_catalog = 'nocatalog' not in request.params
+        minimal = 'minimal' in request.params
+
+        user_locale = wsgi.best_match_language(request)
+        results = []
+        for token_data in self.token_provider_api.validate_v3_tokens(
+                tokens, minimal):
+            if isinstance(token_data, exception.Error):
+                results.append({'error': wsgi.render_error(
+                    token_data, user_locale=user_locale)})
+                continue
+            token = token_data['token']
+            if not include_catalog and 'catalog' in token:
+                # NOTE: The token data may be cached, don't modify it.
+                token = dict(token)
+                del token['catalog']
+            results.append({'token': token})
+        return {'tokens': results}
+
     @controller.protected()
     def revocation_list(self, request):
         if not CONF.token.revoke_by_id:
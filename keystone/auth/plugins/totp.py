@@ -22,7 +22,10 @@ function to generate a one-time password. The timestamp typically increases in
 same secret key will be equal.
 """
 
-import base64
+import collections
+import hmac
+import threading
+import time
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
@@ -34,14 +37,58 @@ import six
 from keystone.auth import plugins
 from keystone.auth.plugins import base
 from keystone.common import dependency
+import keystone.conf
+from keystone.credential import core as credential_core
 from keystone import exception
 from keystone.i18n import _
 
 
 METHOD_NAME = 'totp'
 
+CONF = keystone.conf.CONF
 LOG = log.getLogger(__name__)
 
+_TIME_STEP = 30
+
+# The passcodes most recently generated, keyed by credential ID and time step,
+# when secrets may be kept in memory, see _generate_passcode().
+_PASSCODES = collections.OrderedDict()
+_PASSCODES_SIZE = 1024
+_PASSCODES_LOCK = threading.Lock()
+
+
+def _generate_passcode(credential_id, secret, time_step):
+    """Generate the passcode of a secret for a time step.
+
+    If `[totp] secret_cache_time` is set, the passcode is kept for that many
+    seconds, so that it is only generated once however many times it is
+    checked. It is kept along with the secret it was generated from, since
+    the secret of the credential may be changed in the meantime.
+
+    """
+    cache_time = CONF.totp.secret_cache_time
+    if cache_time:
+        key = (credential_id, time_step)
+        now = time.time()
+        with _PASSCODES_LOCK:
+            entry = _PASSCODES.get(key)
+        if entry is not None:
+            expires, cached_secret, passcode = entry
+            if expires > now and hmac.compare_digest(cached_secret, secret):
+                return passcode
+
+    totp = crypto_totp.TOTP(
+        secret, 6, hashes.SHA1(), _TIME_STEP, backend=default_backend())
+    passcode = totp.generate(time_step * _TIME_STEP)
+
+    if cache_time:
+        with _PASSCODES_LOCK:
+            _PASSCODES.pop(key, None)
+            _PASSCODES[key] = (now + cache_time, secret, passcode)
+            while len(_PASSCODES) > _PASSCODES_SIZE:
+                _PASSCODES.popitem(last=False)
+    return passcode
+
 
 def _generate_totp_passcode(secret):
     """Generate TOTP passcode.
@@ -49,22 +96,44 @@ def _generate_totp_passcode(secret):
     :param bytes secret: A base32 encoded secret for the TOTP authentication
     :returns: totp passcode as bytes
     """
-    if isinstance(secret, six.text_type):
-        # NOTE(dstanek): since this may be coming from the JSON stored in the
-        # database it may be UTF-8 encoded
-        secret = secret.encode('utf-8')
-
-    # NOTE(nonameentername): cryptography takes a non base32 encoded value for
-    # TOTP. Add the correct padding to be able to base32 decode
-    while len(secret) % 8 != 0:
-        secret = secret + b'='
-
-    decoded = base64.b32decode(secret)
+    decoded = credential_core.decode_totp_secret(secret)
     totp = crypto_totp.TOTP(
-        decoded, 6, hashes.SHA1(), 30, backend=default_backend())
+        decoded, 6, hashes.SHA1(), _TIME_STEP, backend=default_backend())
     return totp.generate(timeutils.utcnow_ts(microsecond=True)).decode('utf-8')
 
 
+def _verify_totp_passcode(secrets, passcode):
+    """Check a passcode against the passcodes of several secrets.
+
+    Every secret is checked against every accepted time step, and the
+    passcodes are compared in constant time, so that how long this takes
+    doesn't reveal which secret or time step, if any, matched. Whether the
+    passcodes were generated recently, if they may be kept, depends on the
+    previous attempts but not on the passcode being checked.
+
+    :param secrets: a list of (credential ID, decoded secret) tuples
+    :param passcode: the passcode provided by the user
+    :returns: whether the passcode matches any of the secrets
+    """
+    if isinstance(passcode, six.text_type):
+        passcode = passcode.encode('utf-8')
+    if not isinstance(passcode, bytes):
+        return False
+
+    now = int(timeutils.utcnow_ts(microsecond=True)) // _TIME_STEP
+    skew = CONF.totp.skew_windows
+    valid = False
+    for credential_id, secret in secrets:
+        try:
+            for time_step in range(now - skew, now + skew + 1):
+                valid |= hmac.compare_digest(
+                    _generate_passcode(credential_id, secret, time_step),
+                    passcode)
+        except ValueError:
+            LOG.debug('Invalid secret in TOTP credential %s', credential_id)
+    return valid
+
+
 @dependency.requires('credential_api')
 class TOTP(base.AuthMethodHandler):
 
@@ -73,25 +142,8 @@ class TOTP(base.AuthMethodHandler):
         user_info = plugins.TOTPUserInfo.create(auth_payload, METHOD_NAME)
         auth_passcode = auth_payload.get('user').get('passcode')
 
-        credentials = self.credential_api.list_credentials_for_user(
-            user_info.user_id, type='totp')
-
-        valid_passcode = False
-        for credential in credentials:
-            try:
-                generated_passcode = _generate_totp_passcode(
-                    credential['blob'])
-                if auth_passcode == generated_passcode:
-                    valid_passcode = True
-                    break
-            except (ValueError, KeyError):
-                LOG.debug('No TOTP match; credential id: %s, user_id: %s',
-                          credential['id'], user_info.user_id)
-            except (TypeError):
-                LOG.debug('Base32 decode failed for TOTP credential %s',
-                          credential['id'])
-
-        if not valid_passcode:
+        secrets = self.credential_api.list_totp_secrets(user_info.user_id)
+        if not _verify_totp_passcode(secrets, auth_passcode):
             # authentication failed because of invalid username or passcode
             msg = _('Invalid username or TOTP passcode')
             raise exception.Unauthorized(msg)
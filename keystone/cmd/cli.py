@@ -15,8 +15,11 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
+import itertools
+import multiprocessing
 import os
 import sys
+import time
 import uuid
 
 from oslo_config import cfg
@@ -38,6 +41,7 @@ from keystone import exception
 from keystone.federation import idp
 from keystone.federation import utils as mapping_engine
 from keystone.i18n import _, _LE, _LI, _LW
+from keystone import revoke
 from keystone.server import backends
 from keystone import token
 
@@ -701,44 +705,97 @@ class CredentialMigrate(BasePermissionsSetup):
     If the credential repository doesn't exist yet, you can use
     ``keystone-manage credential_setup`` to create one.
 
+    Credentials are read in batches, ordered by ID, and encrypted again across
+    ``--processes`` worker processes while the next batch is being read. Each
+    batch is written back, and committed, at once. Credentials changed while
+    their batch is being migrated are left alone, since changing them already
+    encrypted them with the primary key. It is safe to run this against a live
+    deployment, and to interrupt it and run it again, in which case only the
+    credentials left to migrate are read again.
+
     """
 
     name = 'credential_migrate'
 
+    @classmethod
+    def add_argument_parser(cls, subparsers):
+        parser = super(CredentialMigrate, cls).add_argument_parser(subparsers)
+        parser.add_argument('--batch-size', default=500, type=int,
+                            help=('Number of credentials to migrate per '
+                                  'batch.'))
+        parser.add_argument('--processes', default=1, type=int,
+                            help=('Number of worker processes to encrypt '
+                                  'credentials with, or 0 for one per CPU.'))
+        return parser
+
     def __init__(self):
         drivers = backends.load_backends()
         self.credential_provider_api = drivers['credential_provider_api']
         self.credential_api = drivers['credential_api']
 
-    def migrate_credentials(self):
+    def migrate_credentials(self, batch_size=500, processes=1):
         crypto, keys = credential_fernet.get_multi_fernet_keys()
         primary_key_hash = credential_fernet.primary_key_hash(keys)
-
-        # FIXME(lbragstad): We *should* be able to use Hints() to ask only for
-        # credentials that have a key_hash equal to a secondary key hash or
-        # None, but Hints() doesn't seem to honor None values. See
-        # https://bugs.launchpad.net/keystone/+bug/1614154.  As a workaround -
-        # we have to ask for *all* credentials and filter them ourselves.
-        credentials = self.credential_api.driver.list_credentials(
-            driver_hints.Hints()
-        )
-        for credential in credentials:
-            if credential['key_hash'] != primary_key_hash:
-                # If the key_hash isn't None but doesn't match the
-                # primary_key_hash, then we know the credential was encrypted
-                # with a secondary key. Let's decrypt it, and send it through
-                # the update path to re-encrypt it with the new primary key.
-                decrypted_blob = self.credential_provider_api.decrypt(
-                    credential['encrypted_blob']
-                )
-                cred = {'blob': decrypted_blob}
-                self.credential_api.update_credential(
-                    credential['id'],
-                    cred
-                )
+        driver = self.credential_api.driver
+
+        def read_batch(marker):
+            return driver.list_credentials_for_key_migration(
+                primary_key_hash, marker=marker, limit=batch_size)
+
+        def write_batch(credentials, encrypted_blobs):
+            return driver.update_encrypted_blobs([
+                {'id': credential['id'],
+                 'old_encrypted_blob': credential['encrypted_blob'],
+                 'encrypted_blob': encrypted_blob,
+                 'key_hash': primary_key_hash}
+                for credential, encrypted_blob in zip(credentials,
+                                                      encrypted_blobs)])
+
+        pool = None
+        if processes != 1:
+            processes = processes or multiprocessing.cpu_count()
+            pool = multiprocessing.Pool(processes=processes)
+
+        start = time.time()
+        total = 0
+        try:
+            credentials = read_batch(None)
+            while credentials:
+                blobs = [c['encrypted_blob'] for c in credentials]
+                if pool:
+                    # Split the batch between the workers, and read the next
+                    # batch while they are encrypting this one.
+                    chunk_size = (len(blobs) + processes - 1) // processes
+                    work = [(keys, blobs[i:i + chunk_size])
+                            for i in range(0, len(blobs), chunk_size)]
+                    result = pool.map_async(credential_fernet.reencrypt, work)
+                    next_credentials = read_batch(credentials[-1]['id'])
+                    encrypted_blobs = list(
+                        itertools.chain.from_iterable(result.get()))
+                else:
+                    encrypted_blobs = credential_fernet.reencrypt(
+                        (keys, blobs))
+                    next_credentials = read_batch(credentials[-1]['id'])
+
+                total += write_batch(credentials, encrypted_blobs)
+                elapsed = time.time() - start
+                print(_('Migrated %(total)d credentials (%(rate).1f '
+                        'credentials/sec)') % {
+                    'total': total,
+                    'rate': total / elapsed if elapsed else 0.0})
+                credentials = next_credentials
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        return total
 
     @classmethod
     def main(cls):
+        if CONF.command.batch_size < 1:
+            raise ValueError(_('--batch-size must be a positive integer'))
+        if CONF.command.processes < 0:
+            raise ValueError(_('--processes must not be negative'))
         # Check to make sure we have a repository that works...
         futils = fernet_utils.FernetUtils(
             CONF.credential.key_repository,
@@ -746,7 +803,8 @@ class CredentialMigrate(BasePermissionsSetup):
         )
         futils.validate_key_repository(requires_write=True)
         klass = cls()
-        klass.migrate_credentials()
+        klass.migrate_credentials(batch_size=CONF.command.batch_size,
+                                  processes=CONF.command.processes)
 
 
 class TokenFlush(BaseApp):
@@ -767,6 +825,24 @@ class TokenFlush(BaseApp):
                         CONF.token.driver)
 
 
+class RevocationFlush(BaseApp):
+    """Delete the revocation events of tokens which have all expired."""
+
+    name = 'revocation_flush'
+
+    @classmethod
+    def main(cls):
+        revoke_manager = revoke.Manager()
+        try:
+            count = revoke_manager.prune_expired_events()
+        except exception.NotImplemented:
+            LOG.warning(_LW('Revoke driver %s does not support '
+                            'revocation_flush. The revocation_flush command '
+                            'had no effect.'), CONF.revoke.driver)
+            return
+        LOG.info(_LI('Deleted %d expired revocation events.'), count)
+
+
 class MappingPurge(BaseApp):
     """Purge the mapping table."""
 
@@ -1201,6 +1277,108 @@ class MappingPopulate(BaseApp):
         cls.identity_api.list_users(domain_scope=domain_id)
 
 
+class UserImport(BaseApp):
+    """Import users, and their group memberships, in bulk from a file.
+
+    The file is read as a stream of JSON objects, one per line, each of which
+    describes a user in the same form as the body of a v3 create user request.
+    The domain may be given either as ``domain_id`` or ``domain_name`` and
+    defaults to the default domain. An optional ``groups`` attribute lists the
+    names of existing groups in the user's domain that the user should be
+    added to.
+
+    Users are created in batches, with passwords hashed in parallel across
+    ``[identity] password_hash_processes`` worker processes.
+    """
+
+    name = 'user_import'
+
+    @classmethod
+    def add_argument_parser(cls, subparsers):
+        parser = super(UserImport, cls).add_argument_parser(subparsers)
+        parser.add_argument('--file', default=None, required=True,
+                            help=('Path to the file of users to import, or '
+                                  '"-" to read from standard input.'))
+        parser.add_argument('--batch-size', default=500, type=int,
+                            help=('Number of users to create per batch.'))
+        return parser
+
+    def __init__(self):
+        drivers = backends.load_backends()
+        self.identity_api = drivers['identity_api']
+        self.resource_api = drivers['resource_api']
+        self._domain_ids = {}
+        self._group_ids = {}
+
+    def _get_domain_id(self, user):
+        if 'domain_id' in user:
+            return user['domain_id']
+        name = user.get('domain_name')
+        if name is None:
+            return CONF.identity.default_domain_id
+        if name not in self._domain_ids:
+            self._domain_ids[name] = (
+                self.resource_api.get_domain_by_name(name)['id'])
+        return self._domain_ids[name]
+
+    def _get_group_id(self, name, domain_id):
+        if (name, domain_id) not in self._group_ids:
+            self._group_ids[(name, domain_id)] = (
+                self.identity_api.get_group_by_name(name, domain_id)['id'])
+        return self._group_ids[(name, domain_id)]
+
+    def import_batch(self, batch):
+        users = []
+        group_names = []
+        for entry in batch:
+            user = dict(entry)
+            user['domain_id'] = self._get_domain_id(user)
+            user.pop('domain_name', None)
+            group_names.append(user.pop('groups', []))
+            users.append(user)
+
+        refs = self.identity_api.create_users(users)
+
+        memberships = []
+        for ref, names in zip(refs, group_names):
+            for name in names:
+                memberships.append(
+                    (ref['id'], self._get_group_id(name, ref['domain_id'])))
+        if memberships:
+            self.identity_api.add_users_to_groups(memberships)
+        return len(refs), len(memberships)
+
+    def import_users(self, stream, batch_size):
+        entries = (jsonutils.loads(line) for line in stream if line.strip())
+        start = time.time()
+        total_users = total_memberships = 0
+        while True:
+            batch = list(itertools.islice(entries, batch_size))
+            if not batch:
+                break
+            users, memberships = self.import_batch(batch)
+            total_users += users
+            total_memberships += memberships
+            elapsed = time.time() - start
+            print(_('Imported %(users)d users and %(memberships)d group '
+                    'memberships (%(rate).1f users/sec)') % {
+                'users': total_users,
+                'memberships': total_memberships,
+                'rate': total_users / elapsed if elapsed else 0.0})
+        return total_users
+
+    @classmethod
+    def main(cls):
+        if CONF.command.batch_size < 1:
+            raise ValueError(_('--batch-size must be a positive integer'))
+        klass = cls()
+        if CONF.command.file == '-':
+            klass.import_users(sys.stdin, CONF.command.batch_size)
+        else:
+            with open(CONF.command.file) as stream:
+                klass.import_users(stream, CONF.command.batch_size)
+
+
 CMDS = [
     BootStrap,
     CredentialMigrate,
@@ -1216,8 +1394,10 @@ CMDS = [
     MappingPurge,
     MappingEngineTester,
     PKISetup,
+    RevocationFlush,
     SamlIdentityProviderMetadata,
     TokenFlush,
+    UserImport,
 ]
 
 
@@ -57,10 +57,25 @@ LOG = log.getLogger(__name__)
 
 
 def token_to_auth_context(token):
+    """Build the auth context for a token.
+
+    The auth context is only built once for each token, so that the token
+    can be shared between the middleware and the rest of the request without
+    repeatedly walking the token data. Each caller gets its own copy, with its
+    own lists of roles and group IDs, but the token itself is shared.
+
+    """
     if not isinstance(token, token_model.KeystoneToken):
         raise exception.UnexpectedError(_('token reference must be a '
                                           'KeystoneToken type, got: %s') %
                                         type(token))
+    auth_context = token.memoize(
+        'auth_context', lambda: _build_auth_context(token))
+    return dict((key, list(value) if isinstance(value, list) else value)
+                for key, value in auth_context.items())
+
+
+def _build_auth_context(token):
     auth_context = {'token': token,
                     'is_delegated_auth': False}
     try:
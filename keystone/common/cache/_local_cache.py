@@ -0,0 +1,119 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A dogpile.cache proxy that keeps recently used objects in the process."""
+
+import collections
+import threading
+import time
+
+from dogpile.cache import api
+from dogpile.cache import proxy
+from oslo_serialization import msgpackutils
+
+
+class _LocalCacheProxy(proxy.ProxyBackend):
+    """A bounded, least recently used cache in front of the cache backend.
+
+    Values are kept serialized, so that each caller gets its own copy, just
+    as it would from the backend. They are evicted once there are more than
+    ``size`` of them, or once they are more than ``ttl`` seconds old.
+
+    Since every key includes the ID of its region, invalidating a region
+    invalidates the values kept here too. Deleting a single key in another
+    process however is not seen until the value here expires.
+
+    """
+
+    def __init__(self, size, ttl):
+        super(_LocalCacheProxy, self).__init__()
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_local_cache(self, key):
+        with self._lock:
+            try:
+                expires, value = self._values.pop(key)
+            except KeyError:
+                self.misses += 1
+                return api.NO_VALUE
+            if expires < time.time():
+                self.misses += 1
+                return api.NO_VALUE
+            # Move it to the most recently used end.
+            self._values[key] = (expires, value)
+            self.hits += 1
+
+        value = msgpackutils.loads(value)
+        return api.CachedValue(payload=value['payload'],
+                               metadata=value['metadata'])
+
+    def _set_local_cache(self, key, value):
+        serialize = {'payload': value.payload, 'metadata': value.metadata}
+        value = msgpackutils.dumps(serialize)
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = (time.time() + self.ttl, value)
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+
+    def _delete_local_cache(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._values)}
+
+    def get(self, key):
+        value = self._get_local_cache(key)
+        if value is api.NO_VALUE:
+            value = self.proxied.get(key)
+            if value is not api.NO_VALUE:
+                self._set_local_cache(key, value)
+        return value
+
+    def set(self, key, value):
+        self._set_local_cache(key, value)
+        self.proxied.set(key, value)
+
+    def delete(self, key):
+        self._delete_local_cache(key)
+        self.proxied.delete(key)
+
+    def get_multi(self, keys):
+        values = {}
+        for key in keys:
+            v = self._get_local_cache(key)
+            if v is not api.NO_VALUE:
+                values[key] = v
+        query_keys = [k for k in keys if k not in values]
+        if query_keys:
+            for key, v in zip(query_keys, self.proxied.get_multi(query_keys)):
+                if v is not api.NO_VALUE:
+                    self._set_local_cache(key, v)
+                values[key] = v
+        return [values[k] for k in keys]
+
+    def set_multi(self, mapping):
+        for k, v in mapping.items():
+            self._set_local_cache(k, v)
+        self.proxied.set_multi(mapping)
+
+    def delete_multi(self, keys):
+        for k in keys:
+            self._delete_local_cache(k)
+        self.proxied.delete_multi(keys)
@@ -0,0 +1,46 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A dogpile.cache proxy that counts cache hits and misses."""
+
+from dogpile.cache import api
+from dogpile.cache import proxy
+
+from keystone.common import metrics
+
+
+class _MetricsProxy(proxy.ProxyBackend):
+    """Count the lookups of a region, by whether they found a value."""
+
+    def __init__(self, region_name):
+        super(_MetricsProxy, self).__init__()
+        self.region_name = region_name
+
+    def _count(self, values):
+        misses = sum(1 for v in values if v is api.NO_VALUE)
+        if misses:
+            metrics.increment('keystone_cache_lookups_total', misses,
+                              region=self.region_name, result='miss')
+        if len(values) > misses:
+            metrics.increment('keystone_cache_lookups_total',
+                              len(values) - misses,
+                              region=self.region_name, result='hit')
+
+    def get(self, key):
+        value = self.proxied.get(key)
+        self._count([value])
+        return value
+
+    def get_multi(self, keys):
+        values = self.proxied.get_multi(keys)
+        self._count(values)
+        return values
@@ -15,6 +15,8 @@
 """Keystone Caching Layer Implementation."""
 
 import os
+import time
+import weakref
 
 import dogpile.cache
 from dogpile.cache import region
@@ -22,6 +24,8 @@ from dogpile.cache import util
 from oslo_cache import core as cache
 
 from keystone.common.cache import _context_cache
+from keystone.common.cache import _local_cache
+from keystone.common.cache import _metrics
 import keystone.conf
 
 
@@ -35,18 +39,37 @@ class RegionInvalidationManager(object):
     def __init__(self, invalidation_region, region_name):
         self._invalidation_region = invalidation_region
         self._region_key = self.REGION_KEY_PREFIX + region_name
+        # A (region_id, time it must be read again) pair, kept together so
+        # that it can be replaced atomically.
+        self._local_region_id = (None, 0)
 
     def _generate_new_id(self):
         return os.urandom(10)
 
+    def _set_local_region_id(self, region_id):
+        expires = time.time() + CONF.cache.region_id_cache_time
+        self._local_region_id = (region_id, expires)
+
     @property
     def region_id(self):
-        return self._invalidation_region.get_or_create(
+        # NOTE: Every key in the region is mangled with this ID, so keeping
+        # it locally for a short while saves a round trip to the invalidation
+        # region for every lookup in the region.
+        region_id, expires = self._local_region_id
+        if region_id is not None and time.time() < expires:
+            return region_id
+
+        region_id = self._invalidation_region.get_or_create(
             self._region_key, self._generate_new_id, expiration_time=-1)
+        if CONF.cache.region_id_cache_time:
+            self._set_local_region_id(region_id)
+        return region_id
 
     def invalidate_region(self):
         new_region_id = self._generate_new_id()
         self._invalidation_region.set(self._region_key, new_region_id)
+        if CONF.cache.region_id_cache_time:
+            self._set_local_region_id(new_region_id)
         return new_region_id
 
     def is_region_key(self, key):
@@ -111,6 +134,9 @@ def create_region(name):
 CACHE_REGION = create_region(name='shared default')
 CACHE_INVALIDATION_REGION = create_region(name='invalidation region')
 
+# The regions configured by keystone, for reporting on their caches.
+_CONFIGURED_REGIONS = weakref.WeakSet()
+
 register_model_handler = _context_cache._register_model_handler
 
 
@@ -125,7 +151,14 @@ def configure_cache(region=None):
     # Only wrap the region if it was not configured. This should be pushed
     # to oslo_cache lib somehow.
     if not configured:
+        _CONFIGURED_REGIONS.add(region)
+        if CONF.cache.local_cache_size:
+            region.local_cache = _local_cache._LocalCacheProxy(
+                CONF.cache.local_cache_size, CONF.cache.local_cache_time)
+            region.wrap(region.local_cache)
         region.wrap(_context_cache._ResponseCacheProxy)
+        if CONF.metrics.enabled:
+            region.wrap(_metrics._MetricsProxy(region.name))
 
         region_manager = RegionInvalidationManager(
             CACHE_INVALIDATION_REGION, region.name)
@@ -135,6 +168,18 @@ def configure_cache(region=None):
             region_manager)
 
 
+def get_local_cache_stats():
+    """Get the hit and miss counts of the in-process caches.
+
+    :returns: a dict of the stats of each region's in-process cache, keyed by
+              region name. Regions without an in-process cache are omitted.
+
+    """
+    return dict((region.name, region.local_cache.get_stats())
+                for region in _CONFIGURED_REGIONS
+                if getattr(region, 'local_cache', None) is not None)
+
+
 def _sha1_mangle_key(key):
     """Wrapper for dogpile's sha1_mangle_key.
 
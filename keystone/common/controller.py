@@ -19,6 +19,7 @@ from oslo_log import log
 from oslo_log import versionutils
 from oslo_utils import strutils
 import six
+from six.moves import urllib
 
 from keystone.common import authorization
 from keystone.common import dependency
@@ -131,10 +132,12 @@ def protected(callback=None):
                 # TODO(henry-nash): Move this entire code to a member
                 # method inside v3 Auth
                 if request.context_dict.get('subject_token_id') is not None:
+                    # NOTE: Only the user and its domain are needed here.
                     token_ref = token_model.KeystoneToken(
                         token_id=request.context_dict['subject_token_id'],
                         token_data=self.token_provider_api.validate_token(
-                            request.context_dict['subject_token_id']))
+                            request.context_dict['subject_token_id'],
+                            minimal=True))
                     policy_dict.setdefault('target', {})
                     policy_dict['target'].setdefault(self.member_name, {})
                     policy_dict['target'][self.member_name]['user_id'] = (
@@ -476,13 +479,24 @@ class V3Controller(wsgi.Application):
         - Adds 'self' links in every member
         - Adds 'next', 'self' and 'prev' links for the whole collection.
 
+        If the members are given as an iterator and no limit or marker is
+        set, the collection holds a generator which filters and wraps each
+        member as it is consumed, so that the response can be streamed (see
+        :func:`keystone.common.wsgi.render_response`).
+
         :param context: the current context, containing the original url path
                         and query string
-        :param refs: the list of members of the collection
+        :param refs: the list of members of the collection, or an iterator
+                     over them
         :param hints: list hints, containing any relevant filters and limit.
                       Any filters already satisfied by managers will have been
                       removed
         """
+        if not isinstance(refs, list):
+            if hints is None or (hints.limit is None and hints.marker is None):
+                return cls._wrap_iterator(context, refs, hints)
+            refs = list(refs)
+
         # Check if there are any filters in hints that were not
         # handled by the drivers. The driver will not have paginated or
         # limited the output if it found there were filters it was unable to
@@ -491,14 +505,20 @@ class V3Controller(wsgi.Application):
         if hints is not None:
             refs = cls.filter_by_attributes(refs, hints)
 
+        refs = cls.paginate(refs, hints)
         list_limited, refs = cls.limit(refs, hints)
 
+        next_url = None
+        if list_limited and refs:
+            next_url = cls._next_page_url(
+                context, cls.pagination_key(refs[-1]))
+
         for ref in refs:
             cls.wrap_member(context, ref)
 
         container = {cls.collection_name: refs}
         container['links'] = {
-            'next': None,
+            'next': next_url,
             'self': cls.full_url(context, path=context['path']),
             'previous': None}
 
@@ -507,6 +527,60 @@ class V3Controller(wsgi.Application):
 
         return container
 
+    @classmethod
+    def _wrap_iterator(cls, context, refs, hints):
+        if hints is not None:
+            refs = cls.filter_by_attributes(refs, hints)
+
+        def members():
+            for ref in refs:
+                cls.wrap_member(context, ref)
+                yield ref
+
+        return {cls.collection_name: members(),
+                'links': {
+                    'next': None,
+                    'self': cls.full_url(context, path=context['path']),
+                    'previous': None}}
+
+    @classmethod
+    def pagination_key(cls, ref):
+        """Return the key by which a member of the collection is paginated."""
+        return ref['id']
+
+    @classmethod
+    def paginate(cls, refs, hints):
+        """Order a list of entities by key and skip those up to the marker.
+
+        The underlying driver layer may already have done this for us, in
+        which case this is a cheap no-op, since the list will only contain a
+        single page.
+
+        :param refs: the list of members of the collection
+        :param hints: hints, containing, among other things, the marker
+
+        :returns: the list of entities in pagination order, starting after
+                  the marker.
+
+        """
+        if hints is None or (hints.limit is None and hints.marker is None):
+            return refs
+
+        refs = sorted(refs, key=cls.pagination_key)
+        if hints.marker is not None:
+            refs = [ref for ref in refs
+                    if cls.pagination_key(ref) > hints.marker]
+        return refs
+
+    @classmethod
+    def _next_page_url(cls, context, marker):
+        url = cls.base_url(context, context['path'])
+        query = urllib.parse.parse_qsl(
+            context['environment'].get('QUERY_STRING', ''))
+        query = [(k, v) for k, v in query if k != 'marker']
+        query.append(('marker', marker))
+        return '%s?%s' % (url, urllib.parse.urlencode(query))
+
     @classmethod
     def limit(cls, refs, hints):
         """Limit a list of entities.
@@ -542,7 +616,12 @@ class V3Controller(wsgi.Application):
 
     @classmethod
     def filter_by_attributes(cls, refs, hints):
-        """Filter a list of references by filter values."""
+        """Filter a list of references by filter values.
+
+        An iterator over references is filtered lazily, reading the filters
+        from the hints as each reference is checked.
+
+        """
         def _attr_match(ref_attr, val_attr):
             """Matche attributes allowing for booleans as strings.
 
@@ -589,18 +668,22 @@ class V3Controller(wsgi.Application):
 
             return False
 
-        for filter in hints.filters:
-            if filter['comparator'] == 'equals':
-                attr = filter['name']
-                value = filter['value']
-                refs = [r for r in refs if _attr_match(
-                    utils.flatten_dict(r).get(attr), value)]
-            else:
+        def _match(ref):
+            for filter in hints.filters:
+                if filter['comparator'] == 'equals':
+                    if not _attr_match(
+                            utils.get_flattened(ref, filter['name']),
+                            filter['value']):
+                        return False
                 # It might be an inexact filter
-                refs = [r for r in refs if _inexact_attr_match(
-                    filter, r)]
+                elif not _inexact_attr_match(filter, ref):
+                    return False
+            return True
 
-        return refs
+        # Check every filter against each reference in a single pass.
+        if not isinstance(refs, list):
+            return (r for r in refs if _match(r))
+        return [r for r in refs if _match(r)]
 
     @classmethod
     def build_driver_hints(cls, request, supported_filters):
@@ -616,7 +699,10 @@ class V3Controller(wsgi.Application):
         if not request.params:
             return hints
 
-        for key, value in request.params.items():
+        params = dict(request.params)
+        cls._set_pagination_in_hints(hints, params)
+
+        for key, value in params.items():
             # Check if this is an exact filter
             if supported_filters is None or key in supported_filters:
                 hints.add_filter(key, value)
@@ -652,11 +738,32 @@ class V3Controller(wsgi.Application):
                                  comparator=comparator,
                                  case_sensitive=case_sensitive)
 
-        # NOTE(henry-nash): If we were to support pagination, we would pull any
-        # pagination directives out of the query_dict here, and add them into
-        # the hints list.
         return hints
 
+    @classmethod
+    def _set_pagination_in_hints(cls, hints, params):
+        """Move any pagination directives from the query into the hints.
+
+        :param hints: the hints to add the limit and marker to
+        :param params: dict of the query parameters, from which any
+                       pagination directives are removed
+
+        """
+        limit = params.pop('limit', None)
+        marker = params.pop('marker', None)
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                limit = 0
+            if limit < 1:
+                msg = _('The limit query parameter must be a positive '
+                        'integer.')
+                raise exception.ValidationError(msg)
+            hints.set_limit(limit)
+        if marker is not None:
+            hints.set_marker(marker)
+
     def _require_matching_id(self, value, ref):
         """Ensure the value matches the reference's ID, if any."""
         if 'id' in ref and ref['id'] != value:
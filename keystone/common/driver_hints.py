@@ -72,7 +72,17 @@ class Hints(object):
 
     A Hint object contains filters, which is a list of dicts that can be
     accessed publicly. Also it contains a dict called limit, which will
-    indicate the amount of data we want to limit our listing to.
+    indicate the amount of data we want to limit our listing to, and a marker,
+    which if set is the ID of the last entity of the previous page of a
+    paginated listing.
+
+    Pagination is keyset based: when a limit or marker is present, a driver
+    should return entities ordered by ID, starting with the first one whose ID
+    sorts after the marker. Drivers that cannot do this must not truncate the
+    list either, since the marker can only be applied to the complete
+    collection: the identity manager takes the limit out of the hints of such
+    drivers and cuts the page itself, as the controller does for the
+    collections it filters or builds.
 
     If the filter is discovered to never match, then `cannot_match` can be set
     to indicate that there will not be any matches and the backend work can be
@@ -92,6 +102,7 @@ class Hints(object):
 
     def __init__(self):
         self.limit = None
+        self.marker = None
         self.filters = list()
         self.cannot_match = False
 
@@ -113,3 +124,17 @@ class Hints(object):
     def set_limit(self, limit, truncated=False):
         """Set a limit to indicate the list should be truncated."""
         self.limit = {'limit': limit, 'type': 'limit', 'truncated': truncated}
+
+    def apply_list_limit(self, list_limit):
+        """Set a limit, unless a smaller one has already been requested.
+
+        This is used to impose the configured list limit, while still allowing
+        a client to ask for smaller pages.
+
+        """
+        if self.limit is None or self.limit['limit'] > list_limit:
+            self.set_limit(list_limit)
+
+    def set_marker(self, marker):
+        """Set the ID after which a paginated list should start."""
+        self.marker = marker
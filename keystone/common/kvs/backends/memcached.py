@@ -100,18 +100,30 @@ class MemcachedBackend(object):
             arguments['url'] = CONF.memcache.servers
 
         if backend is None:
-            # NOTE(morganfainberg): Use the basic memcached backend if nothing
-            # else is supplied.
-            self.driver = VALID_DOGPILE_BACKENDS['memcached'](arguments)
-        else:
-            if backend not in VALID_DOGPILE_BACKENDS:
-                raise ValueError(
-                    _('Backend `%(backend)s` is not a valid memcached '
-                      'backend. Valid backends: %(backend_list)s') %
-                    {'backend': backend,
-                     'backend_list': ','.join(VALID_DOGPILE_BACKENDS.keys())})
-            else:
-                self.driver = VALID_DOGPILE_BACKENDS[backend](arguments)
+            # NOTE: Use the pooled memcached backend if nothing else is
+            # supplied, so that each process reuses a bounded number of
+            # connections instead of one client per thread.
+            backend = 'pooled_memcached'
+        if backend not in VALID_DOGPILE_BACKENDS:
+            raise ValueError(
+                _('Backend `%(backend)s` is not a valid memcached '
+                  'backend. Valid backends: %(backend_list)s') %
+                {'backend': backend,
+                 'backend_list': ','.join(VALID_DOGPILE_BACKENDS.keys())})
+        if backend == 'pooled_memcached':
+            self._set_pool_arguments(arguments)
+        self.driver = VALID_DOGPILE_BACKENDS[backend](arguments)
+
+    @staticmethod
+    def _set_pool_arguments(arguments):
+        """Fill in the connection pool settings from the memcache section."""
+        arguments.setdefault('dead_retry', CONF.memcache.dead_retry)
+        arguments.setdefault('socket_timeout', CONF.memcache.socket_timeout)
+        arguments.setdefault('pool_maxsize', CONF.memcache.pool_maxsize)
+        arguments.setdefault('pool_unused_timeout',
+                             CONF.memcache.pool_unused_timeout)
+        arguments.setdefault('pool_connection_get_timeout',
+                             CONF.memcache.pool_connection_get_timeout)
 
     def __getattr__(self, name):
         """Forward calls to the underlying driver."""
@@ -312,6 +312,16 @@ class KeyValueStore(object):
             raise exception.NotFound(target=not_found)
         return values
 
+    def get_multi_or_default(self, keys, default=None):
+        """Get multiple values in a single call from the KVS backend.
+
+        Unlike get_multi, `default` is returned in place of the values of the
+        keys which don't exist, rather than raising NotFound.
+        """
+        self._assert_configured()
+        return [default if value is NO_VALUE else value
+                for value in self._region.get_multi(keys)]
+
     def set(self, key, value, lock=None):
         """Set a single value in the KVS backend."""
         self._assert_configured()
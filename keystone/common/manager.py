@@ -14,6 +14,7 @@
 
 import functools
 import inspect
+import threading
 import time
 import types
 
@@ -23,11 +24,18 @@ from oslo_utils import importutils
 import six
 import stevedore
 
+from keystone.common import metrics
+import keystone.conf
 from keystone.i18n import _
 
 
+CONF = keystone.conf.CONF
 LOG = log.getLogger(__name__)
 
+# Serializes the deferred loading of drivers, so that each manager only ever
+# loads one instance of its driver.
+_DRIVER_LOAD_LOCK = threading.RLock()
+
 
 def response_truncated(f):
     """Truncate the list returned by the wrapped function.
@@ -60,12 +68,19 @@ def response_truncated(f):
 
         list_limit = self.driver._get_list_limit()
         if list_limit:
-            kwargs['hints'].set_limit(list_limit)
+            kwargs['hints'].apply_list_limit(list_limit)
         return f(self, *args, **kwargs)
     return wrapper
 
 
 def load_driver(namespace, driver_name, *args):
+    driver = _load_driver(namespace, driver_name, *args)
+    if metrics.enabled():
+        metrics.instrument_driver(driver)
+    return driver
+
+
+def _load_driver(namespace, driver_name, *args):
     try:
         driver_manager = stevedore.DriverManager(namespace,
                                                  driver_name,
@@ -93,7 +108,8 @@ class _TraceMeta(type):
 
     This metaclass automatically wraps all methods on the class when
     instantiated with a decorator that will log entry/exit from a method
-    when keystone is run in Trace log level.
+    when keystone is run in Trace log level, and record how long the method
+    took when ``[metrics] enabled`` is set.
     """
 
     @staticmethod
@@ -116,6 +132,7 @@ class _TraceMeta(type):
             __exc = None
             __t = time.time()
             __do_trace = LOG.logger.getEffectiveLevel() <= log.TRACE
+            __do_metrics = metrics.enabled()
             __ret_val = None
             try:
                 if __do_trace:
@@ -125,6 +142,9 @@ class _TraceMeta(type):
                 __exc = e
                 raise
             finally:
+                if __do_metrics:
+                    metrics.observe('keystone_manager_call_seconds',
+                                    time.time() - __t, method=__fn_info)
                 if __do_trace:
                     __subst = {
                         'run_time': (time.time() - __t),
@@ -178,8 +198,28 @@ class Manager(object):
 
     driver_namespace = None
 
+    _driver = None
+    _driver_name = None
+
     def __init__(self, driver_name):
-        self.driver = load_driver(self.driver_namespace, driver_name)
+        if CONF.lazy_load_drivers:
+            self._driver_name = driver_name
+        else:
+            self.driver = load_driver(self.driver_namespace, driver_name)
+
+    @property
+    def driver(self):
+        """The driver, which is loaded on first use if loading is deferred."""
+        if self._driver is None and self._driver_name is not None:
+            with _DRIVER_LOAD_LOCK:
+                if self._driver is None:
+                    self._driver = load_driver(self.driver_namespace,
+                                               self._driver_name)
+        return self._driver
+
+    @driver.setter
+    def driver(self, driver):
+        self._driver = driver
 
     def __getattr__(self, name):
         """Forward calls to the underlying driver."""
@@ -0,0 +1,258 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Lightweight timing of keystone's hot paths.
+
+When ``[metrics] enabled`` is set, the durations of manager methods, driver
+calls, SQL sessions and LDAP operations are recorded in histograms kept by
+each process, and cache lookups are counted. They can be rendered in the
+Prometheus text format, and are also sent to statsd if
+``[metrics] statsd_host`` is set.
+
+Every measurement has a name and a set of labels, for example
+``keystone_sql_session_seconds{mode="read"}``.
+
+"""
+
+import bisect
+import collections
+import contextlib
+import functools
+import inspect
+import socket
+import threading
+import time
+
+from oslo_log import log
+import six
+
+import keystone.conf
+
+
+CONF = keystone.conf.CONF
+LOG = log.getLogger(__name__)
+
+# The upper bounds, in seconds, of the buckets of every histogram.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0)
+
+_LOCK = threading.Lock()
+_HISTOGRAMS = collections.defaultdict(dict)
+_COUNTERS = collections.defaultdict(dict)
+_STATSD = threading.local()
+
+
+class Histogram(object):
+    """Count of observations in each bucket, with their count and sum."""
+
+    def __init__(self):
+        # The last bucket counts observations above the highest bound.
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(BUCKETS + (float('inf'),), self.buckets):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {'buckets': buckets, 'count': self.count, 'sum': self.sum}
+
+
+def enabled():
+    return CONF.metrics.enabled
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    """Record a duration in the histogram of a name and labels."""
+    key = _labels_key(labels)
+    with _LOCK:
+        histogram = _HISTOGRAMS[name].get(key)
+        if histogram is None:
+            histogram = _HISTOGRAMS[name][key] = Histogram()
+        histogram.observe(seconds)
+    if CONF.metrics.statsd_host:
+        _send_statsd(name, key, '%d|ms' % (seconds * 1000))
+
+
+def increment(name, value=1, **labels):
+    """Add to the counter of a name and labels."""
+    key = _labels_key(labels)
+    with _LOCK:
+        _COUNTERS[name][key] = _COUNTERS[name].get(key, 0) + value
+    if CONF.metrics.statsd_host:
+        _send_statsd(name, key, '%d|c' % value)
+
+
+@contextlib.contextmanager
+def timer(name, **labels):
+    """Record how long the body of a with statement takes, if enabled."""
+    if not enabled():
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        observe(name, time.time() - start, **labels)
+
+
+def timed(name, **labels):
+    """Decorate a function to record how long each call takes, if enabled."""
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return f(*args, **kwargs)
+            start = time.time()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                observe(name, time.time() - start, **labels)
+        return wrapper
+    return decorator
+
+
+def instrument_driver(driver):
+    """Time every public method of a driver instance.
+
+    The methods are replaced on the instance only, so that the driver still
+    is an instance of its class.
+
+    """
+    cls = type(driver)
+    prefix = '%s.%s' % (cls.__module__, cls.__name__)
+    # NOTE: Looking the methods up on the class doesn't evaluate properties.
+    for attr in inspect.classify_class_attrs(cls):
+        if attr.kind != 'method' or attr.name.startswith('_'):
+            continue
+        method = getattr(driver, attr.name)
+        setattr(driver, attr.name, timed(
+            'keystone_driver_call_seconds',
+            method='%s.%s' % (prefix, attr.name))(method))
+    return driver
+
+
+def get_histograms():
+    """Return a snapshot of every histogram.
+
+    :returns: a dict of histogram dicts, keyed by (name, labels) where labels
+              is a tuple of sorted (label, value) pairs
+
+    """
+    with _LOCK:
+        return dict(((name, key), histogram.to_dict())
+                    for name, histograms in _HISTOGRAMS.items()
+                    for key, histogram in histograms.items())
+
+
+def get_counters():
+    """Return a snapshot of every counter, keyed like get_histograms()."""
+    with _LOCK:
+        return dict(((name, key), value)
+                    for name, counters in _COUNTERS.items()
+                    for key, value in counters.items())
+
+
+def reset():
+    """Forget every measurement."""
+    with _LOCK:
+        _HISTOGRAMS.clear()
+        _COUNTERS.clear()
+
+
+def _escape_label_value(value):
+    return (six.text_type(value).replace('\\', '\\\\')
+            .replace('\n', '\\n').replace('"', '\\"'))
+
+
+def _format_labels(key, **extra):
+    pairs = list(key) + sorted(extra.items())
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (label, _escape_label_value(value))
+                             for label, value in pairs)
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def to_prometheus_text():
+    """Render every measurement in the Prometheus text exposition format."""
+    lines = []
+    histograms = get_histograms()
+    for name in sorted(set(name for name, key in histograms)):
+        lines.append('# TYPE %s histogram' % name)
+        for (n, key), histogram in sorted(histograms.items()):
+            if n != name:
+                continue
+            for bound, count in histogram['buckets']:
+                lines.append('%s_bucket%s %d' % (
+                    name, _format_labels(key, le=_format_bound(bound)),
+                    count))
+            lines.append('%s_sum%s %r' % (name, _format_labels(key),
+                                          histogram['sum']))
+            lines.append('%s_count%s %d' % (name, _format_labels(key),
+                                            histogram['count']))
+    counters = get_counters()
+    for name in sorted(set(name for name, key in counters)):
+        lines.append('# TYPE %s counter' % name)
+        for (n, key), value in sorted(counters.items()):
+            if n == name:
+                lines.append('%s%s %d' % (name, _format_labels(key), value))
+    return '\n'.join(lines) + '\n'
+
+
+def _statsd_name(name, key):
+    parts = [CONF.metrics.statsd_prefix, name] + [v for k, v in key]
+    # NOTE: ':', '|' and '@' separate the fields of a statsd packet.
+    return '.'.join(six.text_type(p).replace(':', '_').replace('|', '_')
+                    .replace('@', '_') for p in parts if p)
+
+
+def _statsd_socket():
+    # NOTE: Connecting the socket resolves the host once for each thread,
+    # rather than on every measurement, and it is only connected again if
+    # the address changes.
+    address = (CONF.metrics.statsd_host, CONF.metrics.statsd_port)
+    if getattr(_STATSD, 'address', None) != address:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.connect(address)
+        except (socket.error, socket.gaierror):
+            sock.close()
+            raise
+        if getattr(_STATSD, 'socket', None) is not None:
+            _STATSD.socket.close()
+        _STATSD.socket = sock
+        _STATSD.address = address
+    return _STATSD.socket
+
+
+def _send_statsd(name, key, value):
+    packet = '%s:%s' % (_statsd_name(name, key), value)
+    try:
+        _statsd_socket().send(packet.encode('utf-8'))
+    except (socket.error, socket.gaierror) as e:
+        # NOTE: Measurements are best effort, they must never fail a request.
+        LOG.debug('Unable to send a measurement to statsd: %s', e)
@@ -18,7 +18,10 @@ Before using this module, call initialize(). This has to be done before
 CONF() because it sets up configuration options.
 
 """
+import contextlib
 import functools
+import re
+import weakref
 
 from oslo_db import exception as db_exception
 from oslo_db import options as db_options
@@ -28,11 +31,13 @@ from oslo_log import log
 from oslo_serialization import jsonutils
 import six
 import sqlalchemy as sql
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext import declarative
 from sqlalchemy.orm.attributes import flag_modified, InstrumentedAttribute
 from sqlalchemy import types as sql_types
 
 from keystone.common import driver_hints
+from keystone.common import metrics
 from keystone.common import utils
 import keystone.conf
 from keystone import exception
@@ -208,11 +213,20 @@ def _get_context():
 _TESTING_USE_GLOBAL_CONTEXT_MANAGER = False
 
 
+@contextlib.contextmanager
+def _timed_session(session_manager, mode):
+    with metrics.timer('keystone_sql_session_seconds', mode=mode):
+        with session_manager as session:
+            yield session
+
+
 def session_for_read():
     if _TESTING_USE_GLOBAL_CONTEXT_MANAGER:
         reader = enginefacade.reader
     else:
         reader = _get_main_context_manager().reader
+    if metrics.enabled():
+        return _timed_session(reader.using(_get_context()), 'read')
     return reader.using(_get_context())
 
 
@@ -221,6 +235,8 @@ def session_for_write():
         writer = enginefacade.writer
     else:
         writer = _get_main_context_manager().writer
+    if metrics.enabled():
+        return _timed_session(writer.using(_get_context()), 'write')
     return writer.using(_get_context())
 
 
@@ -261,6 +277,111 @@ class _WontMatch(Exception):
         # Otherwise the value could match a value in the column.
 
 
+# Whether each engine's database has the JSON functions used to filter on
+# the attributes kept in the extra column, see _json_dialect().
+_JSON_SUPPORT = weakref.WeakKeyDictionary()
+
+# The statements run to find out whether a database has those functions.
+_JSON_PROBES = {
+    'mysql': "SELECT JSON_TYPE(JSON_EXTRACT('[1]', '$[0]'))",
+    'sqlite': "SELECT json_type('[1]', '$[0]')",
+}
+
+# Only keys made of these characters are looked up in the extra column, so
+# that they can be used in a JSON path as they are.
+_EXTRA_KEY_RE = re.compile(r'^[\w:-]+$')
+
+
+def _json_dialect(query):
+    """Return the name of the dialect of a query if it can filter on JSON.
+
+    :returns: 'mysql', 'postgresql' or 'sqlite' if the database behind the
+              query has the JSON functions needed to filter on the
+              attributes kept in the extra column, None otherwise.
+
+    """
+    try:
+        engine = query.session.get_bind().engine
+    except (AttributeError, sql.exc.UnboundExecutionError):
+        return None
+    name = engine.dialect.name
+
+    supported = _JSON_SUPPORT.get(engine)
+    if supported is None:
+        if name == 'postgresql':
+            # NOTE: A failed statement would abort the transaction, so rely
+            # on the version: json_typeof() was added in PostgreSQL 9.4.
+            version = engine.dialect.server_version_info or (0,)
+            supported = version >= (9, 4)
+        elif name in _JSON_PROBES:
+            # NOTE: MySQL has these functions since 5.7, and SQLite only if
+            # it was built with the JSON1 extension, so ask the database. A
+            # failed statement doesn't abort the transaction of either.
+            try:
+                query.session.execute(_JSON_PROBES[name])
+                supported = True
+            except (sql.exc.DBAPIError, db_exception.DBError):
+                supported = False
+        else:
+            supported = False
+        _JSON_SUPPORT[engine] = supported
+    return name if supported else None
+
+
+def _extra_filter_term(dialect, column, filter_):
+    """Return a SQL term applying a filter to a key of a JSON column.
+
+    The term matches just like V3Controller.filter_by_attributes() would:
+    string values are compared as they are, and boolean values to the filter
+    value taken as a boolean.
+
+    :returns: the term, or None if the filter can't be applied in SQL
+
+    """
+    key = filter_['name']
+    if dialect == 'sqlite':
+        path = '$."%s"' % key
+        json_type = sql.func.json_type(column, path)
+        text = sql.func.json_extract(column, path)
+        is_string = json_type == 'text'
+        # NOTE: SQLite extracts booleans as integers, but types them exactly.
+        is_boolean = {True: json_type == 'true', False: json_type == 'false'}
+    else:
+        if dialect == 'mysql':
+            value = sql.func.json_extract(column, '$."%s"' % key)
+            json_type = sql.func.json_type(value)
+            text = sql.func.json_unquote(value)
+            string_type, boolean_type = 'STRING', 'BOOLEAN'
+        else:
+            document = sql.cast(column, postgresql.JSON)
+            json_type = sql.func.json_typeof(document.op('->')(key))
+            text = document.op('->>')(key)
+            string_type, boolean_type = 'string', 'boolean'
+        is_string = json_type == string_type
+        is_boolean = {True: sql.and_(json_type == boolean_type,
+                                     text == 'true'),
+                      False: sql.and_(json_type == boolean_type,
+                                      text == 'false')}
+
+    if filter_['comparator'] == 'equals':
+        value = filter_['value']
+        return sql.or_(sql.and_(is_string, text == value),
+                       is_boolean[utils.attr_as_boolean(value)])
+
+    # As for columns, case sensitive filters are left to the controller.
+    if filter_['case_sensitive']:
+        return None
+    if filter_['comparator'] == 'contains':
+        pattern = '%%%s%%' % filter_['value']
+    elif filter_['comparator'] == 'startswith':
+        pattern = '%s%%' % filter_['value']
+    elif filter_['comparator'] == 'endswith':
+        pattern = '%%%s' % filter_['value']
+    else:
+        return None
+    return sql.and_(is_string, text.ilike(pattern))
+
+
 def _filter(model, query, hints):
     """Apply filtering to a query.
 
@@ -337,10 +458,41 @@ def _filter(model, query, hints):
         satisfied_filters.append(filter_)
         return query.filter(col == filter_val)
 
+    def extra_filter(model, query, filter_, satisfied_filters):
+        """Apply a filter on an attribute kept in the extra column.
+
+        :param model: the table model in question
+        :param query: query to apply filters to
+        :param dict filter_: describes this filter
+        :param list satisfied_filters: filter_ will be added if it is
+                                       satisfied.
+
+        :returns query: query updated to add the filter, if the database can
+                        look into the extra column
+
+        """
+        # NOTE: Only DictBase models are known to return the keys of their
+        # extra column as attributes, and nothing else that isn't a column.
+        if (not issubclass(model, DictBase) or
+                not hasattr(model, 'extra') or
+                not _EXTRA_KEY_RE.match(filter_['name'])):
+            return query
+        dialect = _json_dialect(query)
+        if dialect is None:
+            return query
+        term = _extra_filter_term(dialect, model.extra, filter_)
+        if term is None:
+            return query
+
+        satisfied_filters.append(filter_)
+        return query.filter(term)
+
     try:
         satisfied_filters = []
         for filter_ in hints.filters:
             if filter_['name'] not in model.attributes:
+                query = extra_filter(model, query, filter_,
+                                     satisfied_filters)
                 continue
             if filter_['comparator'] == 'equals':
                 query = exact_filter(model, query, filter_,
@@ -359,26 +511,52 @@ def _filter(model, query, hints):
         return
 
 
+def _paginate(model, query, hints):
+    """Apply keyset pagination to a query.
+
+    If a limit or marker has been requested, the query is ordered by ID so
+    that successive pages are stable, and any entities up to and including
+    the marker are skipped.
+
+    :param model: table model
+    :param query: query to apply pagination to
+    :param hints: contains the limit and marker details.
+
+    :returns: updated query
+
+    """
+    id_column = getattr(model, 'id', None)
+    if id_column is None or (hints.limit is None and hints.marker is None):
+        return query
+
+    query = query.order_by(id_column)
+    if hints.marker is not None:
+        query = query.filter(id_column > hints.marker)
+    return query
+
+
 def _limit(query, hints):
     """Apply a limit to a query.
 
+    If a limit is set, the query is run for one more row than the limit, so
+    that whether the list was truncated is known without having to count all
+    the rows matching the query.
+
     :param query: query to apply filters to
     :param hints: contains the list of filters and limit details.
 
-    :returns: updated query
+    :returns: updated query, or the list of rows if a limit was applied
 
     """
-    # NOTE(henry-nash): If we were to implement pagination, then we
-    # we would expand this method to support pagination and limiting.
-
-    # If we satisfied all the filters, set an upper limit if supplied
-    if hints.limit:
-        original_len = query.count()
-        limit_query = query.limit(hints.limit['limit'])
-        if limit_query.count() < original_len:
-            hints.limit['truncated'] = True
-            query = limit_query
-    return query
+    if not hints.limit:
+        return query
+
+    limit = hints.limit['limit']
+    refs = query.limit(limit + 1).all()
+    if len(refs) > limit:
+        hints.limit['truncated'] = True
+        refs = refs[:limit]
+    return refs
 
 
 def filter_limit_query(model, query, hints):
@@ -392,7 +570,8 @@ def filter_limit_query(model, query, hints):
                   satisfied here will be removed so that the caller will
                   know if any filters remain.
 
-    :returns: updated query
+    :returns: updated query, or the list of matching rows if a limit was
+              applied. Either can be iterated over.
 
     """
     if hints is None:
@@ -405,6 +584,10 @@ def filter_limit_query(model, query, hints):
         # Nothing's going to match, so don't bother with the query.
         return []
 
+    # The marker can be applied even if some filters are unsatisfied, since
+    # the controller will re-apply it anyway once it has done the filtering.
+    query = _paginate(model, query, hints)
+
     # NOTE(henry-nash): Any unsatisfied filters will have been left in
     # the hints list for the controller to handle. We can only try and
     # limit here if all the filters are already satisfied since, if not,
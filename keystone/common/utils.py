@@ -21,12 +21,15 @@ import collections
 import grp
 import hashlib
 import itertools
+import multiprocessing
 import os
 import pwd
+import types
 import uuid
 
 from oslo_log import log
 from oslo_serialization import jsonutils
+from oslo_utils import importutils
 from oslo_utils import reflection
 from oslo_utils import strutils
 from oslo_utils import timeutils
@@ -39,6 +42,8 @@ import keystone.conf
 from keystone import exception
 from keystone.i18n import _, _LE, _LW
 
+ujson = importutils.try_import('ujson')
+
 
 CONF = keystone.conf.CONF
 LOG = log.getLogger(__name__)
@@ -86,6 +91,30 @@ def flatten_dict(d, parent_key=''):
     return dict(items)
 
 
+def get_flattened(d, key):
+    """Get a value of a nested dictionary by its flattened key.
+
+    Returns the same as ``flatten_dict(d).get(key)``, but only walks the
+    dictionaries the key can be in instead of copying all of them.
+
+    """
+    value = d.get(key)
+    if value is not None and not isinstance(value, collections.MutableMapping):
+        return value
+    # The key may be made of the keys of nested dictionaries, joined by dots,
+    # and those keys may contain dots themselves.
+    parent_key, dot, child_key = key.partition('.')
+    while dot:
+        child = d.get(parent_key)
+        if isinstance(child, collections.MutableMapping):
+            value = get_flattened(child, child_key)
+            if value is not None:
+                return value
+        next_key, dot, child_key = child_key.partition('.')
+        parent_key = parent_key + '.' + next_key
+    return None
+
+
 class SmarterEncoder(jsonutils.json.JSONEncoder):
     """Help for JSON encoding dict-like objects."""
 
@@ -95,6 +124,86 @@ class SmarterEncoder(jsonutils.json.JSONEncoder):
         return super(SmarterEncoder, self).default(obj)
 
 
+def _is_json_native(obj):
+    """Whether an object only holds types that JSON represents natively."""
+    pending = [obj]
+    while pending:
+        obj = pending.pop()
+        if isinstance(obj, dict):
+            if not all(isinstance(k, six.string_types) for k in obj):
+                return False
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            pending.extend(obj)
+        elif not (obj is None or
+                  isinstance(obj, six.string_types + six.integer_types +
+                             (bool, float))):
+            return False
+    return True
+
+
+def dump_json_as_bytes(obj):
+    """Serialize an object to JSON, using the configured encoder.
+
+    The `ujson` encoder is used if configured and available, and if the
+    object only holds types that JSON represents natively. `ujson` encodes
+    other types, such as datetimes, differently from :class:`SmarterEncoder`,
+    so anything else is serialized with the standard library encoder.
+
+    """
+    if (CONF.json_encoder == 'ujson' and ujson is not None and
+            _is_json_native(obj)):
+        try:
+            return ujson.dumps(
+                obj, escape_forward_slashes=False).encode('utf-8')
+        except (TypeError, ValueError, OverflowError):  # nosec
+            # Not something ujson knows how to encode, so fall back to the
+            # encoder that does.
+            pass
+    return jsonutils.dump_as_bytes(obj, cls=SmarterEncoder)
+
+
+def is_json_stream(obj):
+    """Whether a dict holds a generator, to be serialized incrementally."""
+    return isinstance(obj, dict) and any(
+        isinstance(value, types.GeneratorType) for value in obj.values())
+
+
+def iter_json_as_bytes(obj, chunk_size=100):
+    """Serialize a dict holding generators to JSON incrementally.
+
+    Each generator is serialized as a JSON array, at most `chunk_size`
+    members at a time, as it is consumed, so that neither the complete
+    document nor all the members have to be held in memory. The output is
+    identical to that of :func:`dump_json_as_bytes` for the equivalent dict
+    of lists, when using the standard library encoder.
+
+    :param obj: the dict to serialize
+    :param chunk_size: the maximum number of members serialized in one chunk
+    :returns: generator yielding the JSON document as chunks of bytes
+
+    """
+    yield b'{'
+    for index, (key, value) in enumerate(obj.items()):
+        prefix = b', ' if index else b''
+        yield prefix + dump_json_as_bytes(key) + b': '
+        if not isinstance(value, types.GeneratorType):
+            yield dump_json_as_bytes(value)
+            continue
+
+        yield b'['
+        separator = b''
+        while True:
+            chunk = list(itertools.islice(value, chunk_size))
+            if not chunk:
+                break
+            yield separator + b', '.join(
+                dump_json_as_bytes(member) for member in chunk)
+            separator = b', '
+        yield b']'
+    yield b'}'
+
+
 class PKIEncoder(SmarterEncoder):
     """Special encoder to make token JSON a bit shorter."""
 
@@ -143,6 +252,51 @@ def hash_password(password):
         password_utf8, rounds=CONF.crypt_strength)
 
 
+def _hash_password_with_rounds(args):
+    # NOTE: This runs in a worker process, so it must not depend on CONF
+    # having been loaded there; everything it needs is passed in.
+    password_utf8, rounds = args
+    return passlib.hash.sha512_crypt.encrypt(password_utf8, rounds=rounds)
+
+
+def hash_user_passwords(users, processes=1):
+    """Hash the passwords of a list of user dicts.
+
+    Hashing is deliberately expensive, so when importing a large number of
+    users the work is spread across a pool of worker processes. The passed-in
+    dicts are not modified.
+
+    :param users: list of user dicts, some of which may contain a password
+    :param processes: number of worker processes to hash with; ``1`` hashes
+                      in the calling process and ``0`` or ``None`` uses one
+                      process per CPU
+    :returns: list of user dicts with hashed passwords, in the same order
+
+    """
+    indexes = [i for i, user in enumerate(users)
+               if user.get('password') is not None]
+    if not indexes:
+        return list(users)
+
+    work = [(verify_length_and_trunc_password(
+        users[i]['password']).encode('utf-8'), CONF.crypt_strength)
+        for i in indexes]
+    if processes == 1 or len(work) == 1:
+        hashed = [_hash_password_with_rounds(w) for w in work]
+    else:
+        pool = multiprocessing.Pool(processes=processes or None)
+        try:
+            hashed = pool.map(_hash_password_with_rounds, work)
+        finally:
+            pool.close()
+            pool.join()
+
+    result = list(users)
+    for i, password in zip(indexes, hashed):
+        result[i] = dict(users[i], password=password)
+    return result
+
+
 def check_password(password, hashed):
     """Check that a plaintext password matches hashed.
 
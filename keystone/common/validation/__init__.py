@@ -14,6 +14,24 @@
 from keystone.common.validation import validators
 
 
+# Validators for each schema, keyed by id(schema). The schema is kept with
+# its validator so that the id can't be reused by another schema.
+_SCHEMA_VALIDATORS = {}
+
+
+def _get_schema_validator(schema):
+    try:
+        cached_schema, schema_validator = _SCHEMA_VALIDATORS[id(schema)]
+        if cached_schema is schema:
+            return schema_validator
+    except KeyError:  # nosec
+        # It just hasn't been compiled yet.
+        pass
+    schema_validator = validators.SchemaValidator(schema)
+    _SCHEMA_VALIDATORS[id(schema)] = (schema, schema_validator)
+    return schema_validator
+
+
 def lazy_validate(request_body_schema, resource_to_validate):
     """A non-decorator way to validate a request, to be used inline.
 
@@ -26,7 +44,7 @@ def lazy_validate(request_body_schema, resource_to_validate):
                        signature
 
     """
-    schema_validator = validators.SchemaValidator(request_body_schema)
+    schema_validator = _get_schema_validator(request_body_schema)
     schema_validator.validate(resource_to_validate)
 
 
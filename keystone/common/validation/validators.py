@@ -16,10 +16,14 @@ import re
 import jsonschema
 from oslo_config import cfg
 from oslo_log import log
+from oslo_utils import importutils
 import six
 
 from keystone import exception
-from keystone.i18n import _, _LE
+from keystone.i18n import _, _LE, _LW
+
+
+fastjsonschema = importutils.try_import('fastjsonschema')
 
 
 CONF = cfg.CONF
@@ -49,26 +53,83 @@ def validate_password(password):
             raise exception.PasswordValidationError(detail=detail)
 
 
+def _format_checks(format_checker):
+    """Map each format to a function checking it as format_checker does."""
+    def check(name):
+        return lambda value: format_checker.conforms(value, name)
+    return dict((name, check(name)) for name in format_checker.checkers)
+
+
 class SchemaValidator(object):
-    """Resource reference validator class."""
+    """Resource reference validator class.
+
+    Creating a validator means compiling the schema, so validators should be
+    created once per schema and reused (see
+    :func:`keystone.common.validation.lazy_validate`).
+
+    """
 
     validator_org = jsonschema.Draft4Validator
 
+    # NOTE(lbragstad): If at some point in the future we want to extend
+    # our validators to include something specific we need to check for,
+    # we can do it here. Nova's V3 API validators extend the validator to
+    # include `self._validate_minimum` and `self._validate_maximum`. This
+    # would be handy if we needed to check for something the jsonschema
+    # didn't by default. See the Nova V3 validator for details on how this
+    # is done.
+    validator_cls = jsonschema.validators.extend(validator_org, {})
+    format_checker = jsonschema.FormatChecker()
+
+    # NOTE: fastjsonschema follows the draft given in the schema, and draft-07
+    # otherwise, and has its own rules for formats. Both are pinned to those
+    # of the jsonschema validator, so that it never accepts what jsonschema
+    # would reject.
+    fast_schema_draft = 'http://json-schema.org/draft-04/schema#'
+    fast_formats = _format_checks(format_checker)
+
     def __init__(self, schema):
-        # NOTE(lbragstad): If at some point in the future we want to extend
-        # our validators to include something specific we need to check for,
-        # we can do it here. Nova's V3 API validators extend the validator to
-        # include `self._validate_minimum` and `self._validate_maximum`. This
-        # would be handy if we needed to check for something the jsonschema
-        # didn't by default. See the Nova V3 validator for details on how this
-        # is done.
-        validators = {}
-        validator_cls = jsonschema.validators.extend(self.validator_org,
-                                                     validators)
-        fc = jsonschema.FormatChecker()
-        self.validator = validator_cls(schema, format_checker=fc)
+        self.schema = schema
+        self.validator = self.validator_cls(
+            schema, format_checker=self.format_checker)
+        self._fast_validator = None
+
+    def _get_fast_validator(self):
+        """Return a validator compiled by fastjsonschema, if configured.
+
+        fastjsonschema generates code for each schema, which is considerably
+        faster at accepting valid input than jsonschema. Its results are only
+        trusted when it accepts the input, so that any error reported to the
+        user is still the one from jsonschema.
+
+        """
+        if (CONF.json_schema_validator != 'fastjsonschema' or
+                not fastjsonschema):
+            return None
+        if self._fast_validator is None:
+            definition = dict(self.schema)
+            definition['$schema'] = self.fast_schema_draft
+            try:
+                # The defaults must not be filled in, as jsonschema doesn't.
+                self._fast_validator = fastjsonschema.compile(
+                    definition, formats=self.fast_formats, use_default=False)
+            except Exception:
+                LOG.warning(_LW('Unable to compile schema with '
+                                'fastjsonschema, jsonschema will be used '
+                                'instead.'), exc_info=True)
+                self._fast_validator = False
+        return self._fast_validator or None
 
     def validate(self, *args, **kwargs):
+        fast_validator = self._get_fast_validator()
+        if fast_validator is not None:
+            try:
+                fast_validator(*args, **kwargs)
+                return
+            except fastjsonschema.JsonSchemaException:  # nosec
+                # Let jsonschema have the final say, and build the error.
+                pass
+
         try:
             self.validator.validate(*args, **kwargs)
         except jsonschema.ValidationError as ex:
@@ -712,6 +712,7 @@ def render_response(body=None, status=None, headers=None, method=None):
         headers = list(headers)
     headers.append(('Vary', 'X-Auth-Token'))
 
+    app_iter = None
     if body is None:
         body = b''
         status = status or (http_client.NO_CONTENT,
@@ -724,7 +725,13 @@ def render_response(body=None, status=None, headers=None, method=None):
             content_type = None
 
         if content_type is None or content_type in JSON_ENCODE_CONTENT_TYPES:
-            body = jsonutils.dump_as_bytes(body, cls=utils.SmarterEncoder)
+            if utils.is_json_stream(body):
+                # NOTE: The members of the collection are only read as the
+                # response is sent, so the response has no Content-Length.
+                app_iter = utils.iter_json_as_bytes(body)
+                body = None
+            else:
+                body = utils.dump_json_as_bytes(body)
             if content_type is None:
                 headers.append(('Content-Type', 'application/json'))
         status = status or (http_client.OK,
@@ -760,9 +767,14 @@ def render_response(body=None, status=None, headers=None, method=None):
 
     headers = _convert_to_str(headers)
 
-    resp = webob.Response(body=body,
-                          status='%d %s' % status,
-                          headerlist=headers)
+    if app_iter is not None:
+        resp = webob.Response(app_iter=app_iter,
+                              status='%d %s' % status,
+                              headerlist=headers)
+    else:
+        resp = webob.Response(body=body,
+                              status='%d %s' % status,
+                              headerlist=headers)
 
     if method and method.upper() == 'HEAD':
         # NOTE(morganfainberg): HEAD requests should return the same status
@@ -777,12 +789,16 @@ def render_response(body=None, status=None, headers=None, method=None):
         resp.body = b''
         for header, value in stored_headers.items():
             resp.headers[header] = value
+        if app_iter is not None:
+            # Like the equivalent GET, which is streamed, the response has no
+            # Content-Length, and the collection is never read.
+            del resp.headers['Content-Length']
 
     return resp
 
 
-def render_exception(error, context=None, request=None, user_locale=None):
-    """Form a WSGI response based on the current error."""
+def render_error(error, user_locale=None):
+    """Form the ``error`` object describing an error."""
     error_message = error.args[0]
     message = oslo_i18n.translate(error_message, desired_locale=user_locale)
     if message is error_message:
@@ -790,11 +806,16 @@ def render_exception(error, context=None, request=None, user_locale=None):
         # convert to a string.
         message = six.text_type(message)
 
-    body = {'error': {
+    return {
         'code': error.code,
         'title': error.title,
         'message': message,
-    }}
+    }
+
+
+def render_exception(error, context=None, request=None, user_locale=None):
+    """Form a WSGI response based on the current error."""
+    body = {'error': render_error(error, user_locale=user_locale)}
     headers = []
     if isinstance(error, exception.AuthPluginException):
         body['error']['identity'] = error.authentication
@@ -12,7 +12,7 @@
 
 import logging
 
-from oslo_cache import core as cache
+from oslo_cache import core as oslo_cache
 from oslo_config import cfg
 from oslo_log import log
 import oslo_messaging
@@ -21,10 +21,12 @@ from osprofiler import opts as profiler
 
 from keystone.conf import assignment
 from keystone.conf import auth
+from keystone.conf import cache
 from keystone.conf import catalog
 from keystone.conf import credential
 from keystone.conf import default
 from keystone.conf import domain_config
+from keystone.conf import ec2
 from keystone.conf import endpoint_filter
 from keystone.conf import endpoint_policy
 from keystone.conf import eventlet_server
@@ -35,6 +37,7 @@ from keystone.conf import identity_mapping
 from keystone.conf import kvs
 from keystone.conf import ldap
 from keystone.conf import memcache
+from keystone.conf import metrics
 from keystone.conf import oauth1
 from keystone.conf import os_inherit
 from keystone.conf import paste_deploy
@@ -48,6 +51,7 @@ from keystone.conf import shadow_users
 from keystone.conf import signing
 from keystone.conf import token
 from keystone.conf import tokenless_auth
+from keystone.conf import totp
 from keystone.conf import trust
 
 
@@ -57,10 +61,12 @@ CONF = cfg.CONF
 conf_modules = [
     assignment,
     auth,
+    cache,
     catalog,
     credential,
     default,
     domain_config,
+    ec2,
     endpoint_filter,
     endpoint_policy,
     eventlet_server,
@@ -71,6 +77,7 @@ conf_modules = [
     kvs,
     ldap,
     memcache,
+    metrics,
     oauth1,
     os_inherit,
     paste_deploy,
@@ -84,6 +91,7 @@ conf_modules = [
     signing,
     token,
     tokenless_auth,
+    totp,
     trust,
 ]
 
@@ -138,7 +146,7 @@ def configure(conf=None):
     auth.setup_authentication()
 
     # add oslo.cache related config options
-    cache.configure(conf)
+    oslo_cache.configure(conf)
 
 
 def set_external_opts_defaults():
@@ -172,7 +180,7 @@ def set_external_opts_defaults():
     # TODO(morganfainberg): Fix this to not use internal interface when
     # oslo.cache has proper interface to set defaults added. This is
     # just a bad way to do this.
-    opts = cache._opts.list_opts()
+    opts = oslo_cache._opts.list_opts()
     for opt_list in opts:
         if opt_list[0] == 'cache':
             for o in opt_list[1]:
@@ -0,0 +1,74 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+
+from keystone.conf import utils
+
+
+# NOTE: The `[cache]` section is owned by oslo.cache, these are the options
+# that only apply to keystone's use of it.
+
+region_id_cache_time = cfg.IntOpt(
+    'region_id_cache_time',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of seconds that each keystone process may keep using the last known
+invalidation ID of a cache region before reading it from the cache backend
+again. Every cache key includes the ID of its region, so without this every
+cache lookup costs an additional round trip to the cache backend. A region
+invalidated by this process is seen immediately, but one invalidated by
+another keystone process may continue to be served from the cache for up to
+this many seconds. A value of 0 means the ID is read on every lookup.
+"""))
+
+local_cache_size = cfg.IntOpt(
+    'local_cache_size',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Maximum number of values that each keystone process keeps in memory for each
+cache region, in front of the cache backend. Values that are looked up often,
+such as roles, domains and the catalog, can then be served without a round
+trip to the cache backend. The least recently used values are evicted first.
+A value of 0 disables the in-process cache.
+"""))
+
+local_cache_time = cfg.IntOpt(
+    'local_cache_time',
+    default=30,
+    min=0,
+    help=utils.fmt("""
+Number of seconds that each keystone process keeps a value in its in-process
+cache. Invalidating a whole region is seen straight away (see
+`[cache] region_id_cache_time`), but a single value deleted from the cache by
+another keystone process may still be served from the in-process cache of
+this one for up to this many seconds. This has no effect unless `[cache]
+local_cache_size` is set.
+"""))
+
+
+GROUP_NAME = __name__.split('.')[-1]
+ALL_OPTS = [
+    region_id_cache_time,
+    local_cache_size,
+    local_cache_time,
+]
+
+
+def register_opts(conf):
+    conf.register_opts(ALL_OPTS, group=GROUP_NAME)
+
+
+def list_opts():
+    return {GROUP_NAME: ALL_OPTS}
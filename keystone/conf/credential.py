@@ -46,12 +46,25 @@ share this repository with the repository used to manage keys for Fernet
 tokens.
 """))
 
+decrypted_cache_time = cfg.IntOpt(
+    'decrypted_cache_time',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of seconds that each keystone process keeps decrypted credential blobs
+in memory, so that listing or reading the same credentials again doesn't
+decrypt them again. Decrypted blobs are never written to the cache backend.
+Since a credential is encrypted again whenever it changes, changed credentials
+are always decrypted afresh. A value of 0 disables this.
+"""))
+
 
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
     driver,
     provider,
-    key_repository
+    key_repository,
+    decrypted_cache_time,
 ]
 
 
@@ -227,6 +227,54 @@ notification_opt_out=identity.user.create
 notification_opt_out=identity.authenticate.success
 """))
 
+response_streaming = cfg.BoolOpt(
+    'response_streaming',
+    default=False,
+    help=utils.fmt("""
+Stream the JSON responses of collections that can be read incrementally, such
+as unpaginated listings of users from SQL, serializing each member as it is
+read from the database. This keeps memory usage flat and the time to first
+byte low when listing very large collections, at the cost of the response no
+longer carrying a `Content-Length` header, and of errors that occur once the
+response has started no longer being reported to the client.
+"""))
+
+json_encoder = cfg.StrOpt(
+    'json_encoder',
+    default='json',
+    choices=['json', 'ujson'],
+    help=utils.fmt("""
+The library used to serialize JSON response bodies. The `ujson` encoder is
+considerably faster for large responses, but must be installed separately; if
+it is not available, or the response holds values that JSON does not represent
+natively (such as dates), keystone falls back to the standard library `json`
+encoder.
+"""))
+
+json_schema_validator = cfg.StrOpt(
+    'json_schema_validator',
+    default='jsonschema',
+    choices=['jsonschema', 'fastjsonschema'],
+    help=utils.fmt("""
+The library used to validate request bodies against their JSON schema. The
+`fastjsonschema` library generates code for each schema and is considerably
+faster, but must be installed separately. When it rejects a request body, the
+body is validated again with `jsonschema`, which has the final say and
+provides the error returned to the client. If `fastjsonschema` is not
+available, `jsonschema` is used.
+"""))
+
+lazy_load_drivers = cfg.BoolOpt(
+    'lazy_load_drivers',
+    default=False,
+    help=utils.fmt("""
+If set to true, the backend driver of each subsystem is loaded and initialized
+the first time it is used, rather than when keystone starts. This shortens the
+start up of processes that only ever use some of the subsystems, such as WSGI
+workers that mostly validate tokens, but means that an invalid driver
+configuration is only reported when the driver is first needed.
+"""))
+
 
 GROUP_NAME = 'DEFAULT'
 ALL_OPTS = [
@@ -247,6 +295,10 @@ ALL_OPTS = [
     default_publisher_id,
     notification_format,
     notification_opt_out,
+    response_streaming,
+    json_encoder,
+    json_schema_validator,
+    lazy_load_drivers,
 ]
 
 
@@ -0,0 +1,60 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+
+from keystone.conf import utils
+
+
+credential_cache_time = cfg.IntOpt(
+    'credential_cache_time',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of seconds that each keystone process keeps the decrypted EC2
+credential of an access key in memory after authenticating a request signed
+with it, so that subsequent requests signed with the same access key don't
+have to read and decrypt the credential again. Changes made to the credential
+through this keystone process are seen straight away, but those made through
+another keystone process may not be seen by this one for up to this many
+seconds. A value of 0 disables the cache.
+"""))
+
+token_cache_time = cfg.IntOpt(
+    'token_cache_time',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of seconds during which each keystone process returns the same token
+for validly signed EC2 and S3 requests of the same user, project and trust,
+instead of issuing a new token for each of them. This saves looking up the
+user, project, roles and catalog of every request from services that
+authenticate each request they receive, such as object storage gateways. The
+token is still validated, so a revoked token is never returned. This should
+be much shorter than `[token] expiration`. A value of 0 issues a new token
+every time.
+"""))
+
+
+GROUP_NAME = __name__.split('.')[-1]
+ALL_OPTS = [
+    credential_cache_time,
+    token_cache_time,
+]
+
+
+def register_opts(conf):
+    conf.register_opts(ALL_OPTS, group=GROUP_NAME)
+
+
+def list_opts():
+    return {GROUP_NAME: ALL_OPTS}
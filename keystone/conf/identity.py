@@ -108,6 +108,17 @@ list_limit = cfg.IntOpt(
 Maximum number of entities that will be returned in an identity collection.
 """))
 
+password_hash_processes = cfg.IntOpt(
+    'password_hash_processes',
+    default=1,
+    min=0,
+    help=utils.fmt("""
+Number of worker processes used to hash passwords when users are created in
+bulk (for example, by `keystone-manage user_import`). Set to 0 to use one
+process per CPU. Single user creation through the API always hashes in the
+calling process.
+"""))
+
 
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
@@ -120,6 +131,7 @@ ALL_OPTS = [
     cache_time,
     max_password_length,
     list_limit,
+    password_hash_processes,
 ]
 
 
@@ -0,0 +1,65 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+
+from keystone.conf import utils
+
+
+enabled = cfg.BoolOpt(
+    'enabled',
+    default=False,
+    help=utils.fmt("""
+Record how long manager methods, driver calls, SQL sessions and LDAP
+operations take, and count cache hits and misses. Each keystone process keeps
+its own histograms, which an administrator can read in the Prometheus text
+format from `GET /v3/metrics`. Drivers and caches loaded before this option is
+enabled are not instrumented until keystone is restarted.
+"""))
+
+statsd_host = cfg.StrOpt(
+    'statsd_host',
+    help=utils.fmt("""
+Host of a statsd daemon to also send every measurement to, over UDP. If unset,
+measurements are only kept in the process.
+"""))
+
+statsd_port = cfg.PortOpt(
+    'statsd_port',
+    default=8125,
+    help=utils.fmt("""
+Port of the statsd daemon set by `[metrics] statsd_host`.
+"""))
+
+statsd_prefix = cfg.StrOpt(
+    'statsd_prefix',
+    default='keystone',
+    help=utils.fmt("""
+Prefix of the name of every measurement sent to statsd.
+"""))
+
+
+GROUP_NAME = __name__.split('.')[-1]
+ALL_OPTS = [
+    enabled,
+    statsd_host,
+    statsd_port,
+    statsd_prefix,
+]
+
+
+def register_opts(conf):
+    conf.register_opts(ALL_OPTS, group=GROUP_NAME)
+
+
+def list_opts():
+    return {GROUP_NAME: ALL_OPTS}
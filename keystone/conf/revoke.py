@@ -51,6 +51,29 @@ Time to cache the revocation list and the revocation events (in seconds). This
 has no effect unless global and `[revoke] caching` are both enabled.
 """))
 
+prune_interval = cfg.IntOpt(
+    'prune_interval',
+    default=300,
+    min=0,
+    help=utils.fmt("""
+The minimum number of seconds between two deletions of expired revocation
+events by each keystone process. Expired events are deleted after a revocation
+has been recorded, in separate transactions of at most `[revoke]
+prune_batch_size` events, and failures are only logged. Set this to 0 to only
+delete them with `keystone-manage revocation_flush`, which should then be run
+periodically, for example from cron.
+"""))
+
+prune_batch_size = cfg.IntOpt(
+    'prune_batch_size',
+    default=1000,
+    min=0,
+    help=utils.fmt("""
+The maximum number of expired revocation events deleted in each transaction.
+Smaller batches hold locks on the revocation event table for less time. Set
+this to 0 to delete every expired event in a single transaction.
+"""))
+
 
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
@@ -58,6 +81,8 @@ ALL_OPTS = [
     expiration_buffer,
     caching,
     cache_time,
+    prune_interval,
+    prune_batch_size,
 ]
 
 
@@ -167,6 +167,42 @@ Enable storing issued token data to token validation cache so that first token
 validation doesn't actually cause full validation cycle.
 """))
 
+validation_cache_time = cfg.IntOpt(
+    'validation_cache_time',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of seconds that each keystone process keeps validated non-persistent
+tokens (such as `fernet` tokens) in memory, along with the revocation events
+they were checked against. Validating such a token again within that time
+neither decrypts it nor checks it against every revocation event, only against
+the events recorded since. A value of 0 disables this cache.
+"""))
+
+scope_cache_time = cfg.IntOpt(
+    'scope_cache_time',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of seconds that the scope, user and roles of v3 tokens are cached for,
+by user and scope, so that issuing or validating another token of the same
+user and scope does not look them up again. Tokens obtained with a trust, an
+OAuth1 access token or federated authentication are not cached. The cache is
+kept in the region of computed role assignments, so it is invalidated whenever
+role assignments change, as well as when users, projects, domains or roles do.
+Requires `[cache] enabled` and `[role] caching`. A value of 0 disables this
+cache.
+"""))
+
+max_batch_validation = cfg.IntOpt(
+    'max_batch_validation',
+    default=100,
+    min=1,
+    help=utils.fmt("""
+Maximum number of tokens that can be validated by a single
+`POST /v3/auth/tokens/validate` request.
+"""))
+
 GROUP_NAME = __name__.split('.')[-1]
 ALL_OPTS = [
     bind,
@@ -181,6 +217,9 @@ ALL_OPTS = [
     hash_algorithm,
     infer_roles,
     cache_on_issue,
+    validation_cache_time,
+    scope_cache_time,
+    max_batch_validation,
 ]
 
 
@@ -0,0 +1,59 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+
+from keystone.conf import utils
+
+
+skew_windows = cfg.IntOpt(
+    'skew_windows',
+    default=0,
+    min=0,
+    max=10,
+    help=utils.fmt("""
+Number of 30 second time steps, before and after the current one, whose TOTP
+passcodes are also accepted. This allows for clocks of the devices generating
+passcodes being slightly off, and for passcodes entered just before the time
+step ends, at the cost of each passcode remaining valid for longer. A value of
+0 only accepts the passcode of the current time step.
+"""))
+
+secret_cache_time = cfg.IntOpt(
+    'secret_cache_time',
+    default=0,
+    min=0,
+    help=utils.fmt("""
+Number of seconds that each keystone process keeps the decrypted and decoded
+TOTP secrets of a user in memory after authenticating them, so that
+subsequent TOTP authentication requests of the same user don't have to read
+and decrypt all of their credentials again. Changes made to a user's
+credentials through this keystone process are seen straight away, but those
+made through another keystone process may not be seen by this one for up to
+this many seconds. The passcodes generated from those secrets are also kept
+for this long. A value of 0 disables the cache.
+"""))
+
+
+GROUP_NAME = __name__.split('.')[-1]
+ALL_OPTS = [
+    skew_windows,
+    secret_cache_time,
+]
+
+
+def register_opts(conf):
+    conf.register_opts(ALL_OPTS, group=GROUP_NAME)
+
+
+def list_opts():
+    return {GROUP_NAME: ALL_OPTS}
@@ -33,7 +33,10 @@ Glance to list images needed to perform the requested task.
 """
 
 import abc
+import collections
 import sys
+import threading
+import time
 import uuid
 
 from keystoneclient.contrib.ec2 import utils as ec2_utils
@@ -45,17 +48,30 @@ from keystone.common import controller
 from keystone.common import dependency
 from keystone.common import utils
 from keystone.common import wsgi
+import keystone.conf
 from keystone import exception
 from keystone.i18n import _
 
+
+CONF = keystone.conf.CONF
+
 CRED_TYPE_EC2 = 'ec2'
 
+# The maximum number of tokens kept for reuse by each controller.
+_TOKEN_CACHE_SIZE = 1000
+
 
 @dependency.requires('assignment_api', 'catalog_api', 'credential_api',
                      'identity_api', 'resource_api', 'role_api',
                      'token_provider_api')
 @six.add_metaclass(abc.ABCMeta)
 class Ec2ControllerCommon(object):
+    def __init__(self, *args, **kwargs):
+        super(Ec2ControllerCommon, self).__init__(*args, **kwargs)
+        # Recently issued tokens, see _get_cached_token().
+        self._token_cache = collections.OrderedDict()
+        self._token_cache_lock = threading.Lock()
+
     def check_signature(self, creds_ref, credentials):
         signer = ec2_utils.Ec2Signer(creds_ref['secret'])
         signature = signer.generate(credentials)
@@ -110,10 +126,10 @@ class Ec2ControllerCommon(object):
         """
         raise exception.NotImplemented()
 
-    def _authenticate(self, credentials=None, ec2credentials=None):
-        """Common code shared between the V2 and V3 authenticate methods.
+    def _check_credentials(self, credentials=None, ec2credentials=None):
+        """Check the signature of a signed EC2 request.
 
-        :returns: user_ref, tenant_ref, metadata_ref, roles_ref, catalog_ref
+        :returns: the EC2 credential the request was signed with
         """
         # FIXME(ja): validate that a service token was used!
 
@@ -125,10 +141,54 @@ class Ec2ControllerCommon(object):
             raise exception.Unauthorized(
                 message=_('EC2 signature not supplied.'))
 
-        creds_ref = self._get_credentials(credentials['access'])
+        creds_ref = self._get_credentials(
+            credentials['access'],
+            cache_time=CONF.ec2.credential_cache_time)
         self.check_signature(creds_ref, credentials)
+        return creds_ref
 
-        # TODO(termie): don't create new tokens every time
+    def _get_cached_token(self, creds_ref):
+        """Return a token recently issued for the same credential, if any.
+
+        :returns: a tuple of the token ID and data, or None
+        """
+        key = (creds_ref['user_id'], creds_ref['tenant_id'],
+               creds_ref.get('trust_id'))
+        with self._token_cache_lock:
+            expires, token_id, token_data = self._token_cache.get(
+                key, (0, None, None))
+        if expires < time.time():
+            return None
+
+        # Never hand out a token that has since been revoked, for example
+        # because the user was disabled or lost their role on the project.
+        try:
+            self.token_provider_api.validate_token(token_id)
+        except exception.TokenNotFound:
+            with self._token_cache_lock:
+                self._token_cache.pop(key, None)
+            return None
+        return token_id, token_data
+
+    def _cache_token(self, creds_ref, token_id, token_data):
+        cache_time = CONF.ec2.token_cache_time
+        if not cache_time:
+            return
+        key = (creds_ref['user_id'], creds_ref['tenant_id'],
+               creds_ref.get('trust_id'))
+        with self._token_cache_lock:
+            self._token_cache.pop(key, None)
+            self._token_cache[key] = (time.time() + cache_time, token_id,
+                                      token_data)
+            while len(self._token_cache) > _TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
+
+    def _authenticate(self, creds_ref):
+        """Common code shared between the V2 and V3 authenticate methods.
+
+        :param creds_ref: the EC2 credential the request was signed with
+        :returns: user_ref, tenant_ref, metadata_ref, roles_ref, catalog_ref
+        """
         # TODO(termie): this is copied from TokenController.authenticate
         tenant_ref = self.resource_api.get_project(creds_ref['tenant_id'])
         user_ref = self.identity_api.get_user(creds_ref['user_id'])
@@ -245,16 +305,19 @@ class Ec2ControllerCommon(object):
                 'secret': blob.get('secret'),
                 'trust_id': blob.get('trust_id')}
 
-    def _get_credentials(self, credential_id):
+    def _get_credentials(self, credential_id, cache_time=0):
         """Return credentials from an ID.
 
         :param credential_id: id of credential
+        :param cache_time: number of seconds the decrypted credential may be
+            kept in memory for
         :raises keystone.exception.Unauthorized: when credential id is invalid
             or when the credential type is not ec2
         :returns: credential: dict of ec2 credential.
         """
         ec2_credential_id = utils.hash_access_key(credential_id)
-        cred = self.credential_api.get_credential(ec2_credential_id)
+        cred = self.credential_api.get_credential(ec2_credential_id,
+                                                  cache_time=cache_time)
         if not cred or cred['type'] != CRED_TYPE_EC2:
             raise exception.Unauthorized(
                 message=_('EC2 access key not found.'))
@@ -266,9 +329,14 @@ class Ec2Controller(Ec2ControllerCommon, controller.V2Controller):
 
     @controller.v2_ec2_deprecated
     def authenticate(self, request, credentials=None, ec2Credentials=None):
+        creds_ref = self._check_credentials(credentials=credentials,
+                                            ec2credentials=ec2Credentials)
+        cached_token = self._get_cached_token(creds_ref)
+        if cached_token:
+            return cached_token[1]
+
         (user_ref, tenant_ref, metadata_ref, roles_ref,
-         catalog_ref) = self._authenticate(credentials=credentials,
-                                           ec2credentials=ec2Credentials)
+         catalog_ref) = self._authenticate(creds_ref)
 
         # NOTE(morganfainberg): Make sure the data is in correct form since it
         # might be consumed external to Keystone and this is a v2.0 controller.
@@ -282,6 +350,7 @@ class Ec2Controller(Ec2ControllerCommon, controller.V2Controller):
                                id='placeholder')
         (token_id, token_data) = self.token_provider_api.issue_v2_token(
             auth_token_data, roles_ref, catalog_ref)
+        self._cache_token(creds_ref, token_id, token_data)
         return token_data
 
     @controller.v2_ec2_deprecated
@@ -377,15 +446,21 @@ class Ec2ControllerV3(Ec2ControllerCommon, controller.V3Controller):
         self.check_protection(request, prep_info, ref)
 
     def authenticate(self, context, credentials=None, ec2Credentials=None):
+        creds_ref = self._check_credentials(credentials=credentials,
+                                            ec2credentials=ec2Credentials)
+        cached_token = self._get_cached_token(creds_ref)
+        if cached_token:
+            return render_token_data_response(*cached_token)
+
         (user_ref, project_ref, metadata_ref, roles_ref,
-         catalog_ref) = self._authenticate(credentials=credentials,
-                                           ec2credentials=ec2Credentials)
+         catalog_ref) = self._authenticate(creds_ref)
 
         method_names = ['ec2credential']
 
         token_id, token_data = self.token_provider_api.issue_v3_token(
             user_ref['id'], method_names, project_id=project_ref['id'],
             metadata_ref=metadata_ref)
+        self._cache_token(creds_ref, token_id, token_data)
         return render_token_data_response(token_id, token_data)
 
     @controller.protected(callback=_check_credential_owner_and_user_id_match)
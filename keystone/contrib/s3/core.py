@@ -22,8 +22,10 @@ for the EC2 module for how to generate the required credentials.
 """
 
 import base64
+import collections
 import hashlib
 import hmac
+import threading
 
 import six
 
@@ -31,11 +33,15 @@ from keystone.common import extension
 from keystone.common import json_home
 from keystone.common import utils
 from keystone.common import wsgi
+import keystone.conf
 from keystone.contrib.ec2 import controllers
 from keystone import exception
 from keystone.i18n import _
 
 
+CONF = keystone.conf.CONF
+
+
 EXTENSION_DATA = {
     'name': 'OpenStack S3 API',
     'namespace': 'http://docs.openstack.org/identity/api/ext/'
@@ -53,6 +59,11 @@ EXTENSION_DATA = {
     ]}
 extension.register_admin_extension(EXTENSION_DATA['alias'], EXTENSION_DATA)
 
+# The v4 signing keys most recently derived, keyed by secret, date and region.
+_SIGNING_KEYS = collections.OrderedDict()
+_SIGNING_KEYS_SIZE = 1000
+_SIGNING_KEYS_LOCK = threading.Lock()
+
 
 class S3Extension(wsgi.V3ExtensionRouter):
     def add_routes(self, mapper):
@@ -113,13 +124,35 @@ class S3Controller(controllers.Ec2Controller):
         if len(scope) != 4 or scope[2] != b's3' or scope[3] != b'aws4_request':
             raise exception.Unauthorized(message=_('Invalid EC2 signature.'))
 
+        signed = self._get_signing_key_v4(secret_key, scope[0], scope[1])
+        signature = hmac.new(signed, string_to_sign, hashlib.sha256)
+        return signature.hexdigest()
+
+    def _get_signing_key_v4(self, secret_key, date, region):
+        """Derive the v4 signing key of a secret for a date and region.
+
+        The key only changes daily, so while EC2 credentials are kept in
+        memory (see `[ec2] credential_cache_time`), so are the keys derived
+        from them.
+        """
+        key = (secret_key, date, region)
+        if CONF.ec2.credential_cache_time:
+            with _SIGNING_KEYS_LOCK:
+                signed = _SIGNING_KEYS.get(key)
+            if signed is not None:
+                return signed
+
         def _sign(key, msg):
             return hmac.new(key, msg, hashlib.sha256).digest()
 
-        signed = _sign(('AWS4' + secret_key).encode('utf-8'), scope[0])
-        signed = _sign(signed, scope[1])
-        signed = _sign(signed, scope[2])
+        signed = _sign(('AWS4' + secret_key).encode('utf-8'), date)
+        signed = _sign(signed, region)
+        signed = _sign(signed, b's3')
         signed = _sign(signed, b'aws4_request')
 
-        signature = hmac.new(signed, string_to_sign, hashlib.sha256)
-        return signature.hexdigest()
+        if CONF.ec2.credential_cache_time:
+            with _SIGNING_KEYS_LOCK:
+                _SIGNING_KEYS[key] = signed
+                while len(_SIGNING_KEYS) > _SIGNING_KEYS_SIZE:
+                    _SIGNING_KEYS.popitem(last=False)
+        return signed
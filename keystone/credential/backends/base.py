@@ -17,6 +17,7 @@ import abc
 from oslo_log import log
 import six
 
+from keystone.common import driver_hints
 from keystone import exception
 
 
@@ -103,6 +104,49 @@ class CredentialDriverBase(object):
         """Delete all credentials for a user."""
         self._delete_credentials(lambda cr: cr['user_id'] == user_id)
 
+    def list_credentials_for_key_migration(self, key_hash, marker=None,
+                                           limit=None):
+        """List credentials not encrypted with a key, ordered by ID.
+
+        :param key_hash: hash of the key the credentials should be encrypted
+                         with
+        :param marker: only list credentials with a greater ID than this
+        :param limit: maximum number of credentials to list
+        :returns: a list of credential refs, including their encrypted blob
+
+        """
+        credentials = sorted(
+            (c for c in self.list_credentials(driver_hints.Hints())
+             if c['key_hash'] != key_hash and
+             (marker is None or c['id'] > marker)),
+            key=lambda c: c['id'])
+        return credentials[:limit] if limit else credentials
+
+    def update_encrypted_blobs(self, updates):
+        """Update the encrypted blobs of several credentials at once.
+
+        :param updates: a list of dicts with the `id` of a credential, its
+                        `old_encrypted_blob`, and the new `encrypted_blob` and
+                        `key_hash` to replace it with. Credentials whose
+                        encrypted blob is no longer the old one, because they
+                        were changed in the meantime, are left alone.
+        :returns: the number of credentials updated
+
+        """
+        updated = 0
+        for update in updates:
+            try:
+                credential = self.get_credential(update['id'])
+            except exception.CredentialNotFound:
+                continue
+            if credential['encrypted_blob'] != update['old_encrypted_blob']:
+                continue
+            self.update_credential(
+                update['id'], {'encrypted_blob': update['encrypted_blob'],
+                               'key_hash': update['key_hash']})
+            updated += 1
+        return updated
+
     def _delete_credentials(self, match_fn):
         """Do the actual credential deletion work (default implementation).
 
@@ -12,6 +12,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import sqlalchemy
+
 from keystone.common import driver_hints
 from keystone.common import sql
 from keystone.credential.backends import base
@@ -85,6 +87,43 @@ class Credential(base.CredentialDriverBase):
             ref.extra = new_credential.extra
             return ref.to_dict()
 
+    def list_credentials_for_key_migration(self, key_hash, marker=None,
+                                           limit=None):
+        with sql.session_for_read() as session:
+            query = session.query(CredentialModel)
+            query = query.filter(sqlalchemy.or_(
+                CredentialModel.key_hash != key_hash,
+                CredentialModel.key_hash.is_(None)))
+            if marker is not None:
+                query = query.filter(CredentialModel.id > marker)
+            query = query.order_by(CredentialModel.id)
+            if limit:
+                query = query.limit(limit)
+            return [ref.to_dict() for ref in query]
+
+    def update_encrypted_blobs(self, updates):
+        if not updates:
+            return 0
+        table = CredentialModel.__table__
+        statement = table.update().where(
+            sqlalchemy.and_(
+                table.c.id == sqlalchemy.bindparam('_id'),
+                table.c.encrypted_blob == sqlalchemy.bindparam(
+                    '_old_encrypted_blob'))
+        ).values(encrypted_blob=sqlalchemy.bindparam('_encrypted_blob'),
+                 key_hash=sqlalchemy.bindparam('_key_hash'))
+        params = [{'_id': u['id'],
+                   '_old_encrypted_blob': u['old_encrypted_blob'],
+                   '_encrypted_blob': u['encrypted_blob'],
+                   '_key_hash': u['key_hash']} for u in updates]
+        with sql.session_for_write() as session:
+            result = session.execute(statement, params)
+            if not session.get_bind().dialect.supports_sane_multi_rowcount:
+                # NOTE: The driver can't tell how many rows a multi-row update
+                # matched, so assume they all were.
+                return len(updates)
+            return result.rowcount
+
     def delete_credential(self, credential_id):
         with sql.session_for_write() as session:
             ref = self._get_credential(session, credential_id)
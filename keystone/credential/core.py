@@ -14,7 +14,15 @@
 
 """Main entry point into the Credential service."""
 
+import base64
+import binascii
+import collections
 import json
+import threading
+import time
+
+from oslo_log import log
+import six
 
 from keystone.common import dependency
 from keystone.common import driver_hints
@@ -24,6 +32,30 @@ from keystone import exception
 
 
 CONF = keystone.conf.CONF
+LOG = log.getLogger(__name__)
+
+# The maximum number of values kept in memory by each credential manager.
+_RECENT_SIZE = 10000
+
+
+def decode_totp_secret(secret):
+    """Decode the base32 encoded secret of a TOTP credential.
+
+    :param secret: the blob of a TOTP credential
+    :returns: the secret as bytes
+    :raises TypeError, binascii.Error: if the secret can't be decoded
+    """
+    if isinstance(secret, six.text_type):
+        # NOTE(dstanek): since this may be coming from the JSON stored in the
+        # database it may be UTF-8 encoded
+        secret = secret.encode('utf-8')
+
+    # NOTE(nonameentername): cryptography takes a non base32 encoded value for
+    # TOTP. Add the correct padding to be able to base32 decode
+    while len(secret) % 8 != 0:
+        secret = secret + b'='
+
+    return base64.b32decode(secret)
 
 
 @dependency.provider('credential_api')
@@ -40,23 +72,131 @@ class Manager(manager.Manager):
 
     def __init__(self):
         super(Manager, self).__init__(CONF.credential.driver)
+        # Values derived from decrypted credentials, which callers asked to be
+        # kept in memory for a while, see _get_recent().
+        self._recent = collections.OrderedDict()
+        self._recent_generation = 0
+        self._recent_lock = threading.Lock()
+        # Recently decrypted blobs, keyed by the encrypted blob, see
+        # _decrypt_blobs().
+        self._decrypted = collections.OrderedDict()
+        self._decrypted_lock = threading.Lock()
+
+    def _invalidate_recent(self, user_id=None, credential_id=None):
+        with self._recent_lock:
+            self._recent_generation += 1
+            if user_id is None and credential_id is None:
+                self._recent.clear()
+                return
+            for key, entry in list(self._recent.items()):
+                expires, cached_user_id, credential_ids, value = entry
+                if (cached_user_id == user_id or
+                        credential_id in credential_ids):
+                    del self._recent[key]
+
+    def _get_recent(self, key, cache_time, load):
+        """Return a value derived from credentials, kept in memory for a while.
+
+        :param key: identifies the value
+        :param cache_time: number of seconds to keep the value for, or 0 to
+                           not keep it at all
+        :param load: a function returning a tuple of the ID of the user owning
+                     the credentials, the IDs of the credentials and the value
+                     derived from them. The value is forgotten as soon as any
+                     credential of that user or any of those credentials are
+                     changed through this manager.
+
+        """
+        if not cache_time:
+            return load()[2]
+
+        with self._recent_lock:
+            entry = self._recent.get(key)
+            generation = self._recent_generation
+        if entry and entry[0] > time.time():
+            return entry[3]
+
+        user_id, credential_ids, value = load()
+        with self._recent_lock:
+            # Don't keep the value if any credentials were changed while we
+            # were reading them.
+            if generation == self._recent_generation:
+                self._recent.pop(key, None)
+                self._recent[key] = (time.time() + cache_time, user_id,
+                                     frozenset(credential_ids), value)
+                while len(self._recent) > _RECENT_SIZE:
+                    self._recent.popitem(last=False)
+        return value
+
+    def list_totp_secrets(self, user_id):
+        """List the decoded secrets of the TOTP credentials of a user.
+
+        The secrets are kept in memory for `[totp] secret_cache_time` seconds,
+        and forgotten as soon as any credential of the user is changed through
+        this manager.
+
+        :returns: a list of (credential ID, secret) tuples. Credentials whose
+                  secret can't be decoded are left out.
+
+        """
+        def load():
+            secrets = []
+            for credential in self.list_credentials_for_user(user_id,
+                                                             type='totp'):
+                try:
+                    secrets.append((credential['id'],
+                                    decode_totp_secret(credential['blob'])))
+                except (TypeError, binascii.Error):
+                    LOG.debug('Base32 decode failed for TOTP credential %s',
+                              credential['id'])
+            return user_id, [c for c, secret in secrets], secrets
+
+        return self._get_recent(('totp', user_id),
+                                CONF.totp.secret_cache_time, load)
+
+    def _decrypt_blobs(self, encrypted_blobs):
+        """Decrypt blobs, using those decrypted recently if allowed to."""
+        if not encrypted_blobs:
+            return []
+        cache_time = CONF.credential.decrypted_cache_time
+        if not cache_time:
+            return self.credential_provider_api.decrypt_multi(encrypted_blobs)
+
+        # NOTE: The blobs are encrypted with a random IV, so a blob is only
+        # ever read again if its credential hasn't changed since.
+        now = time.time()
+        decrypted = {}
+        with self._decrypted_lock:
+            for encrypted_blob in encrypted_blobs:
+                expires, blob = self._decrypted.get(encrypted_blob, (0, None))
+                if expires > now:
+                    decrypted[encrypted_blob] = blob
+        missing = [b for b in set(encrypted_blobs) if b not in decrypted]
+        if missing:
+            blobs = self.credential_provider_api.decrypt_multi(missing)
+            decrypted.update(zip(missing, blobs))
+            with self._decrypted_lock:
+                for encrypted_blob, blob in zip(missing, blobs):
+                    self._decrypted[encrypted_blob] = (now + cache_time, blob)
+                while len(self._decrypted) > _RECENT_SIZE:
+                    self._decrypted.popitem(last=False)
+        return [decrypted[b] for b in encrypted_blobs]
+
+    def _decrypt_credentials(self, credentials):
+        """Decrypt a list of credential references in place."""
+        blobs = self._decrypt_blobs(
+            [credential['encrypted_blob'] for credential in credentials])
+        for credential, decrypted_blob in zip(credentials, blobs):
+            if credential['type'] == 'ec2':
+                decrypted_blob = json.loads(decrypted_blob)
+            credential['blob'] = decrypted_blob
+            credential.pop('key_hash', None)
+            credential.pop('encrypted_blob', None)
+        return credentials
 
     def _decrypt_credential(self, credential):
         """Return a decrypted credential reference."""
-        if credential['type'] == 'ec2':
-            decrypted_blob = json.loads(
-                self.credential_provider_api.decrypt(
-                    credential['encrypted_blob'],
-                )
-            )
-        else:
-            decrypted_blob = self.credential_provider_api.decrypt(
-                credential['encrypted_blob']
-            )
-        credential['blob'] = decrypted_blob
-        credential.pop('key_hash', None)
-        credential.pop('encrypted_blob', None)
-        return credential
+        return self._decrypt_credentials([credential])[0]
 
     def _encrypt_credential(self, credential):
         """Return an encrypted credential reference."""
@@ -82,26 +222,35 @@ class Manager(manager.Manager):
         credentials = self.driver.list_credentials(
             hints or driver_hints.Hints()
         )
-        for credential in credentials:
-            credential = self._decrypt_credential(credential)
-        return credentials
+        return self._decrypt_credentials(credentials)
 
     def list_credentials_for_user(self, user_id, type=None):
         """List credentials for a specific user."""
         credentials = self.driver.list_credentials_for_user(user_id, type=type)
-        for credential in credentials:
+        return self._decrypt_credentials(credentials)
+
+    def get_credential(self, credential_id, cache_time=0):
+        """Return a credential reference.
+
+        :param cache_time: if set, the decrypted credential is kept in memory
+                           for this many seconds, and may have been kept from
+                           an earlier call with this set. It is forgotten as
+                           soon as it is changed through this manager.
+
+        """
+        def load():
+            credential = self.driver.get_credential(credential_id)
             credential = self._decrypt_credential(credential)
-        return credentials
+            return credential['user_id'], [credential_id], credential
 
-    def get_credential(self, credential_id):
-        """Return a credential reference."""
-        credential = self.driver.get_credential(credential_id)
-        return self._decrypt_credential(credential)
+        return dict(self._get_recent(('credential', credential_id),
+                                     cache_time, load))
 
     def create_credential(self, credential_id, credential):
         """Create a credential."""
         credential_copy = self._encrypt_credential(credential)
         ref = self.driver.create_credential(credential_id, credential_copy)
+        self._invalidate_recent(user_id=ref['user_id'])
         ref.pop('key_hash', None)
         ref.pop('encrypted_blob', None)
         ref['blob'] = credential['blob']
@@ -129,6 +278,8 @@ class Manager(manager.Manager):
             existing_credential = self.get_credential(credential_id)
             existing_blob = existing_credential['blob']
         ref = self.driver.update_credential(credential_id, credential_copy)
+        self._invalidate_recent(user_id=ref['user_id'],
+                                credential_id=credential_id)
         ref.pop('key_hash', None)
         ref.pop('encrypted_blob', None)
         # If the update request contains a `blob` attribute - we should return
@@ -139,3 +290,18 @@ class Manager(manager.Manager):
         else:
             ref['blob'] = existing_blob
         return ref
+
+    def delete_credential(self, credential_id):
+        """Delete a credential."""
+        self.driver.delete_credential(credential_id)
+        self._invalidate_recent(credential_id=credential_id)
+
+    def delete_credentials_for_project(self, project_id):
+        """Delete all credentials for a project."""
+        self.driver.delete_credentials_for_project(project_id)
+        self._invalidate_recent()
+
+    def delete_credentials_for_user(self, user_id):
+        """Delete all credentials for a user."""
+        self.driver.delete_credentials_for_user(user_id)
+        self._invalidate_recent(user_id=user_id)
@@ -36,3 +36,15 @@ class Provider(object):
         :returns: credential str as plaintext
         :raises: keystone.exception.CredentialEncryptionError
         """
+
+    def decrypt_multi(self, credentials):
+        """Decrypt several credentials.
+
+        Providers may override this to share work between the credentials,
+        for example loading keys only once.
+
+        :param list credentials: credentials to decrypt
+        :returns: list of credential strs as plaintext, in the same order
+        :raises: keystone.exception.CredentialEncryptionError
+        """
+        return [self.decrypt(credential) for credential in credentials]
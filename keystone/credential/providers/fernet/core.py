@@ -11,6 +11,8 @@
 # under the License.
 
 import hashlib
+import os
+import threading
 
 from cryptography import fernet
 from oslo_log import log
@@ -41,7 +43,45 @@ LOG = log.getLogger(__name__)
 MAX_ACTIVE_KEYS = 3
 
 
+# The keys last loaded, along with the state of the key repository they were
+# loaded from, see get_multi_fernet_keys().
+_KEY_RING = (None, None, None)
+_KEY_RING_LOCK = threading.Lock()
+
+
+def _key_repository_state(key_repository):
+    """Return something that changes whenever the key repository does.
+
+    Keys are only ever added, removed or replaced by renaming files in the
+    repository, which changes the repository's modification time, but the
+    key files are compared too in case that time isn't precise enough.
+
+    """
+    try:
+        repository = os.stat(key_repository)
+        files = []
+        for filename in sorted(os.listdir(key_repository)):
+            key_file = os.stat(os.path.join(key_repository, filename))
+            files.append((filename, key_file.st_mtime, key_file.st_size))
+    except OSError:
+        return None
+    return (key_repository, repository.st_mtime, repository.st_ctime,
+            repository.st_mode, tuple(files))
+
+
 def get_multi_fernet_keys():
+    """Return a MultiFernet of the credential keys, and the keys.
+
+    The keys are only loaded again once the key repository has changed.
+
+    """
+    global _KEY_RING
+
+    state = _key_repository_state(CONF.credential.key_repository)
+    cached_state, crypto, keys = _KEY_RING
+    if state is not None and state == cached_state:
+        return crypto, list(keys)
+
     key_utils = fernet_utils.FernetUtils(
         CONF.credential.key_repository, MAX_ACTIVE_KEYS)
     keys = key_utils.load_keys(use_null_key=True)
@@ -49,9 +89,32 @@ def get_multi_fernet_keys():
     fernet_keys = [fernet.Fernet(key) for key in keys]
     crypto = fernet.MultiFernet(fernet_keys)
 
+    if state is not None:
+        with _KEY_RING_LOCK:
+            _KEY_RING = (state, crypto, list(keys))
     return crypto, keys
 
 
+def reencrypt(args):
+    """Encrypt credentials again with the primary key.
+
+    :param args: a tuple of the list of keys, the first of which is the
+                 primary key, and the list of encrypted credentials
+    :returns: the list of credentials encrypted with the primary key
+    """
+    # NOTE: This runs in a worker process of keystone-manage
+    # credential_migrate, so it must not depend on CONF having been loaded
+    # there; everything it needs is passed in.
+    keys, credentials = args
+    crypto = fernet.MultiFernet([fernet.Fernet(key) for key in keys])
+    encrypted = []
+    for credential in credentials:
+        if isinstance(credential, six.text_type):
+            credential = credential.encode('utf-8')
+        encrypted.append(crypto.encrypt(crypto.decrypt(credential)))
+    return encrypted
+
+
 def primary_key_hash(keys):
     """Calculate a hash of the primary key used for encryption."""
     if isinstance(keys[0], six.text_type):
@@ -90,16 +153,23 @@ class Provider(core.Provider):
         :param credential: an encrypted credential string
         :returns: a decrypted credential
         """
-        key_utils = fernet_utils.FernetUtils(
-            CONF.credential.key_repository, MAX_ACTIVE_KEYS)
-        keys = key_utils.load_keys(use_null_key=True)
-        fernet_keys = [fernet.Fernet(key) for key in keys]
-        crypto = fernet.MultiFernet(fernet_keys)
+        return self.decrypt_multi([credential])[0]
+
+    def decrypt_multi(self, credentials):
+        """Attempt to decrypt several credentials with the same keys.
+
+        :param credentials: a list of encrypted credential strings
+        :returns: a list of decrypted credentials
+        """
+        crypto, keys = get_multi_fernet_keys()
 
         try:
-            if isinstance(credential, six.text_type):
-                credential = credential.encode('utf-8')
-            return crypto.decrypt(credential).decode('utf-8')
+            decrypted = []
+            for credential in credentials:
+                if isinstance(credential, six.text_type):
+                    credential = credential.encode('utf-8')
+                decrypted.append(crypto.decrypt(credential).decode('utf-8'))
+            return decrypted
         except (fernet.InvalidToken, TypeError, ValueError):
             msg = _('Credential could not be decrypted. Please contact the'
                     ' administrator')
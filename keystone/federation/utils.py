@@ -231,11 +231,12 @@ class DirectMaps(object):
             return value
 
 
-def validate_mapping_structure(ref):
-    v = jsonschema.Draft4Validator(MAPPING_SCHEMA)
+_MAPPING_VALIDATOR = jsonschema.Draft4Validator(MAPPING_SCHEMA)
+
 
+def validate_mapping_structure(ref):
     messages = ''
-    for error in sorted(v.iter_errors(ref), key=str):
+    for error in sorted(_MAPPING_VALIDATOR.iter_errors(ref), key=str):
         messages = messages + error.message + "\n"
 
     if messages:
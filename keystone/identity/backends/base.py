@@ -206,6 +206,23 @@ class IdentityDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def create_users(self, users):
+        """Create a batch of new users.
+
+        Drivers that can store several users more efficiently than by
+        repeated calls to :meth:`create_user` should override this.
+
+        :param list users: list of (user_id, user) tuples, as would be passed
+                           to :meth:`create_user`.
+
+        :returns: list of users, in the same order, matching the user schema.
+        :rtype: list of dict
+
+        :raises keystone.exception.Conflict: If a duplicate user exists.
+
+        """
+        return [self.create_user(user_id, user) for user_id, user in users]
+
     @abc.abstractmethod
     def list_users(self, hints):
         """List users in the system.
@@ -221,6 +238,25 @@ class IdentityDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def iter_users(self, hints):
+        """Iterate over the users in the system.
+
+        Drivers that can read users incrementally, rather than building the
+        whole list in memory, should override this. The users are only read
+        once iteration begins, so the filters the driver satisfies are only
+        removed from the hints then.
+
+        :param hints: filter hints which the driver should
+                      implement if at all possible. They hold no limit.
+        :type hints: keystone.common.driver_hints.Hints
+
+        :returns: an iterator over the users. See user schema in
+                  :class:`~.IdentityDriverBase`.
+
+        """
+        for ref in self.list_users(hints):
+            yield ref
+
     @abc.abstractmethod
     def list_users_in_group(self, group_id, hints):
         """List users in a group.
@@ -253,6 +289,28 @@ class IdentityDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_users_from_ids(self, user_ids):
+        """List the users with the given IDs.
+
+        Drivers that can look up several users more efficiently than by
+        repeated calls to :meth:`get_user` should override this.
+
+        :param list user_ids: User IDs.
+
+        :returns: the users that exist, in no particular order. See user
+                  schema in :class:`~.IdentityDriverBase`.
+        :rtype: list of dict
+
+        """
+        refs = []
+        for user_id in user_ids:
+            try:
+                refs.append(self.get_user(user_id))
+            except exception.UserNotFound:  # nosec
+                # Missing users are simply left out of the list.
+                pass
+        return refs
+
     @abc.abstractmethod
     def update_user(self, user_id, user):
         """Update an existing user.
@@ -298,6 +356,22 @@ class IdentityDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def add_users_to_groups(self, memberships):
+        """Add a batch of users to groups.
+
+        Memberships that already exist are ignored. Drivers that can store
+        several memberships more efficiently than by repeated calls to
+        :meth:`add_user_to_group` should override this.
+
+        :param list memberships: list of (user_id, group_id) tuples.
+
+        :raises keystone.exception.UserNotFound: If a user doesn't exist.
+        :raises keystone.exception.GroupNotFound: If a group doesn't exist.
+
+        """
+        for user_id, group_id in memberships:
+            self.add_user_to_group(user_id, group_id)
+
     @abc.abstractmethod
     def check_user_in_group(self, user_id, group_id):
         """Check if a user is a member of a group.
@@ -406,6 +480,28 @@ class IdentityDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def list_groups_from_ids(self, group_ids):
+        """List the groups with the given IDs.
+
+        Drivers that can look up several groups more efficiently than by
+        repeated calls to :meth:`get_group` should override this.
+
+        :param list group_ids: Group IDs.
+
+        :returns: the groups that exist, in no particular order. See group
+                  schema in :class:`~.IdentityDriverBase`.
+        :rtype: list of dict
+
+        """
+        refs = []
+        for group_id in group_ids:
+            try:
+                refs.append(self.get_group(group_id))
+            except exception.GroupNotFound:  # nosec
+                # Missing groups are simply left out of the list.
+                pass
+        return refs
+
     @abc.abstractmethod
     def get_group_by_name(self, group_name, domain_id):
         """Get a group by name.
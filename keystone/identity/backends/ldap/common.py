@@ -29,6 +29,7 @@ import six
 from six.moves import map, zip
 
 from keystone.common import driver_hints
+from keystone.common import metrics
 from keystone import exception
 from keystone.i18n import _, _LW
 
@@ -55,6 +56,9 @@ DN_ONLY = ['1.1']
 
 _utf8_encoder = codecs.getencoder('utf-8')
 
+_timed_operation = functools.partial(metrics.timed,
+                                     'keystone_ldap_operation_seconds')
+
 
 def utf8_encode(value):
     """Encode a basestring to UTF-8.
@@ -894,6 +898,7 @@ class KeystoneLDAPHandler(LDAPHandler):
     def get_option(self, option):
         return self.conn.get_option(option)
 
+    @_timed_operation(operation='simple_bind_s')
     def simple_bind_s(self, who='', cred='',
                       serverctrls=None, clientctrls=None):
         LOG.debug('LDAP bind: who=%s', who)
@@ -907,6 +912,7 @@ class KeystoneLDAPHandler(LDAPHandler):
         LOG.debug('LDAP unbind')
         return self.conn.unbind_s()
 
+    @_timed_operation(operation='add_s')
     def add_s(self, dn, modlist):
         ldap_attrs = [(kind, [py2ldap(x) for x in safe_iter(values)])
                       for kind, values in modlist]
@@ -921,6 +927,7 @@ class KeystoneLDAPHandler(LDAPHandler):
                            for kind, values in ldap_attrs]
         return self.conn.add_s(dn_utf8, ldap_attrs_utf8)
 
+    @_timed_operation(operation='search_s')
     def search_s(self, base, scope,
                  filterstr='(objectClass=*)', attrlist=None, attrsonly=0):
         # NOTE(morganfainberg): Remove "None" singletons from this list, which
@@ -950,6 +957,7 @@ class KeystoneLDAPHandler(LDAPHandler):
 
         return py_result
 
+    @_timed_operation(operation='search_ext')
     def search_ext(self, base, scope,
                    filterstr='(objectClass=*)', attrlist=None, attrsonly=0,
                    serverctrls=None, clientctrls=None,
@@ -1033,6 +1041,7 @@ class KeystoneLDAPHandler(LDAPHandler):
                 break
         return res
 
+    @_timed_operation(operation='result3')
     def result3(self, msgid=ldap.RES_ANY, all=1, timeout=None,
                 resp_ctrl_classes=None):
         ldap_result = self.conn.result3(msgid, all, timeout, resp_ctrl_classes)
@@ -1048,6 +1057,7 @@ class KeystoneLDAPHandler(LDAPHandler):
         py_result = convert_ldap_result(rdata)
         return py_result
 
+    @_timed_operation(operation='modify_s')
     def modify_s(self, dn, modlist):
         ldap_modlist = [
             (op, kind, (None if values is None
@@ -1067,11 +1077,13 @@ class KeystoneLDAPHandler(LDAPHandler):
             for op, kind, values in ldap_modlist]
         return self.conn.modify_s(dn_utf8, ldap_modlist_utf8)
 
+    @_timed_operation(operation='delete_s')
     def delete_s(self, dn):
         LOG.debug("LDAP delete: dn=%s", dn)
         dn_utf8 = utf8_encode(dn)
         return self.conn.delete_s(dn_utf8)
 
+    @_timed_operation(operation='delete_ext_s')
     def delete_ext_s(self, dn, serverctrls=None, clientctrls=None):
         LOG.debug('LDAP delete_ext: dn=%s serverctrls=%s clientctrls=%s',
                   dn, serverctrls, clientctrls)
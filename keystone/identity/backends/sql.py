@@ -27,6 +27,63 @@ from keystone.identity.backends import sql_model as model
 
 
 CONF = keystone.conf.CONF
+# The number of users read from the database at a time when iterating over
+# them.
+ITER_BATCH_SIZE = 100
+
+
+def _first(column, model_cls):
+    """Return a subquery selecting a column of the first related row."""
+    query = sqlalchemy.select([column])
+    query = query.where(model_cls.user_id == model.User.id)
+    query = query.order_by(*model_cls.__table__.primary_key.columns)
+    return query.limit(1).as_scalar()
+
+
+def _user_list_query(session):
+    """Query only the columns of listed users, in a single statement.
+
+    The users' names, domains and password expiry are computed like the
+    properties of model.User, from their local user, their first nonlocal
+    or federated user and their latest password.
+
+    """
+    password_expires_at = sqlalchemy.select([model.Password.expires_at])
+    password_expires_at = password_expires_at.where(
+        model.Password.local_user_id == model.LocalUser.id)
+    password_expires_at = password_expires_at.order_by(
+        model.Password.created_at.desc(), model.Password.id.desc())
+    name = sqlalchemy.func.coalesce(
+        model.LocalUser.name,
+        _first(model.NonLocalUser.name, model.NonLocalUser),
+        _first(model.FederatedUser.display_name, model.FederatedUser))
+    domain_id = sqlalchemy.func.coalesce(
+        model.LocalUser.domain_id,
+        _first(model.NonLocalUser.domain_id, model.NonLocalUser))
+    query = session.query(
+        model.User.id,
+        name.label('name'),
+        domain_id.label('domain_id'),
+        model.User._enabled.label('enabled'),
+        model.User.default_project_id,
+        model.User.created_at,
+        model.User.last_active_at,
+        model.User.extra,
+        password_expires_at.limit(1).as_scalar().label('password_expires_at'))
+    return query.outerjoin(model.LocalUser)
+
+
+def _user_row_to_dict(row):
+    """Build the same dict as model.User.to_dict from a listed user."""
+    user = row.extra.copy()
+    user.update(id=row.id, name=row.name, domain_id=row.domain_id,
+                enabled=row.enabled,
+                password_expires_at=row.password_expires_at)
+    if row.enabled and model.is_inactive(row.created_at, row.last_active_at):
+        user['enabled'] = False
+    if row.default_project_id is not None:
+        user['default_project_id'] = row.default_project_id
+    return base.filter_user(user)
 
 
 class Identity(base.IdentityDriverBase):
@@ -123,15 +180,44 @@ class Identity(base.IdentityDriverBase):
             session.add(user_ref)
             return base.filter_user(user_ref.to_dict())
 
+    @sql.handle_conflicts(conflict_type='user')
+    def create_users(self, users):
+        hashed_users = utils.hash_user_passwords(
+            [user for _user_id, user in users],
+            processes=CONF.identity.password_hash_processes)
+        with sql.session_for_write() as session:
+            now = datetime.datetime.utcnow()
+            user_refs = []
+            for user in hashed_users:
+                user_ref = model.User.from_dict(user)
+                user_ref.created_at = now
+                user_refs.append(user_ref)
+            session.add_all(user_refs)
+            session.flush()
+            return [base.filter_user(ref.to_dict()) for ref in user_refs]
+
     @driver_hints.truncated
     def list_users(self, hints):
         with sql.session_for_read() as session:
-            query = session.query(model.User).outerjoin(model.LocalUser)
-            user_refs = sql.filter_limit_query(model.User, query, hints)
-            return [base.filter_user(x.to_dict()) for x in user_refs]
+            query = _user_list_query(session)
+            rows = sql.filter_limit_query(model.User, query, hints)
+            return [_user_row_to_dict(row) for row in rows]
+
+    def iter_users(self, hints):
+        with sql.session_for_read() as session:
+            query = _user_list_query(session)
+            rows = sql.filter_limit_query(model.User, query, hints)
+            if not isinstance(rows, list):
+                # Fetch the rows from the database a batch at a time, rather
+                # than all at once.
+                rows = rows.yield_per(ITER_BATCH_SIZE)
+            for row in rows:
+                yield _user_row_to_dict(row)
 
     def _get_user(self, session, user_id):
-        user_ref = session.query(model.User).get(user_id)
+        query = session.query(model.User)
+        query = query.options(*model.user_loader_options())
+        user_ref = query.get(user_id)
         if not user_ref:
             raise exception.UserNotFound(user_id=user_id)
         return user_ref
@@ -141,9 +227,18 @@ class Identity(base.IdentityDriverBase):
             return base.filter_user(
                 self._get_user(session, user_id).to_dict())
 
+    def list_users_from_ids(self, user_ids):
+        if not user_ids:
+            return []
+        with sql.session_for_read() as session:
+            query = _user_list_query(session)
+            query = query.filter(model.User.id.in_(user_ids))
+            return [_user_row_to_dict(row) for row in query]
+
     def get_user_by_name(self, user_name, domain_id):
         with sql.session_for_read() as session:
             query = session.query(model.User).join(model.LocalUser)
+            query = query.options(*model.user_loader_options())
             query = query.filter(sqlalchemy.and_(
                 model.LocalUser.name == user_name,
                 model.LocalUser.domain_id == domain_id))
@@ -186,7 +281,7 @@ class Identity(base.IdentityDriverBase):
 
     def change_password(self, user_id, new_password):
         with sql.session_for_write() as session:
-            user_ref = session.query(model.User).get(user_id)
+            user_ref = self._get_user(session, user_id)
             if user_ref.password_ref and user_ref.password_ref.self_service:
                 self._validate_minimum_password_age(user_ref)
             self._validate_password_history(new_password, user_ref)
@@ -216,6 +311,35 @@ class Identity(base.IdentityDriverBase):
             session.add(model.UserGroupMembership(user_id=user_id,
                                                   group_id=group_id))
 
+    def add_users_to_groups(self, memberships):
+        memberships = set(memberships)
+        if not memberships:
+            return
+        user_ids = set(user_id for user_id, _group_id in memberships)
+        group_ids = set(group_id for _user_id, group_id in memberships)
+        with sql.session_for_write() as session:
+            query = session.query(model.Group.id)
+            query = query.filter(model.Group.id.in_(group_ids))
+            missing = group_ids - set(row.id for row in query)
+            if missing:
+                raise exception.GroupNotFound(group_id=missing.pop())
+            query = session.query(model.User.id)
+            query = query.filter(model.User.id.in_(user_ids))
+            missing = user_ids - set(row.id for row in query)
+            if missing:
+                raise exception.UserNotFound(user_id=missing.pop())
+
+            query = session.query(model.UserGroupMembership)
+            query = query.filter(
+                model.UserGroupMembership.user_id.in_(user_ids))
+            query = query.filter(
+                model.UserGroupMembership.group_id.in_(group_ids))
+            existing = set((ref.user_id, ref.group_id) for ref in query)
+            session.bulk_insert_mappings(
+                model.UserGroupMembership,
+                [{'user_id': user_id, 'group_id': group_id}
+                 for user_id, group_id in memberships - existing])
+
     def check_user_in_group(self, user_id, group_id):
         with sql.session_for_read() as session:
             self.get_group(group_id)
@@ -259,12 +383,12 @@ class Identity(base.IdentityDriverBase):
     def list_users_in_group(self, group_id, hints):
         with sql.session_for_read() as session:
             self.get_group(group_id)
-            query = session.query(model.User).outerjoin(model.LocalUser)
+            query = _user_list_query(session)
             query = query.join(model.UserGroupMembership)
             query = query.filter(
                 model.UserGroupMembership.group_id == group_id)
-            query = sql.filter_limit_query(model.User, query, hints)
-            return [base.filter_user(u.to_dict()) for u in query]
+            rows = sql.filter_limit_query(model.User, query, hints)
+            return [_user_row_to_dict(row) for row in rows]
 
     def delete_user(self, user_id):
         with sql.session_for_write() as session:
@@ -302,6 +426,14 @@ class Identity(base.IdentityDriverBase):
         with sql.session_for_read() as session:
             return self._get_group(session, group_id).to_dict()
 
+    def list_groups_from_ids(self, group_ids):
+        if not group_ids:
+            return []
+        with sql.session_for_read() as session:
+            query = session.query(model.Group)
+            query = query.filter(model.Group.id.in_(group_ids))
+            return [ref.to_dict() for ref in query]
+
     def get_group_by_name(self, group_name, domain_id):
         with sql.session_for_read() as session:
             query = session.query(model.Group)
@@ -25,6 +25,35 @@ import keystone.conf
 CONF = keystone.conf.CONF
 
 
+def is_inactive(created_at, last_active_at):
+    """Whether a user has been inactive for too long to stay enabled.
+
+    See `[security_compliance] disable_user_account_days_inactive`.
+
+    """
+    max_days = CONF.security_compliance.disable_user_account_days_inactive
+    last_active = last_active_at
+    if not last_active and created_at:
+        last_active = created_at.date()
+    if max_days and last_active:
+        now = datetime.datetime.utcnow().date()
+        return (now - last_active).days >= max_days
+    return False
+
+
+def user_loader_options():
+    """Return the options loading users with all their relationships.
+
+    The relationships are joined to the query of the users, so that they are
+    all read in a single statement, and can still be used once the session is
+    closed.
+
+    """
+    return (orm.joinedload(User.local_user).joinedload(LocalUser.passwords),
+            orm.joinedload(User.federated_users),
+            orm.joinedload(User.nonlocal_users))
+
+
 class User(sql.ModelBase, sql.DictBase):
     __tablename__ = 'user'
     attributes = ['id', 'name', 'domain_id', 'password', 'enabled',
@@ -34,17 +63,19 @@ class User(sql.ModelBase, sql.DictBase):
     _enabled = sql.Column('enabled', sql.Boolean)
     extra = sql.Column(sql.JsonBlob())
     default_project_id = sql.Column(sql.String(64))
+    # NOTE: The relationships are loaded when first used, queries which need
+    # them up front pass user_loader_options().
     local_user = orm.relationship('LocalUser', uselist=False,
-                                  single_parent=True, lazy='subquery',
+                                  single_parent=True, lazy='select',
                                   cascade='all,delete-orphan', backref='user')
     federated_users = orm.relationship('FederatedUser',
                                        single_parent=True,
-                                       lazy='subquery',
+                                       lazy='select',
                                        cascade='all,delete-orphan',
                                        backref='user')
     nonlocal_users = orm.relationship('NonLocalUser',
                                       single_parent=True,
-                                      lazy='subquery',
+                                      lazy='select',
                                       cascade='all,delete-orphan',
                                       backref='user')
     created_at = sql.Column(sql.DateTime, nullable=True)
@@ -158,17 +189,8 @@ class User(sql.ModelBase, sql.DictBase):
     # enabled property
     @hybrid_property
     def enabled(self):
-        if self._enabled:
-            max_days = (
-                CONF.security_compliance.disable_user_account_days_inactive)
-            last_active = self.last_active_at
-            if not last_active and self.created_at:
-                last_active = self.created_at.date()
-            if max_days and last_active:
-                now = datetime.datetime.utcnow().date()
-                days_inactive = (now - last_active).days
-                if days_inactive >= max_days:
-                    self._enabled = False
+        if self._enabled and is_inactive(self.created_at, self.last_active_at):
+            self._enabled = False
         return self._enabled
 
     @enabled.setter
@@ -221,7 +243,7 @@ class LocalUser(sql.ModelBase, sql.DictBase):
     passwords = orm.relationship('Password',
                                  single_parent=True,
                                  cascade='all,delete-orphan',
-                                 lazy='subquery',
+                                 lazy='select',
                                  backref='local_user',
                                  order_by='Password.created_at')
     failed_auth_count = sql.Column(sql.Integer, nullable=True)
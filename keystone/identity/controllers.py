@@ -225,7 +225,12 @@ class UserV3(controller.V3Controller):
     def list_users(self, request, filters):
         hints = UserV3.build_driver_hints(request, filters)
         domain = self._get_domain_id_for_list_request(request)
-        refs = self.identity_api.list_users(domain_scope=domain, hints=hints)
+        if CONF.response_streaming:
+            refs = self.identity_api.iter_users(domain_scope=domain,
+                                                hints=hints)
+        else:
+            refs = self.identity_api.list_users(domain_scope=domain,
+                                                hints=hints)
         return UserV3.wrap_collection(request.context_dict, refs, hints=hints)
 
     @controller.filterprotected('domain_id', 'enabled', 'name',
@@ -82,6 +82,11 @@ class DomainConfigs(dict):
     _any_sql = False
     lock = threading.Lock()
 
+    def __init__(self):
+        super(DomainConfigs, self).__init__()
+        # The version of the config of each domain when we last read it.
+        self._config_versions = {}
+
     def _load_driver(self, domain_config):
         return manager.load_driver(Manager.driver_namespace,
                                    domain_config['cfg'].identity.driver,
@@ -284,6 +289,8 @@ class DomainConfigs(dict):
 
         """
         for domain in resource_api.list_domains():
+            self._config_versions[domain['id']] = (
+                self.domain_config_api.get_config_version(domain['id']))
             domain_config_options = (
                 self.domain_config_api.
                 get_config_with_sensitive_info(domain['id']))
@@ -336,12 +343,14 @@ class DomainConfigs(dict):
         configuration.
 
         When the domain specific drivers were set up, we stored away the
-        specific config for this domain that was available at that time. So we
-        now read the current version and compare. While this might seem
-        somewhat inefficient, the sensitive config call is cached, so should be
-        light weight. More importantly, when the cache timeout is reached, we
-        will get any config that has been updated from any other keystone
-        process.
+        specific config for this domain that was available at that time, along
+        with the version of that config. So we now read the current version,
+        and only if it has changed do we read the config itself and compare.
+        The version call is cached, so is light weight, and when the cache
+        timeout is reached we will see any config that has been updated from
+        any other keystone process. Domain config backends that don't keep
+        track of versions return None, in which case we always read and
+        compare the config.
 
         This cache-timeout approach works for both multi-process and
         multi-threaded keystone configurations. In multi-threaded
@@ -360,6 +369,18 @@ class DomainConfigs(dict):
             # of keystone.
             return
 
+        latest_version = self.domain_config_api.get_config_version(domain_id)
+        if latest_version is not None:
+            if latest_version == self._config_versions.get(domain_id):
+                return
+            if domain_id in self._config_versions:
+                # The config we have cached may be older than the version we
+                # just read, so make sure we read it afresh.
+                config_api = self.domain_config_api
+                config_api.get_config_with_sensitive_info.invalidate(
+                    config_api, domain_id)
+        self._config_versions[domain_id] = latest_version
+
         latest_domain_config = (
             self.domain_config_api.
             get_config_with_sensitive_info(domain_id))
@@ -808,7 +829,43 @@ class Manager(manager.Manager):
 
         list_limit = driver._get_list_limit()
         if list_limit:
-            hints.set_limit(list_limit)
+            hints.apply_list_limit(list_limit)
+
+    def _withhold_limit(self, hints, driver):
+        """Take the limit out of the hints, for drivers that can't paginate.
+
+        The SQL driver orders entities by ID and skips those up to the marker
+        before truncating the list. Other drivers, such as LDAP, return
+        entities in their own order, and their local IDs may not even be the
+        public IDs that the marker refers to, so they are given no limit and
+        the page is cut from the complete list by :meth:`_paginate` instead.
+
+        :returns: the limit to pass on to :meth:`_paginate`, if withheld
+
+        """
+        if hints is None or driver.is_sql or hints.limit is None:
+            return None
+        limit = hints.limit
+        hints.limit = None
+        return limit
+
+    def _paginate(self, ref_list, hints, limit):
+        """Cut the page from a complete list, see :meth:`_withhold_limit`."""
+        if limit is None:
+            return ref_list
+        hints.limit = limit
+        if hints.filters:
+            # The filters the driver couldn't satisfy are applied by the
+            # controller, which must then paginate the filtered list itself.
+            return ref_list
+
+        ref_list = sorted(ref_list, key=lambda ref: ref['id'])
+        if hints.marker is not None:
+            ref_list = [ref for ref in ref_list if ref['id'] > hints.marker]
+        if len(ref_list) > limit['limit']:
+            ref_list = ref_list[:limit['limit']]
+            limit['truncated'] = True
+        return ref_list
 
     # The actual driver calls - these are pre/post processed here as
     # part of the Manager layer to make sure we:
@@ -845,34 +902,95 @@ class Manager(manager.Manager):
                 # backward compatible
                 pass
 
-    @domains_configured
-    @exception_translated('user')
-    def create_user(self, user_ref, initiator=None):
+    def _prepare_new_user(self, user_ref, checked_domains=None,
+                          checked_projects=None):
+        """Validate a new user and pick its driver and ID.
+
+        :param checked_domains: set of the domain IDs already looked up, so
+                                that a batch of users only looks each up once
+        :param checked_projects: set of the default project IDs already
+                                 checked, for the same reason
+        :returns: the driver, the domain ID and the user to create
+
+        """
+        if checked_domains is None:
+            checked_domains = set()
+        if checked_projects is None:
+            checked_projects = set()
+
         user = user_ref.copy()
         if 'password' in user:
             validators.validate_password(user['password'])
         user['name'] = clean.user_name(user['name'])
         user.setdefault('enabled', True)
         user['enabled'] = clean.user_enabled(user['enabled'])
+        # For creating a user, the domain is in the object itself
         domain_id = user['domain_id']
-        self.resource_api.get_domain(domain_id)
+        if domain_id not in checked_domains:
+            self.resource_api.get_domain(domain_id)
+            checked_domains.add(domain_id)
 
-        self._assert_default_project_id_is_not_domain(
-            user_ref.get('default_project_id'))
+        default_project_id = user_ref.get('default_project_id')
+        if default_project_id not in checked_projects:
+            self._assert_default_project_id_is_not_domain(default_project_id)
+            checked_projects.add(default_project_id)
 
-        # For creating a user, the domain is in the object itself
-        domain_id = user_ref['domain_id']
         driver = self._select_identity_driver(domain_id)
         user = self._clear_domain_id_if_domain_unaware(driver, user)
         # Generate a local ID - in the future this might become a function of
         # the underlying driver so that it could conform to rules set down by
         # that particular driver type.
         user['id'] = uuid.uuid4().hex
+        return driver, domain_id, user
+
+    @domains_configured
+    @exception_translated('user')
+    def create_user(self, user_ref, initiator=None):
+        driver, domain_id, user = self._prepare_new_user(user_ref)
         ref = driver.create_user(user['id'], user)
         notifications.Audit.created(self._USER, user['id'], initiator)
         return self._set_domain_id_and_mapping(
             ref, domain_id, driver, mapping.EntityType.USER)
 
+    @domains_configured
+    @exception_translated('user')
+    def create_users(self, user_refs, initiator=None):
+        """Create a batch of users.
+
+        This performs the same validation as :meth:`create_user` for each
+        user, but hands the users to the backend in as few calls as possible
+        (one per domain driver), so that password hashing and storage can be
+        batched.
+
+        :param user_refs: list of user dicts, as would be passed to
+                          :meth:`create_user`
+        :returns: list of the created users, in the same order
+
+        """
+        checked_domains = set()
+        checked_projects = set()
+        driver_batches = []
+        batches_by_driver = {}
+        for position, user_ref in enumerate(user_refs):
+            driver, domain_id, user = self._prepare_new_user(
+                user_ref, checked_domains, checked_projects)
+            key = (id(driver), domain_id)
+            if key not in batches_by_driver:
+                batches_by_driver[key] = (driver, domain_id, [])
+                driver_batches.append(batches_by_driver[key])
+            batches_by_driver[key][2].append((position, user))
+
+        refs = [None] * len(user_refs)
+        for driver, domain_id, batch in driver_batches:
+            created = driver.create_users(
+                [(user['id'], user) for _position, user in batch])
+            for (position, user), ref in zip(batch, created):
+                notifications.Audit.created(self._USER, user['id'],
+                                            initiator)
+                refs[position] = self._set_domain_id_and_mapping(
+                    ref, domain_id, driver, mapping.EntityType.USER)
+        return refs
+
     @domains_configured
     @exception_translated('user')
     @MEMOIZE
@@ -883,6 +1001,52 @@ class Manager(manager.Manager):
         return self._set_domain_id_and_mapping(
             ref, domain_id, driver, mapping.EntityType.USER)
 
+    def _list_entities_from_ids(self, public_ids, entity_type):
+        """Look up a set of users or groups with as few driver calls as we can.
+
+        The IDs are grouped by the driver (and domain) that backs them, and
+        each driver is asked for all of its entities at once. Any IDs that
+        don't exist are left out of the result.
+
+        """
+        batches = []
+        batches_by_driver = {}
+        for public_id in set(public_ids):
+            try:
+                domain_id, driver, entity_id = (
+                    self._get_domain_driver_and_entity_id(public_id))
+            except exception.PublicIDNotFound:  # nosec
+                # It doesn't exist, so just leave it out.
+                continue
+            key = (id(driver), domain_id)
+            if key not in batches_by_driver:
+                batches_by_driver[key] = (driver, domain_id, [])
+                batches.append(batches_by_driver[key])
+            batches_by_driver[key][2].append(entity_id)
+
+        refs = []
+        for driver, domain_id, entity_ids in batches:
+            if entity_type == mapping.EntityType.USER:
+                driver_refs = driver.list_users_from_ids(entity_ids)
+            else:
+                driver_refs = driver.list_groups_from_ids(entity_ids)
+            refs += self._set_domain_id_and_mapping(
+                driver_refs, domain_id, driver, entity_type)
+        return refs
+
+    @domains_configured
+    @exception_translated('user')
+    def list_users_from_ids(self, user_ids):
+        """List the users with the given IDs.
+
+        This is used internally to bulk read a set of users, for example to
+        add their names to a list of role assignments. Users that don't exist
+        are left out of the result.
+
+        """
+        return self._list_entities_from_ids(user_ids,
+                                            mapping.EntityType.USER)
+
     def assert_user_enabled(self, user_id, user=None):
         """Assert the user and the user's domain are enabled.
 
@@ -917,9 +1081,35 @@ class Manager(manager.Manager):
             # We are effectively satisfying any domain_id filter by the above
             # driver selection, so remove any such filter.
             self._mark_domain_id_filter_satisfied(hints)
+        limit = self._withhold_limit(hints, driver)
         ref_list = driver.list_users(hints)
-        return self._set_domain_id_and_mapping(
+        ref_list = self._set_domain_id_and_mapping(
             ref_list, domain_scope, driver, mapping.EntityType.USER)
+        return self._paginate(ref_list, hints, limit)
+
+    @domains_configured
+    @exception_translated('user')
+    def iter_users(self, domain_scope=None, hints=None):
+        """Iterate over users, reading them as they are consumed.
+
+        Only listings without a limit or marker, from drivers whose users
+        need no ID mapping, are read incrementally. Any other listing is read
+        in full by :meth:`list_users`. Errors reading the users are raised
+        during iteration, rather than by this call.
+
+        """
+        driver = self._select_identity_driver(domain_scope)
+        self._set_list_limit_in_hints(hints, driver)
+        hints = hints or driver_hints.Hints()
+        if (hints.limit is not None or hints.marker is not None or
+                self._needs_post_processing(driver)):
+            return iter(self.list_users(domain_scope=domain_scope,
+                                        hints=hints))
+        if driver.is_domain_aware():
+            self._ensure_domain_id_in_hints(hints, domain_scope)
+        else:
+            self._mark_domain_id_filter_satisfied(hints)
+        return driver.iter_users(hints)
 
     def _check_update_of_domain_id(self, new_domain, old_domain):
         if new_domain != old_domain:
@@ -1028,6 +1218,19 @@ class Manager(manager.Manager):
         return self._set_domain_id_and_mapping(
             ref, domain_id, driver, mapping.EntityType.GROUP)
 
+    @domains_configured
+    @exception_translated('group')
+    def list_groups_from_ids(self, group_ids):
+        """List the groups with the given IDs.
+
+        This is used internally to bulk read a set of groups, for example to
+        add their names to a list of role assignments. Groups that don't exist
+        are left out of the result.
+
+        """
+        return self._list_entities_from_ids(group_ids,
+                                            mapping.EntityType.GROUP)
+
     @domains_configured
     @exception_translated('group')
     def get_group_by_name(self, group_name, domain_id):
@@ -1100,6 +1303,48 @@ class Manager(manager.Manager):
         notifications.Audit.added_to(self._GROUP, group_id, self._USER,
                                      user_id, initiator)
 
+    @domains_configured
+    @exception_translated('group')
+    def add_users_to_groups(self, memberships, initiator=None):
+        """Add a batch of users to groups.
+
+        :param memberships: list of (user_id, group_id) tuples
+
+        """
+        @exception_translated('user')
+        def get_entity_info_for_user(public_id):
+            return self._get_domain_driver_and_entity_id(public_id)
+
+        group_info = {}
+        batches = []
+        batches_by_driver = {}
+        for user_id, group_id in memberships:
+            if group_id not in group_info:
+                group_info[group_id] = (
+                    self._get_domain_driver_and_entity_id(group_id))
+            _domain_id, group_driver, group_entity_id = group_info[group_id]
+            _domain_id, user_driver, user_entity_id = (
+                get_entity_info_for_user(user_id))
+
+            self._assert_user_and_group_in_same_backend(
+                user_entity_id, user_driver, group_entity_id, group_driver)
+
+            if id(group_driver) not in batches_by_driver:
+                batches_by_driver[id(group_driver)] = (group_driver, [])
+                batches.append(batches_by_driver[id(group_driver)])
+            batches_by_driver[id(group_driver)][1].append(
+                (user_entity_id, group_entity_id))
+
+        for driver, batch in batches:
+            driver.add_users_to_groups(batch)
+
+        # Invalidate user role assignments cache region, as it may now need to
+        # include role assignments from the specified groups to their users
+        assignment.COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        for user_id, group_id in memberships:
+            notifications.Audit.added_to(self._GROUP, group_id, self._USER,
+                                         user_id, initiator)
+
     @domains_configured
     @exception_translated('group')
     def remove_user_from_group(self, user_id, group_id, initiator=None):
@@ -1164,9 +1409,11 @@ class Manager(manager.Manager):
             # We are effectively satisfying any domain_id filter by the above
             # driver selection, so remove any such filter
             self._mark_domain_id_filter_satisfied(hints)
+        limit = self._withhold_limit(hints, driver)
         ref_list = driver.list_groups_for_user(entity_id, hints)
-        return self._set_domain_id_and_mapping(
+        ref_list = self._set_domain_id_and_mapping(
             ref_list, domain_id, driver, mapping.EntityType.GROUP)
+        return self._paginate(ref_list, hints, limit)
 
     @domains_configured
     @exception_translated('group')
@@ -1182,9 +1429,11 @@ class Manager(manager.Manager):
             # We are effectively satisfying any domain_id filter by the above
             # driver selection, so remove any such filter.
             self._mark_domain_id_filter_satisfied(hints)
+        limit = self._withhold_limit(hints, driver)
         ref_list = driver.list_groups(hints)
-        return self._set_domain_id_and_mapping(
+        ref_list = self._set_domain_id_and_mapping(
             ref_list, domain_scope, driver, mapping.EntityType.GROUP)
+        return self._paginate(ref_list, hints, limit)
 
     @domains_configured
     @exception_translated('group')
@@ -1197,9 +1446,11 @@ class Manager(manager.Manager):
             # We are effectively satisfying any domain_id filter by the above
             # driver selection, so remove any such filter
             self._mark_domain_id_filter_satisfied(hints)
+        limit = self._withhold_limit(hints, driver)
         ref_list = driver.list_users_in_group(entity_id, hints)
-        return self._set_domain_id_and_mapping(
+        ref_list = self._set_domain_id_and_mapping(
             ref_list, domain_id, driver, mapping.EntityType.USER)
+        return self._paginate(ref_list, hints, limit)
 
     @domains_configured
     @exception_translated('group')
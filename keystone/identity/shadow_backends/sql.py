@@ -57,6 +57,7 @@ class ShadowUsers(base.ShadowUsersDriverBase):
         with sql.session_for_read() as session:
             query = session.query(model.User).outerjoin(model.LocalUser)
             query = query.join(model.FederatedUser)
+            query = query.options(*model.user_loader_options())
             query = query.filter(model.FederatedUser.idp_id == idp_id)
             query = query.filter(model.FederatedUser.protocol_id ==
                                  protocol_id)
@@ -115,7 +116,9 @@ class ShadowUsers(base.ShadowUsersDriverBase):
             return identity_base.filter_user(user_ref.to_dict())
 
     def _get_user(self, session, user_id):
-        user_ref = session.query(model.User).get(user_id)
+        query = session.query(model.User)
+        query = query.options(*model.user_loader_options())
+        user_ref = query.get(user_id)
         if not user_ref:
             raise exception.UserNotFound(user_id=user_id)
         return user_ref
@@ -0,0 +1,34 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from six.moves import http_client
+
+from keystone.common import controller
+from keystone.common import metrics
+from keystone.common import wsgi
+
+
+class MetricsV3Controller(controller.V3Controller):
+
+    @controller.protected()
+    def get_metrics(self, request):
+        """Return the measurements of this process in the Prometheus format.
+
+        Each keystone process keeps its own measurements, so consecutive
+        requests may be answered by different processes.
+
+        """
+        return wsgi.render_response(
+            body=metrics.to_prometheus_text().encode('utf-8'),
+            status=(http_client.OK, http_client.responses[http_client.OK]),
+            headers=[('Content-Type',
+                      'text/plain; version=0.0.4; charset=utf-8')])
@@ -12,6 +12,8 @@
 
 """Unified in-memory token model."""
 
+import functools
+
 from keystoneclient.common import cms
 from oslo_utils import reflection
 from oslo_utils import timeutils
@@ -35,8 +37,46 @@ def _parse_and_normalize_time(time_data):
     return timeutils.normalize_time(time_data)
 
 
+def _memoized_property(f):
+    """Make a property that is only computed once per token.
+
+    The value is kept until the token's top level keys are changed.
+
+    """
+    name = f.__name__
+
+    @functools.wraps(f)
+    def getter(self):
+        try:
+            return self._memo[name]
+        except KeyError:
+            value = self._memo[name] = f(self)
+            return value
+    return property(getter)
+
+
+def _resets_memo(f):
+    @functools.wraps(f)
+    def wrapper(self, *args, **kwargs):
+        # NOTE: When unpickling, the items are restored before the slots, so
+        # there may not be a memo yet.
+        self._memo = {}
+        return f(self, *args, **kwargs)
+    return wrapper
+
+
 class KeystoneToken(dict):
-    """An in-memory representation that unifies v2 and v3 tokens."""
+    """An in-memory representation that unifies v2 and v3 tokens.
+
+    The same token is typically consulted many times while handling a request,
+    by the auth middleware, by policy enforcement and by the controller, so the
+    more expensive derived values, such as the parsed timestamps and the auth
+    context, are computed once and then kept on the token. They are computed
+    again once a top level key of the token is set or removed. Nested token
+    data is not watched, so it must be replaced at the top level rather than
+    changed in place.
+
+    """
 
     # TODO(morganfainberg): Align this in-memory representation with the
     # objects in keystoneclient. This object should be eventually updated
@@ -44,7 +84,10 @@ class KeystoneToken(dict):
     # of the token instead of only consuming the token dict and providing
     # property accessors for the underlying data.
 
+    __slots__ = ('token_data', 'version', 'token_id', 'short_id', '_memo')
+
     def __init__(self, token_id, token_data):
+        self._memo = {}
         self.token_data = token_data
         if 'access' in token_data:
             super(KeystoneToken, self).__init__(**token_data['access'])
@@ -62,6 +105,27 @@ class KeystoneToken(dict):
             raise exception.UnexpectedError(_('Found invalid token: scoped to '
                                               'both project and domain.'))
 
+    __setitem__ = _resets_memo(dict.__setitem__)
+    __delitem__ = _resets_memo(dict.__delitem__)
+    clear = _resets_memo(dict.clear)
+    pop = _resets_memo(dict.pop)
+    popitem = _resets_memo(dict.popitem)
+    setdefault = _resets_memo(dict.setdefault)
+    update = _resets_memo(dict.update)
+
+    def memoize(self, name, func):
+        """Return a value derived from the token, computing it only once.
+
+        :param name: a key identifying the value, unique to the caller.
+        :param func: called with no arguments to compute the value.
+
+        """
+        try:
+            return self._memo[name]
+        except KeyError:
+            value = self._memo[name] = func()
+            return value
+
     def __repr__(self):
         """Return string representation of KeystoneToken."""
         desc = ('<%(type)s (audit_id=%(audit_id)s, '
@@ -73,7 +137,7 @@ class KeystoneToken(dict):
                        'audit_chain_id': self.audit_chain_id,
                        'loc': hex(id(self))}
 
-    @property
+    @_memoized_property
     def expires(self):
         if self.version is V3:
             expires_at = self['expires_at']
@@ -81,7 +145,7 @@ class KeystoneToken(dict):
             expires_at = self['token']['expires']
         return _parse_and_normalize_time(expires_at)
 
-    @property
+    @_memoized_property
     def issued(self):
         if self.version is V3:
             issued_at = self['issued_at']
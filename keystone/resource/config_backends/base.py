@@ -115,6 +115,20 @@ class DomainConfigDriverBase(object):
         """
         raise exception.NotImplemented()  # pragma: no cover
 
+    def get_config_version(self, domain_id):
+        """Get the version of the config options for a domain.
+
+        The version changes whenever any of the config options of the domain
+        are created, updated or deleted, so it can be used to cheaply tell
+        whether a domain's config has changed.
+
+        :param domain_id: the domain in question
+        :returns: the version, or None if the driver doesn't keep track of
+                  versions.
+
+        """
+        return None
+
     @abc.abstractmethod
     def obtain_registration(self, domain_id, type):
         """Try and register this domain to use the type specified.
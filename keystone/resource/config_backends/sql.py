@@ -42,6 +42,12 @@ class SensitiveConfig(sql.ModelBase, sql.ModelDictMixin):
         return d
 
 
+class ConfigVersion(sql.ModelBase, sql.ModelDictMixin):
+    __tablename__ = 'domain_config_version'
+    domain_id = sql.Column(sql.String(64), primary_key=True)
+    version = sql.Column(sql.Integer, nullable=False)
+
+
 class ConfigRegister(sql.ModelBase, sql.ModelDictMixin):
     __tablename__ = 'config_register'
     type = sql.Column(sql.String(64), primary_key=True)
@@ -56,6 +62,20 @@ class DomainConfig(base.DomainConfigDriverBase):
         else:
             return WhiteListedConfig
 
+    def _increment_version(self, session, domain_id):
+        query = session.query(ConfigVersion).filter_by(domain_id=domain_id)
+        updated = query.update({'version': ConfigVersion.version + 1},
+                               synchronize_session=False)
+        if updated:
+            return
+        try:
+            with session.begin_nested():
+                session.add(ConfigVersion(domain_id=domain_id, version=1))
+        except sql.DBDuplicateEntry:
+            # Someone else created the row in the meantime.
+            query.update({'version': ConfigVersion.version + 1},
+                         synchronize_session=False)
+
     def _create_config_option(
             self, session, domain_id, group, option, sensitive, value):
         config_table = self.choose_table(sensitive)
@@ -73,6 +93,7 @@ class DomainConfig(base.DomainConfigDriverBase):
                 self._create_config_option(
                     session, domain_id, option['group'],
                     option['option'], option['sensitive'], option['value'])
+            self._increment_version(session, domain_id)
 
     def _get_config_option(self, session, domain_id, group, option, sensitive):
         try:
@@ -113,6 +134,7 @@ class DomainConfig(base.DomainConfigDriverBase):
                 self._create_config_option(
                     session, domain_id, option['group'], option['option'],
                     option['sensitive'], option['value'])
+            self._increment_version(session, domain_id)
 
     def _delete_config_options(self, session, domain_id, group, option):
         for config_table in [WhiteListedConfig, SensitiveConfig]:
@@ -127,6 +149,12 @@ class DomainConfig(base.DomainConfigDriverBase):
     def delete_config_options(self, domain_id, group=None, option=None):
         with sql.session_for_write() as session:
             self._delete_config_options(session, domain_id, group, option)
+            self._increment_version(session, domain_id)
+
+    def get_config_version(self, domain_id):
+        with sql.session_for_read() as session:
+            ref = session.query(ConfigVersion).get(domain_id)
+            return ref.version if ref else 0
 
     def obtain_registration(self, domain_id, type):
         try:
@@ -404,7 +404,9 @@ class Manager(manager.Manager):
                     # disabled. This effectively offers the same behavior for
                     # non-persistent tokens by removing them from the cache and
                     # requiring the authorization context to be rebuilt the
-                    # next time they're validated.
+                    # next time they're validated. The disabled notification
+                    # below also makes the token provider forget the tokens
+                    # it validated recently.
                     token_provider.TOKENS_REGION.invalidate()
                     notifications.Audit.disabled(self._DOMAIN, project_id,
                                                  public=False)
@@ -1081,6 +1083,7 @@ class DomainConfigManager(manager.Manager):
         # invalidate here, rather than try and create the right result to
         # cache.
         self.get_config_with_sensitive_info.invalidate(self, domain_id)
+        self.get_config_version.invalidate(self, domain_id)
         return self._list_to_config(self.list_config_options(domain_id))
 
     def get_config(self, domain_id, group=None, option=None):
@@ -1221,6 +1224,7 @@ class DomainConfigManager(manager.Manager):
         self.update_config_options(domain_id, option_list)
 
         self.get_config_with_sensitive_info.invalidate(self, domain_id)
+        self.get_config_version.invalidate(self, domain_id)
         return self.get_config(domain_id)
 
     def delete_config(self, domain_id, group=None, option=None):
@@ -1261,6 +1265,7 @@ class DomainConfigManager(manager.Manager):
 
         self.delete_config_options(domain_id, group, option)
         self.get_config_with_sensitive_info.invalidate(self, domain_id)
+        self.get_config_version.invalidate(self, domain_id)
 
     def _get_config_with_sensitive_info(self, domain_id, group=None,
                                         option=None):
@@ -1333,6 +1338,20 @@ class DomainConfigManager(manager.Manager):
         """
         return self._get_config_with_sensitive_info(domain_id)
 
+    @MEMOIZE_CONFIG
+    def get_config_version(self, domain_id):
+        """Get the version of the config for a domain.
+
+        This method is not exposed via the public API, but is used by the
+        identity manager to cheaply check whether the config of a domain has
+        changed.
+
+        :returns: the version, or None if the driver doesn't keep track of
+                  versions
+
+        """
+        return self.driver.get_config_version(domain_id)
+
     def get_config_default(self, group=None, option=None):
         """Get default config, or partial default config.
 
@@ -58,3 +58,15 @@ class RevokeDriverBase(object):
 
         """
         raise exception.NotImplemented()  # pragma: no cover
+
+    def prune_expired_events(self, batch_size=0):
+        """Delete the events of tokens which have all expired.
+
+        :param batch_size: maximum number of events deleted at once, or 0 to
+                           delete them all at once
+        :returns: the number of events deleted
+        :raises keystone.exception.NotImplemented: if the driver doesn't
+            support deleting expired events
+
+        """
+        raise exception.NotImplemented()  # pragma: no cover
@@ -39,46 +39,30 @@ class RevocationEvent(sql.ModelBase, sql.ModelDictMixin):
 
 
 class Revoke(base.RevokeDriverBase):
-    def _flush_batch_size(self, dialect):
-        batch_size = 0
-        if dialect == 'ibm_db_sa':
-            # This functionality is limited to DB2, because
-            # it is necessary to prevent the transaction log
-            # from filling up, whereas at least some of the
-            # other supported databases do not support update
-            # queries with LIMIT subqueries nor do they appear
-            # to require the use of such queries when deleting
-            # large numbers of records at once.
-            batch_size = 100
-            # Limit of 100 is known to not fill a transaction log
-            # of default maximum size while not significantly
-            # impacting the performance of large token purges on
-            # systems where the maximum transaction log size has
-            # been increased beyond the default.
-        return batch_size
-
-    def _prune_expired_events(self):
+    @oslo_db_api.wrap_db_retry(retry_on_deadlock=True)
+    def prune_expired_events(self, batch_size=0):
         oldest = base.revoked_before_cutoff_time()
 
-        with sql.session_for_write() as session:
-            dialect = session.bind.dialect.name
-            batch_size = self._flush_batch_size(dialect)
-            if batch_size > 0:
-                query = session.query(RevocationEvent.id)
-                query = query.filter(RevocationEvent.revoked_at < oldest)
-                query = query.limit(batch_size).subquery()
-                delete_query = (session.query(RevocationEvent).
-                                filter(RevocationEvent.id.in_(query)))
-                while True:
-                    rowcount = delete_query.delete(synchronize_session=False)
-                    if rowcount == 0:
-                        break
-            else:
+        if not batch_size:
+            with sql.session_for_write() as session:
                 query = session.query(RevocationEvent)
                 query = query.filter(RevocationEvent.revoked_at < oldest)
-                query.delete(synchronize_session=False)
+                return query.delete(synchronize_session=False)
 
-            session.flush()
+        # NOTE: Each batch is deleted in its own transaction, by ID since not
+        # every database supports deleting with a limit.
+        count = 0
+        while True:
+            with sql.session_for_write() as session:
+                query = session.query(RevocationEvent.id)
+                query = query.filter(RevocationEvent.revoked_at < oldest)
+                ids = [row.id for row in query.limit(batch_size)]
+                if ids:
+                    query = session.query(RevocationEvent)
+                    query = query.filter(RevocationEvent.id.in_(ids))
+                    count += query.delete(synchronize_session=False)
+            if len(ids) < batch_size:
+                return count
 
     def list_events(self, last_fetch=None):
         with sql.session_for_read() as session:
@@ -100,4 +84,3 @@ class Revoke(base.RevokeDriverBase):
         record = RevocationEvent(**kwargs)
         with sql.session_for_write() as session:
             session.add(record)
-            self._prune_expired_events()
@@ -12,18 +12,33 @@
 
 """Main entry point into the Revoke service."""
 
+import contextlib
+import datetime
+import itertools
+import threading
+import time
+
+from oslo_log import log
+
 from keystone.common import cache
 from keystone.common import dependency
 from keystone.common import extension
 from keystone.common import manager
 import keystone.conf
 from keystone import exception
-from keystone.i18n import _
+from keystone.i18n import _, _LE
 from keystone.models import revoke_model
 from keystone import notifications
 
 
 CONF = keystone.conf.CONF
+LOG = log.getLogger(__name__)
+
+# How long before the revocation epoch of a token its events are checked again,
+# see Manager.check_token(). This covers the time between reading the time an
+# event is revoked at and committing it, and differences between the clocks of
+# keystone servers.
+_EPOCH_OVERLAP = datetime.timedelta(seconds=60)
 
 
 EXTENSION_DATA = {
@@ -70,14 +85,40 @@ class Manager(manager.Manager):
         super(Manager, self).__init__(CONF.revoke.driver)
         self._register_listeners()
         self.model = revoke_model
+        self._last_prune = 0
+        self._prune_lock = threading.Lock()
+        self._snapshot = threading.local()
 
     @MEMOIZE
     def _list_events(self, last_fetch):
         return self.driver.list_events(last_fetch)
 
     def list_events(self, last_fetch=None):
+        if last_fetch is None:
+            events = getattr(self._snapshot, 'events', None)
+            if events is not None:
+                return events
         return self._list_events(last_fetch)
 
+    @contextlib.contextmanager
+    def snapshot(self):
+        """Check tokens against one list of events within a with statement.
+
+        The events are listed once when the block starts, so that validating
+        several tokens in it doesn't list them again for each one. Events
+        recorded meanwhile are only seen by the checks made afterwards.
+
+        """
+        if getattr(self._snapshot, 'events', None) is not None:
+            # Already within a snapshot, keep using it.
+            yield
+            return
+        self._snapshot.events = self._list_events(None)
+        try:
+            yield
+        finally:
+            self._snapshot.events = None
+
     def _user_callback(self, service, resource_type, operation,
                        payload):
         self.revoke_by_user(payload['resource_info'])
@@ -190,19 +231,66 @@ class Manager(manager.Manager):
         self.revoke(revoke_model.RevokeEvent(domain_id=domain_id,
                                              role_id=role_id))
 
-    def check_token(self, token_values):
+    def check_token(self, token_values, epoch=None):
         """Check the values from a token against the revocation list.
 
         :param token_values: dictionary of values from a token, normalized for
                              differences between v2 and v3. The checked values
                              are a subset of the attributes of model.TokenEvent
+        :param epoch: the revocation epoch returned when the token was last
+                      checked, so that only the events recorded since are
+                      checked, or None to check every event
 
         :raises keystone.exception.TokenNotFound: If the token is invalid.
+        :returns: the revocation epoch the token has been checked against
 
         """
-        if revoke_model.is_revoked(self.list_events(), token_values):
+        all_events = events = self.list_events()
+        if epoch is not None:
+            # NOTE: The events are sorted by the time they were revoked at.
+            # Those revoked a little before the epoch are checked again, in
+            # case they were committed after the epoch was read.
+            since = epoch - _EPOCH_OVERLAP
+            events = list(itertools.takewhile(
+                lambda event: event.revoked_at > since, reversed(events)))
+        if revoke_model.is_revoked(events, token_values):
             raise exception.TokenNotFound(_('Failed to validate token'))
+        return all_events[-1].revoked_at if all_events else None
 
     def revoke(self, event):
         self.driver.revoke(event)
         REVOKE_REGION.invalidate()
+        self._prune_periodically()
+
+    def prune_expired_events(self):
+        """Delete the events of tokens which have all expired.
+
+        :returns: the number of events deleted
+        :raises keystone.exception.NotImplemented: if the driver doesn't
+            support deleting expired events
+
+        """
+        count = self.driver.prune_expired_events(
+            CONF.revoke.prune_batch_size)
+        if count:
+            REVOKE_REGION.invalidate()
+        return count
+
+    def _prune_periodically(self):
+        interval = CONF.revoke.prune_interval
+        if not interval:
+            return
+        with self._prune_lock:
+            now = time.time()
+            if now < self._last_prune + interval:
+                return
+            self._last_prune = now
+        try:
+            self.prune_expired_events()
+        except exception.NotImplemented:  # nosec
+            # NOTE: Drivers which can't prune events keep them all.
+            pass
+        except Exception:
+            # NOTE: The revocation is already recorded, so failing to delete
+            # expired events must not fail the request.
+            LOG.exception(_LE('Unable to delete expired revocation events.'))
@@ -0,0 +1,149 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure truncated SQL lists, counting the rows or fetching one more.
+
+A table of users is filled with ``--rows`` rows spread over ten domains, then
+lists of ``--limit`` users are read through ``sql.filter_limit_query``, both
+with and without a domain filter. The median time of each list is reported
+for the former strategy, which counted the matching rows before fetching
+them, and the current one, which fetches one more row than the limit::
+
+    python -m keystone.tests.benchmarks.list_truncation --rows 1000000
+
+The database is a temporary SQLite file unless ``--connection`` is given.
+
+"""
+
+import argparse
+import os
+import tempfile
+import uuid
+
+import sqlalchemy
+from sqlalchemy.ext import declarative
+from sqlalchemy import orm
+
+from keystone.common import driver_hints
+from keystone.common import sql
+from keystone.tests.benchmarks import suite
+
+
+ModelBase = declarative.declarative_base()
+
+
+class User(ModelBase, sql.ModelDictMixin):
+    __tablename__ = 'benchmark_user'
+    attributes = ['id', 'name', 'domain_id', 'enabled']
+    id = sql.Column(sql.String(64), primary_key=True)
+    name = sql.Column(sql.String(255), nullable=False)
+    domain_id = sql.Column(sql.String(64), nullable=False, index=True)
+    enabled = sql.Column(sql.Boolean)
+
+
+def _count_then_limit(model, query, hints):
+    """Truncate a list the way filter_limit_query used to."""
+    query = sql.core._filter(model, query, hints)
+    query = sql.core._paginate(model, query, hints)
+    original_len = query.count()
+    limit_query = query.limit(hints.limit['limit'])
+    if limit_query.count() < original_len:
+        hints.limit['truncated'] = True
+        query = limit_query
+    return list(query)
+
+
+def _fetch_one_more(model, query, hints):
+    return list(sql.filter_limit_query(model, query, hints))
+
+
+def _populate(engine, rows, batch_size=10000):
+    domain_ids = [uuid.uuid4().hex for i in range(10)]
+    ModelBase.metadata.create_all(engine)
+    table = User.__table__
+    for start in range(0, rows, batch_size):
+        with engine.begin() as connection:
+            connection.execute(table.insert(), [
+                {'id': uuid.uuid4().hex, 'name': 'user-%d' % i,
+                 'domain_id': domain_ids[i % len(domain_ids)],
+                 'enabled': True}
+                for i in range(start, min(start + batch_size, rows))])
+    return domain_ids
+
+
+def _hints(limit, domain_id):
+    hints = driver_hints.Hints()
+    if domain_id:
+        hints.add_filter('domain_id', domain_id)
+    hints.set_limit(limit)
+    return hints
+
+
+def _measure(session, strategy, limit, domain_id, repeat):
+    calls = [(_hints(limit, domain_id),) for i in range(repeat)]
+    durations, results = suite.time_calls(
+        lambda hints: strategy(User, session.query(User), hints), calls)
+    for (hints,), refs in zip(calls, results):
+        assert len(refs) == limit and hints.limit['truncated']
+    return suite.median(durations)
+
+
+def run(connection, rows, limit, repeat):
+    engine = sqlalchemy.create_engine(connection)
+    domain_ids = _populate(engine, rows)
+    session = orm.sessionmaker(bind=engine)()
+    try:
+        results = []
+        for name, domain_id in (('all users', None),
+                                ('one domain', domain_ids[0])):
+            results.append((
+                name,
+                _measure(session, _count_then_limit, limit, domain_id, repeat),
+                _measure(session, _fetch_one_more, limit, domain_id, repeat)))
+        return results
+    finally:
+        session.close()
+        ModelBase.metadata.drop_all(engine)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='number of users in the table')
+    parser.add_argument('--limit', type=int, default=100,
+                        help='number of users in each list')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of lists to read with each strategy')
+    parser.add_argument('--connection',
+                        help='SQLAlchemy URL of the database to use')
+    args = parser.parse_args(argv)
+
+    if args.connection:
+        results = run(args.connection, args.rows, args.limit, args.repeat)
+    else:
+        fd, path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        try:
+            results = run('sqlite:///%s' % path, args.rows, args.limit,
+                          args.repeat)
+        finally:
+            os.remove(path)
+
+    print('%-12s %16s %16s' % ('list', 'count_then_limit',
+                               'fetch_one_more'))
+    for name, before, after in results:
+        print('%-12s %14.2fms %14.2fms' % (name, before * 1000,
+                                           after * 1000))
+
+
+if __name__ == '__main__':
+    main()
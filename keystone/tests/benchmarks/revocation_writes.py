@@ -0,0 +1,149 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure how long recording a revocation takes, pruning or not.
+
+The revocation event table is filled with ``--events`` events, a hundredth of
+which have expired, then ``--repeat`` revocations are recorded. The median time
+of each is reported for the former strategy, which deleted the expired events
+in the same transaction as each revocation, and the current one, which only
+inserts the event and leaves the expired ones to a periodic job::
+
+    python -m keystone.tests.benchmarks.revocation_writes --events 10000 100000
+
+The database is a temporary SQLite file unless ``--connection`` is given.
+
+"""
+
+import argparse
+import datetime
+import os
+import tempfile
+import uuid
+
+import sqlalchemy
+from sqlalchemy import orm
+
+from keystone.revoke.backends import sql as revoke_sql
+from keystone.tests.benchmarks import suite
+
+
+RevocationEvent = revoke_sql.RevocationEvent
+
+
+def _new_event(revoked_at):
+    return {'user_id': uuid.uuid4().hex, 'issued_before': revoked_at,
+            'revoked_at': revoked_at}
+
+
+def _revoke_and_prune(session, cutoff):
+    """Record a revocation the way the SQL driver used to."""
+    session.add(RevocationEvent(**_new_event(datetime.datetime.utcnow())))
+    query = session.query(RevocationEvent)
+    query = query.filter(RevocationEvent.revoked_at < cutoff)
+    query.delete(synchronize_session=False)
+
+
+def _revoke(session, cutoff):
+    session.add(RevocationEvent(**_new_event(datetime.datetime.utcnow())))
+
+
+def _populate(engine, events, cutoff, batch_size=10000):
+    RevocationEvent.__table__.drop(engine, checkfirst=True)
+    RevocationEvent.__table__.create(engine)
+    now = datetime.datetime.utcnow()
+    for start in range(0, events, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, events)):
+            if i % 100:
+                revoked_at = now - datetime.timedelta(seconds=i % 3600)
+            else:
+                revoked_at = cutoff - datetime.timedelta(seconds=1)
+            rows.append(_new_event(revoked_at))
+        with engine.begin() as connection:
+            connection.execute(RevocationEvent.__table__.insert(), rows)
+
+
+def _expire(engine, events, cutoff):
+    """Expire some more events, as time would pass between revocations."""
+    with engine.begin() as connection:
+        connection.execute(
+            RevocationEvent.__table__.update().
+            where(RevocationEvent.id.in_(
+                sqlalchemy.select([RevocationEvent.id]).
+                where(RevocationEvent.revoked_at >= cutoff).
+                limit(max(events // 1000, 1)))).
+            values(revoked_at=cutoff - datetime.timedelta(seconds=1)))
+
+
+def _measure(engine, strategy, events, repeat):
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    _populate(engine, events, cutoff)
+    session = orm.sessionmaker(bind=engine)()
+
+    def revoke():
+        strategy(session, cutoff)
+        session.commit()
+
+    def calls():
+        for i in range(repeat):
+            yield ()
+            _expire(engine, events, cutoff)
+
+    try:
+        durations, _ = suite.time_calls(revoke, calls())
+    finally:
+        session.close()
+    return suite.median(durations)
+
+
+def run(connection, event_counts, repeat):
+    engine = sqlalchemy.create_engine(connection)
+    try:
+        return [(events,
+                 _measure(engine, _revoke_and_prune, events, repeat),
+                 _measure(engine, _revoke, events, repeat))
+                for events in event_counts]
+    finally:
+        RevocationEvent.__table__.drop(engine, checkfirst=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--events', type=int, nargs='+',
+                        default=[10000, 100000],
+                        help='numbers of events in the table')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='number of revocations to record with each '
+                             'strategy')
+    parser.add_argument('--connection',
+                        help='SQLAlchemy URL of the database to use')
+    args = parser.parse_args(argv)
+
+    if args.connection:
+        results = run(args.connection, args.events, args.repeat)
+    else:
+        fd, path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        try:
+            results = run('sqlite:///%s' % path, args.events, args.repeat)
+        finally:
+            os.remove(path)
+
+    print('%-10s %16s %16s' % ('events', 'revoke_and_prune', 'revoke'))
+    for events, before, after in results:
+        print('%-10d %14.2fms %14.2fms' % (events, before * 1000,
+                                           after * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure the cold start of a keystone WSGI application.
+
+Each sample starts a new Python process which imports keystone, initializes
+the WSGI application against an in-memory SQLite database and serves a first
+request. The time taken by each step, and the peak RSS of the process, are
+reported, with and without ``[DEFAULT] lazy_load_drivers``::
+
+    python -m keystone.tests.benchmarks.startup --samples 5
+
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+_ETC_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.pardir, os.pardir, os.pardir, 'etc'))
+
+_CONFIG = """
+[DEFAULT]
+lazy_load_drivers = %(lazy_load_drivers)s
+
+[database]
+connection = sqlite://
+
+[paste_deploy]
+config_file = %(etc_dir)s/keystone-paste.ini
+
+[oslo_policy]
+policy_file = %(etc_dir)s/policy.json
+"""
+
+
+def _child(config_file, path):
+    start = time.time()
+    from keystone.server import wsgi
+    import webob
+    imported = time.time()
+
+    application = wsgi.initialize_application(
+        name='main', config_files=[config_file])
+    initialized = time.time()
+
+    response = webob.Request.blank(path).get_response(application)
+    served = time.time()
+
+    # NOTE: ru_maxrss is in kilobytes on Linux, but in bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        max_rss //= 1024
+
+    print(json.dumps({'import': imported - start,
+                      'initialize': initialized - imported,
+                      'first_request': served - initialized,
+                      'total': served - start,
+                      'status': response.status_int,
+                      'max_rss_kb': max_rss}))
+
+
+def _sample(config_file, path):
+    output = subprocess.check_output(
+        [sys.executable, '-m', __name__, '--child', config_file,
+         '--path', path])
+    # Logging may also end up on stdout, the result is the last line.
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def run(samples, path):
+    # NOTE: The suite imports keystone, so it is only imported here, by the
+    # parent process, rather than by the children timing that import.
+    from keystone.tests.benchmarks import suite
+
+    results = {}
+    for lazy_load_drivers in (False, True):
+        with tempfile.NamedTemporaryFile('w', suffix='.conf') as f:
+            f.write(_CONFIG % {'lazy_load_drivers': lazy_load_drivers,
+                               'etc_dir': _ETC_DIR})
+            f.flush()
+            runs = [_sample(f.name, path) for i in range(samples)]
+        results[lazy_load_drivers] = dict(
+            (key, suite.median([r[key] for r in runs])) for key in runs[0])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--samples', type=int, default=3,
+                        help='number of processes to start for each mode')
+    parser.add_argument('--path', default='/v3',
+                        help='path of the first request')
+    parser.add_argument('--child', metavar='CONFIG_FILE',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.path)
+        return
+
+    results = run(args.samples, args.path)
+    print('%-18s %10s %12s %15s %10s %12s' % (
+        'lazy_load_drivers', 'import', 'initialize', 'first_request',
+        'total', 'max_rss_kb'))
+    for lazy_load_drivers, r in sorted(results.items()):
+        print('%-18s %9.3fs %11.3fs %14.3fs %9.3fs %12d' % (
+            lazy_load_drivers, r['import'], r['initialize'],
+            r['first_request'], r['total'], r['max_rss_kb']))
+
+
+if __name__ == '__main__':
+    main()
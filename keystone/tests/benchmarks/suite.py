@@ -0,0 +1,319 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure keystone's hot paths offline, with the unit test fixtures.
+
+Each benchmark sets keystone up the way the unit tests do, against an
+in-memory SQLite database and the fake LDAP server, fills it with data of the
+sizes given on the command line, then times each operation ``--repeat``
+times. The benchmarks are:
+
+* ``tokens``: issuing, validating and revoking project scoped tokens, with
+  each token provider of ``--providers``
+* ``catalog``: building the v3 catalog of ``--services`` services
+* ``assignments``: expanding the effective role assignments of a user who is
+  a member of ``--groups`` groups, with roles on ``--projects`` projects
+* ``mapping``: applying a federation mapping of ``--rules`` rules
+* ``ldap``: listing ``--users`` users from LDAP
+
+Run it from the top of the tree, as the PKI provider reads the example
+certificates from there::
+
+    python -m keystone.tests.benchmarks.suite --json > results.json
+    python -m keystone.tests.benchmarks.suite --only tokens --providers fernet
+
+The results are printed as a table, or with ``--json`` as a JSON document
+holding the parameters and the minimum, median, 90th percentile and maximum
+duration of each operation in seconds, so that runs can be compared between
+releases. Caching is disabled unless ``--cache`` is given, in which case the
+in-memory cache of the unit tests is used.
+
+The other benchmarks of this package time their calls and summarize the
+durations with the helpers of this module.
+
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import time
+import uuid
+
+import pbr.version
+
+import keystone.conf
+from keystone.federation import utils as federation_utils
+from keystone.tests import unit
+from keystone.tests.unit import default_fixtures
+from keystone.tests.unit import ksfixtures
+from keystone.tests.unit.ksfixtures import database
+from keystone.tests.unit.ksfixtures import ldapdb
+
+
+CONF = keystone.conf.CONF
+
+BENCHMARKS = ('tokens', 'catalog', 'assignments', 'mapping', 'ldap')
+PROVIDERS = ('fernet', 'uuid', 'pki')
+
+
+class Environment(unit.TestCase):
+    """Keystone set up like for a unit test, for the benchmarks to drive."""
+
+    def __init__(self, overrides=None, ldap=False, cache=False):
+        super(Environment, self).__init__('runTest')
+        self._overrides = overrides or {}
+        self._ldap = ldap
+        self._cache = cache
+
+    def runTest(self):
+        """Unused, the benchmarks call setUp() and doCleanups() directly."""
+
+    def config_files(self):
+        config_files = super(Environment, self).config_files()
+        if self._ldap:
+            config_files.append(unit.dirs.tests_conf('backend_ldap.conf'))
+        return config_files
+
+    def config_overrides(self):
+        super(Environment, self).config_overrides()
+        if not self._cache:
+            self.config_fixture.config(group='cache', enabled=False)
+        for group, options in self._overrides.items():
+            self.config_fixture.config(group=group, **options)
+
+    def setUp(self):
+        super(Environment, self).setUp()
+        self.useFixture(database.Database())
+        if self._ldap:
+            self.useFixture(ldapdb.LDAPDatabase())
+        self.useFixture(ksfixtures.KeyRepository(
+            self.config_fixture, 'fernet_tokens',
+            CONF.fernet_tokens.max_active_keys))
+        self.load_backends()
+        self.load_fixtures(default_fixtures)
+
+
+@contextlib.contextmanager
+def _environment(args, **kwargs):
+    env = Environment(cache=args.cache, **kwargs)
+    env.setUp()
+    try:
+        yield env
+    finally:
+        env.doCleanups()
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def stats(durations):
+    durations = sorted(durations)
+    return {'samples': len(durations),
+            'min': durations[0],
+            'median': median(durations),
+            'p90': durations[int(len(durations) * 0.9)],
+            'max': durations[-1]}
+
+
+def time_calls(f, calls):
+    """Call f with each tuple of arguments and return the durations.
+
+    The results of the calls are returned too. ``calls`` may be a generator,
+    which can prepare the next call between two timed calls.
+
+    """
+    durations = []
+    results = []
+    for args in calls:
+        start = time.time()
+        results.append(f(*args))
+        durations.append(time.time() - start)
+    return durations, results
+
+
+def _create_catalog(env, services):
+    region = unit.new_region_ref()
+    env.catalog_api.create_region(region)
+    for i in range(services):
+        service = unit.new_service_ref()
+        env.catalog_api.create_service(service['id'], service)
+        for interface in ('public', 'internal', 'admin'):
+            endpoint = unit.new_endpoint_ref(service['id'],
+                                             interface=interface,
+                                             region_id=region['id'])
+            env.catalog_api.create_endpoint(endpoint['id'], endpoint)
+
+
+def _create_member(env, projects=1):
+    """Create a user with a role on new projects of the default domain."""
+    domain_id = CONF.identity.default_domain_id
+    user = unit.create_user(env.identity_api, domain_id)
+    role = unit.new_role_ref()
+    env.role_api.create_role(role['id'], role)
+    project_ids = []
+    for i in range(projects):
+        project = unit.new_project_ref(domain_id=domain_id)
+        env.resource_api.create_project(project['id'], project)
+        env.assignment_api.create_grant(role['id'], user_id=user['id'],
+                                        project_id=project['id'])
+        project_ids.append(project['id'])
+    return user, project_ids
+
+
+def bench_tokens(args):
+    results = {}
+    for provider in args.providers:
+        with _environment(args,
+                          overrides={'token': {'provider': provider}}) as env:
+            _create_catalog(env, args.services)
+            user, (project_id,) = _create_member(env)
+            api = env.token_provider_api
+
+            durations, issued = time_calls(
+                lambda: api.issue_v3_token(user['id'], ['password'],
+                                           project_id=project_id),
+                [()] * args.repeat)
+            results['tokens.%s.issue' % provider] = stats(durations)
+
+            token_ids = [(token_id,) for token_id, token_data in issued]
+            durations, _ = time_calls(api.validate_v3_token, token_ids)
+            results['tokens.%s.validate' % provider] = stats(durations)
+
+            durations, _ = time_calls(api.revoke_token, token_ids)
+            results['tokens.%s.revoke' % provider] = stats(durations)
+    return results
+
+
+def bench_catalog(args):
+    with _environment(args) as env:
+        _create_catalog(env, args.services)
+        user, (project_id,) = _create_member(env)
+        durations, _ = time_calls(env.catalog_api.get_v3_catalog,
+                                  [(user['id'], project_id)] * args.repeat)
+    return {'catalog.get_v3_catalog': stats(durations)}
+
+
+def bench_assignments(args):
+    with _environment(args) as env:
+        domain_id = CONF.identity.default_domain_id
+        user, project_ids = _create_member(env, args.projects)
+        role = unit.new_role_ref()
+        env.role_api.create_role(role['id'], role)
+        for i in range(args.groups):
+            group = env.identity_api.create_group(
+                unit.new_group_ref(domain_id=domain_id))
+            env.identity_api.add_user_to_group(user['id'], group['id'])
+            env.assignment_api.create_grant(role['id'], group_id=group['id'],
+                                            domain_id=domain_id,
+                                            inherited_to_projects=True)
+
+        durations, _ = time_calls(
+            lambda: env.assignment_api.list_role_assignments(
+                user_id=user['id'], effective=True),
+            [()] * args.repeat)
+        results = {'assignments.list_effective': stats(durations)}
+        durations, _ = time_calls(
+            env.assignment_api.get_roles_for_user_and_project,
+            [(user['id'], project_ids[0])] * args.repeat)
+        results['assignments.roles_for_project'] = stats(durations)
+    return results
+
+
+def bench_mapping(args):
+    group_ids = [uuid.uuid4().hex for i in range(args.rules)]
+    rules = [{'local': [{'user': {'name': '{0}'}}],
+              'remote': [{'type': 'UserName'}]}]
+    for i, group_id in enumerate(group_ids):
+        rules.append({'local': [{'group': {'id': group_id}}],
+                      'remote': [{'type': 'orgPersonType',
+                                  'any_one_of': ['Type%d' % i]}]})
+    # Half of the rules match the assertion.
+    assertion = {'UserName': 'bob',
+                 'orgPersonType': ';'.join('Type%d' % i
+                                           for i in range(0, args.rules, 2))}
+    with _environment(args):
+        processor = federation_utils.RuleProcessor(uuid.uuid4().hex, rules)
+        durations, _ = time_calls(processor.process,
+                                  [(assertion,)] * args.repeat)
+    return {'mapping.process': stats(durations)}
+
+
+def bench_ldap(args):
+    with _environment(args, ldap=True,
+                      overrides={'identity': {'driver': 'ldap'}}) as env:
+        domain_id = CONF.identity.default_domain_id
+        for i in range(args.users):
+            env.identity_api.create_user(unit.new_user_ref(domain_id))
+        durations, _ = time_calls(env.identity_api.list_users,
+                                  [()] * args.repeat)
+    return {'ldap.list_users': stats(durations)}
+
+
+def run(args):
+    results = {}
+    for name in args.benchmarks:
+        results.update(globals()['bench_%s' % name](args))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS,
+                        default=list(BENCHMARKS), dest='benchmarks',
+                        help='benchmarks to run, all of them by default')
+    parser.add_argument('--providers', nargs='+', choices=PROVIDERS,
+                        default=list(PROVIDERS),
+                        help='token providers to benchmark')
+    parser.add_argument('--repeat', type=int, default=50,
+                        help='number of times each operation is timed')
+    parser.add_argument('--services', type=int, default=10,
+                        help='number of services in the catalog, each with '
+                             'three endpoints')
+    parser.add_argument('--projects', type=int, default=100,
+                        help='number of projects the user has a role on')
+    parser.add_argument('--groups', type=int, default=10,
+                        help='number of groups the user is a member of')
+    parser.add_argument('--rules', type=int, default=100,
+                        help='number of rules in the federation mapping')
+    parser.add_argument('--users', type=int, default=1000,
+                        help='number of users in LDAP')
+    parser.add_argument('--cache', action='store_true',
+                        help='enable the in-memory cache')
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+
+    if args.json:
+        parameters = dict(vars(args))
+        del parameters['json']
+        print(json.dumps({
+            'keystone': pbr.version.VersionInfo('keystone').version_string(),
+            'python': platform.python_version(),
+            'parameters': parameters,
+            'results': results}, indent=2, sort_keys=True))
+        return
+
+    print('%-32s %10s %10s %10s %10s' % (
+        'operation', 'min', 'median', 'p90', 'max'))
+    for name, r in sorted(results.items()):
+        print('%-32s %8.2fms %8.2fms %8.2fms %8.2fms' % (
+            name, r['min'] * 1000, r['median'] * 1000, r['p90'] * 1000,
+            r['max'] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -557,6 +557,87 @@ class AssignmentTests(AssignmentTestHelperMixin):
         }
         self.execute_assignment_plan(test_plan)
 
+    def test_list_role_assignments_filtered_by_role_ids(self):
+        """Test listing driver assignments for any of several roles."""
+        test_plan = {
+            'entities': {'domains': {'id': CONF.identity.default_domain_id,
+                                     'users': 1, 'projects': 1},
+                         'roles': 3},
+            'assignments': [{'user': 0, 'role': 0, 'project': 0},
+                            {'user': 0, 'role': 1, 'project': 0},
+                            {'user': 0, 'role': 2, 'project': 0}],
+        }
+        test_data = self.create_entities(test_plan['entities'])
+        self.create_assignments(test_plan['assignments'], test_data)
+        role_ids = [test_data['roles'][0]['id'], test_data['roles'][2]['id']]
+
+        refs = self.assignment_api.driver.list_role_assignments(
+            role_ids=role_ids)
+        self.assertItemsEqual(role_ids, [ref['role_id'] for ref in refs])
+
+        refs = self.assignment_api.driver.list_role_assignments(role_ids=[])
+        self.assertEqual([], refs)
+
+    def test_list_role_assignments_matching_any(self):
+        user = unit.new_user_ref(domain_id=CONF.identity.default_domain_id)
+        user = self.identity_api.create_user(user)
+        group = unit.new_group_ref(domain_id=CONF.identity.default_domain_id)
+        group = self.identity_api.create_group(group)
+        role = unit.new_role_ref()
+        self.role_api.create_role(role['id'], role)
+        self.assignment_api.create_grant(
+            role['id'], user_id=user['id'], project_id=self.tenant_bar['id'])
+        self.assignment_api.create_grant(
+            role['id'], group_id=group['id'],
+            domain_id=CONF.identity.default_domain_id)
+
+        refs = self.assignment_api.driver.list_role_assignments_matching_any([
+            {'user_id': user['id'], 'project_ids': [self.tenant_bar['id']],
+             'inherited_to_projects': False},
+            {'group_ids': [group['id']],
+             'domain_id': CONF.identity.default_domain_id}])
+        self.assertItemsEqual(
+            [(user['id'], self.tenant_bar['id']),
+             (group['id'], CONF.identity.default_domain_id)],
+            [(ref.get('user_id') or ref.get('group_id'),
+              ref.get('project_id') or ref.get('domain_id'))
+             for ref in refs])
+
+        self.assertEqual(
+            [], self.assignment_api.driver.list_role_assignments_matching_any(
+                []))
+
+    def test_list_effective_role_assignments_queries_driver_once(self):
+        user = unit.new_user_ref(domain_id=CONF.identity.default_domain_id)
+        user = self.identity_api.create_user(user)
+        group = unit.new_group_ref(domain_id=CONF.identity.default_domain_id)
+        group = self.identity_api.create_group(group)
+        self.identity_api.add_user_to_group(user['id'], group['id'])
+        role = unit.new_role_ref()
+        self.role_api.create_role(role['id'], role)
+        self.assignment_api.create_grant(
+            role['id'], user_id=user['id'], project_id=self.tenant_bar['id'])
+        self.assignment_api.create_grant(
+            role['id'], group_id=group['id'], project_id=self.tenant_bar['id'])
+
+        with mock.patch.object(
+                self.assignment_api.driver,
+                'list_role_assignments_matching_any',
+                wraps=self.assignment_api.driver.
+                list_role_assignments_matching_any) as matching_any:
+            refs = self.assignment_api.list_role_assignments(
+                user_id=user['id'], project_id=self.tenant_bar['id'],
+                effective=True)
+        self.assertEqual(1, matching_any.call_count)
+        self.assertEqual(2, len(refs))
+
+        refs = self.assignment_api.list_role_assignments(
+            user_id=user['id'], project_id=self.tenant_bar['id'],
+            effective=True, compact=True)
+        self.assertEqual([{'user_id': user['id'],
+                           'project_id': self.tenant_bar['id'],
+                           'role_id': role['id']}], refs)
+
     def test_list_group_role_assignment(self):
         # When a group role assignment is created and the role assignments are
         # listed then the group role assignment is included in the list.
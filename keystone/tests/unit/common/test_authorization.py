@@ -16,6 +16,8 @@
 import copy
 import uuid
 
+import mock
+
 from keystone.common import authorization
 from keystone import exception
 from keystone.federation import constants as federation_constants
@@ -159,3 +161,27 @@ class TestTokenToAuthContext(unit.BaseTestCase):
 
         self.assertRaises(exception.Unauthorized,
                           authorization.token_to_auth_context, token)
+
+    def test_auth_context_is_built_once_per_token(self):
+        token_data = copy.deepcopy(test_token_provider.SAMPLE_V3_TOKEN)
+        token = token_model.KeystoneToken(token_id=uuid.uuid4().hex,
+                                          token_data=token_data)
+
+        with mock.patch.object(authorization, '_build_auth_context',
+                               wraps=authorization._build_auth_context) as m:
+            auth_context = authorization.token_to_auth_context(token)
+            auth_context['user_id'] = uuid.uuid4().hex
+            auth_context2 = authorization.token_to_auth_context(token)
+            self.assertEqual(1, m.call_count)
+
+        # Each caller gets its own copy of the auth context.
+        self.assertEqual(token.user_id, auth_context2['user_id'])
+        auth_context2['roles'].append(uuid.uuid4().hex)
+        self.assertEqual(token.role_names,
+                         authorization.token_to_auth_context(token)['roles'])
+
+        # Changing the token means the auth context is built again.
+        token.pop('OS-TRUST:trust')
+        auth_context3 = authorization.token_to_auth_context(token)
+        self.assertTrue(auth_context2['is_delegated_auth'])
+        self.assertFalse(auth_context3['is_delegated_auth'])
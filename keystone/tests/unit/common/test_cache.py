@@ -10,13 +10,16 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
 import uuid
 
 from dogpile.cache import api as dogpile
 from dogpile.cache.backends import memory
+import mock
 from oslo_config import fixture as config_fixture
 
 from keystone.common import cache
+from keystone.common import metrics
 import keystone.conf
 from keystone.tests import unit
 
@@ -195,3 +198,132 @@ class TestCacheRegion(unit.BaseTestCase):
         # test invalidation
         cache.CACHE_INVALIDATION_REGION.delete(region_key)
         self.assertIsInstance(self.region0.get(key), dogpile.NoValue)
+
+    def test_region_id_cache_time(self):
+        self.config_fixture.config(group='cache', region_id_cache_time=60)
+        memoize = cache.get_memoization_decorator('cache', region=self.region0)
+
+        @memoize
+        def func(value):
+            return value + uuid.uuid4().hex
+
+        key = uuid.uuid4().hex
+        with mock.patch.object(cache.CACHE_INVALIDATION_REGION,
+                               'get_or_create',
+                               wraps=cache.CACHE_INVALIDATION_REGION.
+                               get_or_create) as get_region_id:
+            return_value = func(key)
+            self.assertEqual(return_value, func(key))
+            # The region ID is only read from the invalidation region once.
+            self.assertEqual(1, get_region_id.call_count)
+
+        # invalidating region0 is seen by region0 straight away
+        self.region0.invalidate()
+        new_value = func(key)
+        self.assertNotEqual(return_value, new_value)
+
+        # invalidating region1 is only seen by region0 once its copy of the
+        # region ID has expired
+        self.region1.invalidate()
+        self.assertEqual(new_value, func(key))
+        with mock.patch.object(cache.core.time, 'time',
+                               return_value=time.time() + 61):
+            self.assertNotEqual(new_value, func(key))
+
+
+class TestLocalCacheProxy(unit.BaseTestCase):
+
+    def setUp(self):
+        super(TestLocalCacheProxy, self).setUp()
+        self.backend = memory.MemoryBackend({'cache_dict': {}})
+        self.local_cache = cache._local_cache._LocalCacheProxy(size=2, ttl=30)
+        self.local_cache.wrap(self.backend)
+
+    def _cached_value(self, payload):
+        return dogpile.CachedValue(payload=payload,
+                                   metadata={'ct': time.time(), 'v': 1})
+
+    def test_get_is_served_locally(self):
+        key = uuid.uuid4().hex
+        self.backend.set(key, self._cached_value({'name': 'a'}))
+
+        self.assertEqual({'name': 'a'}, self.local_cache.get(key).payload)
+        with mock.patch.object(self.backend, 'get') as backend_get:
+            value = self.local_cache.get(key)
+            self.assertFalse(backend_get.called)
+        self.assertEqual({'name': 'a'}, value.payload)
+        self.assertEqual({'hits': 1, 'misses': 1, 'size': 1},
+                         self.local_cache.get_stats())
+
+        # Each caller gets its own copy of the value.
+        value.payload['name'] = 'b'
+        self.assertEqual({'name': 'a'}, self.local_cache.get(key).payload)
+
+    def test_least_recently_used_is_evicted(self):
+        keys = [uuid.uuid4().hex for i in range(3)]
+        for key in keys[:2]:
+            self.local_cache.set(key, self._cached_value(key))
+        # Use the first key, so that the second is the least recently used.
+        self.local_cache.get(keys[0])
+        self.local_cache.set(keys[2], self._cached_value(keys[2]))
+
+        with mock.patch.object(self.backend, 'get',
+                               wraps=self.backend.get) as backend_get:
+            for key in (keys[0], keys[2], keys[1]):
+                self.assertEqual(key, self.local_cache.get(key).payload)
+            backend_get.assert_called_once_with(keys[1])
+
+    def test_expired_values_are_read_from_the_backend(self):
+        key = uuid.uuid4().hex
+        self.local_cache.set(key, self._cached_value('a'))
+        self.backend.set(key, self._cached_value('b'))
+        self.assertEqual('a', self.local_cache.get(key).payload)
+        with mock.patch.object(cache._local_cache.time, 'time',
+                               return_value=time.time() + 31):
+            self.assertEqual('b', self.local_cache.get(key).payload)
+
+    def test_delete(self):
+        key = uuid.uuid4().hex
+        self.local_cache.set(key, self._cached_value('a'))
+        self.local_cache.delete(key)
+        self.assertIs(dogpile.NO_VALUE, self.local_cache.get(key))
+
+    def test_configure_cache_with_local_cache(self):
+        config_fixture_ = self.useFixture(config_fixture.Config(CONF))
+        config_fixture_.config(group='cache',
+                               backend='dogpile.cache.memory',
+                               local_cache_size=10)
+        region = cache.create_region(uuid.uuid4().hex)
+        cache.configure_cache(region=region)
+
+        key = uuid.uuid4().hex
+        region.set(key, 'a')
+        self.assertEqual('a', region.get(key))
+        self.assertEqual(1, cache.get_local_cache_stats()[region.name]['size'])
+
+
+class TestMetricsProxy(unit.BaseTestCase):
+
+    def setUp(self):
+        super(TestMetricsProxy, self).setUp()
+        self.config_fixture = self.useFixture(config_fixture.Config(CONF))
+        self.config_fixture.config(group='cache',
+                                   backend='dogpile.cache.memory')
+        self.config_fixture.config(group='metrics', enabled=True)
+        self.addCleanup(metrics.reset)
+
+    def test_hits_and_misses_are_counted(self):
+        region = cache.create_region(uuid.uuid4().hex)
+        cache.configure_cache(region=region)
+
+        key = uuid.uuid4().hex
+        self.assertIs(dogpile.NO_VALUE, region.get(key))
+        region.set(key, 'a')
+        self.assertEqual('a', region.get(key))
+        region.get_multi([key, uuid.uuid4().hex])
+
+        counters = metrics.get_counters()
+        for result, count in (('hit', 2), ('miss', 2)):
+            labels = (('region', region.name), ('result', result))
+            self.assertEqual(
+                count, counters[('keystone_cache_lookups_total', labels)])
@@ -0,0 +1,55 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import uuid
+
+import fixtures
+import mock
+
+from keystone.common import manager
+from keystone.tests import unit
+
+
+class TestManager(unit.TestCase):
+
+    def setUp(self):
+        super(TestManager, self).setUp()
+        self.driver = mock.Mock()
+        self.load_driver = self.useFixture(fixtures.MockPatchObject(
+            manager, 'load_driver', return_value=self.driver)).mock
+
+    def test_driver_is_loaded_on_init(self):
+        driver_name = uuid.uuid4().hex
+        m = manager.Manager(driver_name)
+        self.load_driver.assert_called_once_with(None, driver_name)
+        self.assertIs(self.driver, m.driver)
+
+    def test_driver_is_loaded_on_first_use(self):
+        self.config_fixture.config(lazy_load_drivers=True)
+        driver_name = uuid.uuid4().hex
+        m = manager.Manager(driver_name)
+        self.assertFalse(self.load_driver.called)
+
+        # Calls are forwarded to the driver, which is only loaded once.
+        m.do_something()
+        m.do_something_else()
+        self.load_driver.assert_called_once_with(None, driver_name)
+        self.driver.do_something.assert_called_once_with()
+        self.driver.do_something_else.assert_called_once_with()
+
+    def test_driver_can_be_replaced(self):
+        self.config_fixture.config(lazy_load_drivers=True)
+        m = manager.Manager(uuid.uuid4().hex)
+        driver = mock.Mock()
+        m.driver = driver
+        self.assertIs(driver, m.driver)
+        self.assertFalse(self.load_driver.called)
@@ -0,0 +1,131 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import threading
+import uuid
+
+import fixtures
+import mock
+
+from keystone.common import manager
+from keystone.common import metrics
+from keystone.tests import unit
+
+
+class FakeDriver(object):
+
+    def get_thing(self, thing_id):
+        return thing_id
+
+    @property
+    def broken(self):
+        raise AssertionError('properties must not be evaluated')
+
+
+class TimedManager(manager.Manager):
+
+    def do_work(self):
+        return 'done'
+
+
+class TestMetrics(unit.TestCase):
+
+    def setUp(self):
+        super(TestMetrics, self).setUp()
+        self.config_fixture.config(group='metrics', enabled=True)
+        self.addCleanup(metrics.reset)
+
+    def test_nothing_is_recorded_when_disabled(self):
+        self.config_fixture.config(group='metrics', enabled=False)
+        metrics.timed('keystone_test_seconds')(lambda: None)()
+        with metrics.timer('keystone_test_seconds'):
+            pass
+        self.assertEqual({}, metrics.get_histograms())
+
+    def test_timed_records_each_call(self):
+        f = metrics.timed('keystone_test_seconds', op='a')(lambda x: x)
+        self.assertEqual(1, f(1))
+        self.assertEqual(2, f(2))
+        histogram = metrics.get_histograms()[
+            ('keystone_test_seconds', (('op', 'a'),))]
+        self.assertEqual(2, histogram['count'])
+
+    def test_buckets_are_cumulative(self):
+        metrics.observe('keystone_test_seconds', 0.003)
+        metrics.observe('keystone_test_seconds', 20)
+        buckets = dict(metrics.get_histograms()[
+            ('keystone_test_seconds', ())]['buckets'])
+        self.assertEqual(0, buckets[0.0025])
+        self.assertEqual(1, buckets[0.005])
+        self.assertEqual(1, buckets[10.0])
+        self.assertEqual(2, buckets[float('inf')])
+
+    def test_prometheus_text(self):
+        metrics.observe('keystone_test_seconds', 0.5, mode='read')
+        metrics.increment('keystone_test_total', 3, result='hit')
+        lines = metrics.to_prometheus_text().splitlines()
+        self.assertIn('# TYPE keystone_test_seconds histogram', lines)
+        self.assertIn(
+            'keystone_test_seconds_bucket{mode="read",le="0.5"} 1', lines)
+        self.assertIn(
+            'keystone_test_seconds_bucket{mode="read",le="+Inf"} 1', lines)
+        self.assertIn('keystone_test_seconds_sum{mode="read"} 0.5', lines)
+        self.assertIn('keystone_test_seconds_count{mode="read"} 1', lines)
+        self.assertIn('# TYPE keystone_test_total counter', lines)
+        self.assertIn('keystone_test_total{result="hit"} 3', lines)
+
+    def test_instrument_driver(self):
+        driver = metrics.instrument_driver(FakeDriver())
+        self.assertIsInstance(driver, FakeDriver)
+        thing_id = uuid.uuid4().hex
+        self.assertEqual(thing_id, driver.get_thing(thing_id))
+        method = '%s.FakeDriver.get_thing' % __name__
+        self.assertIn(('keystone_driver_call_seconds', (('method', method),)),
+                      metrics.get_histograms())
+
+    def test_manager_methods_are_timed(self):
+        self.useFixture(fixtures.MockPatchObject(manager, 'load_driver'))
+        self.assertEqual('done', TimedManager(None).do_work())
+        method = '%s.TimedManager.do_work' % __name__
+        self.assertIn(('keystone_manager_call_seconds', (('method', method),)),
+                      metrics.get_histograms())
+
+    def test_statsd(self):
+        self.config_fixture.config(group='metrics', statsd_host='127.0.0.1',
+                                   statsd_port=8125)
+        self.useFixture(fixtures.MockPatchObject(metrics, '_STATSD',
+                                                 threading.local()))
+        with mock.patch.object(metrics.socket, 'socket') as socket:
+            metrics.observe('keystone_test_seconds', 0.25, mode='read')
+            metrics.increment('keystone_test_total', result='hit')
+        socket.return_value.send.assert_has_calls([
+            mock.call(b'keystone.keystone_test_seconds.read:250|ms'),
+            mock.call(b'keystone.keystone_test_total.hit:1|c')])
+
+    def test_statsd_host_is_resolved_once(self):
+        self.config_fixture.config(group='metrics', statsd_host='127.0.0.1',
+                                   statsd_port=8125)
+        self.useFixture(fixtures.MockPatchObject(metrics, '_STATSD',
+                                                 threading.local()))
+        with mock.patch.object(metrics.socket, 'socket') as socket:
+            metrics.increment('keystone_test_total', result='hit')
+            metrics.increment('keystone_test_total', result='miss')
+            socket.return_value.connect.assert_called_once_with(
+                ('127.0.0.1', 8125))
+            self.assertEqual(2, socket.return_value.send.call_count)
+
+            # A new address connects a new socket.
+            self.config_fixture.config(group='metrics', statsd_port=8126)
+            metrics.increment('keystone_test_total', result='hit')
+            socket.return_value.close.assert_called_once_with()
+            socket.return_value.connect.assert_called_with(
+                ('127.0.0.1', 8126))
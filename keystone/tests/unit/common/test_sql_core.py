@@ -10,9 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-
+import mock
 from sqlalchemy.ext import declarative
 
+from keystone.common import driver_hints
 from keystone.common import sql
 from keystone.tests import unit
 from keystone.tests.unit import utils
@@ -50,3 +51,34 @@ class TestModelDictMixin(unit.BaseTestCase):
         m = TestModel(id=expected['id'], text=expected['text'])
         m.extra = 'this should not be in the dictionary'
         self.assertEqual(expected, m.to_dict())
+
+
+class TestFilterLimitQuery(unit.BaseTestCase):
+
+    def _query(self, refs):
+        query = mock.Mock()
+        query.order_by.return_value = query
+        query.limit.return_value.all.return_value = refs
+        return query
+
+    def test_one_more_row_than_the_limit_is_fetched(self):
+        refs = [TestModel(id=utils.new_uuid()) for i in range(3)]
+        query = self._query(refs)
+        hints = driver_hints.Hints()
+        hints.set_limit(2)
+
+        self.assertEqual(refs[:2],
+                         sql.filter_limit_query(TestModel, query, hints))
+        query.limit.assert_called_once_with(3)
+        self.assertFalse(query.count.called)
+        self.assertTrue(hints.limit['truncated'])
+
+    def test_not_truncated_when_within_the_limit(self):
+        refs = [TestModel(id=utils.new_uuid()) for i in range(2)]
+        query = self._query(refs)
+        hints = driver_hints.Hints()
+        hints.set_limit(2)
+
+        self.assertEqual(refs, sql.filter_limit_query(TestModel, query, hints))
+        self.assertFalse(query.count.called)
+        self.assertFalse(hints.limit['truncated'])
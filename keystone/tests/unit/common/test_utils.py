@@ -16,6 +16,7 @@ import fixtures
 import uuid
 
 import freezegun
+import mock
 from oslo_config import fixture as config_fixture
 from oslo_log import log
 from oslo_serialization import jsonutils
@@ -44,6 +45,32 @@ class UtilsTestCase(unit.BaseTestCase):
         super(UtilsTestCase, self).setUp()
         self.config_fixture = self.useFixture(config_fixture.Config(CONF))
 
+    def test_dump_json_as_bytes_with_ujson(self):
+        self.config_fixture.config(json_encoder='ujson')
+        ujson = mock.Mock()
+        ujson.dumps.return_value = '{}'
+        self.useFixture(fixtures.MockPatchObject(common_utils, 'ujson', ujson))
+
+        obj = {'users': [{'id': uuid.uuid4().hex, 'enabled': True,
+                          'options': {'count': 1, 'ratio': 0.5}}],
+               'links': {'next': None}}
+        self.assertEqual(b'{}', common_utils.dump_json_as_bytes(obj))
+        ujson.dumps.assert_called_once_with(obj, escape_forward_slashes=False)
+
+    def test_dump_json_as_bytes_ujson_falls_back(self):
+        self.config_fixture.config(json_encoder='ujson')
+        ujson = mock.Mock()
+        self.useFixture(fixtures.MockPatchObject(common_utils, 'ujson', ujson))
+
+        # ujson would encode these as timestamps and strings.
+        for obj in ({'expires': datetime.datetime.utcnow()},
+                    {'ids': [uuid.uuid4()]},
+                    {1: 'non-string key'}):
+            self.assertEqual(
+                jsonutils.dump_as_bytes(obj, cls=common_utils.SmarterEncoder),
+                common_utils.dump_json_as_bytes(obj))
+        self.assertFalse(ujson.dumps.called)
+
     def test_resource_uuid(self):
         # Basic uuid test, most IDs issued by keystone look like this:
         value = u'536e28c2017e405e89b25a1ed777b952'
@@ -164,6 +191,19 @@ class UtilsTestCase(unit.BaseTestCase):
         password_hashed = user_hashed['password']
         self.assertTrue(common_utils.check_password(password, password_hashed))
 
+    def test_hash_user_passwords(self):
+        users = [self._create_test_user(password=uuid.uuid4().hex),
+                 self._create_test_user(),
+                 self._create_test_user(password=None),
+                 self._create_test_user(password=uuid.uuid4().hex)]
+        for processes in (1, 2):
+            hashed = common_utils.hash_user_passwords(users,
+                                                      processes=processes)
+            self.assertEqual(users[1:3], hashed[1:3])
+            for user, hashed_user in zip(users[::3], hashed[::3]):
+                self.assertTrue(common_utils.check_password(
+                    user['password'], hashed_user['password']))
+
     def test_hash_edge_cases(self):
         hashed = common_utils.hash_password('secret')
         self.assertFalse(common_utils.check_password('', hashed))
@@ -240,6 +280,16 @@ class UtilsTestCase(unit.BaseTestCase):
         expected_string_ending = str(time.second) + 'Z'
         self.assertTrue(string_time.endswith(expected_string_ending))
 
+    def test_get_flattened_matches_flatten_dict(self):
+        d = {'name': 'a', 'enabled': False, 'none': None,
+             'scope': {'project': {'id': 'b'}, 'OS-INHERIT:x.y': 'c'},
+             'a.b': {'c': 'd'}}
+        flat = common_utils.flatten_dict(d)
+        for key in list(flat) + ['scope', 'scope.project', 'missing',
+                                 'name.missing', 'a']:
+            self.assertEqual(flat.get(key),
+                             common_utils.get_flattened(d, key))
+
 
 class ServiceHelperTests(unit.BaseTestCase):
 
@@ -48,6 +48,31 @@ class TestFernetCredentialProvider(unit.TestCase):
         self.assertEqual(blob, decrypted_blob)
         self.assertIsNotNone(primary_key_hash)
 
+    def test_decrypt_multi(self):
+        blobs = [uuid.uuid4().hex for i in range(3)]
+        encrypted_blobs = [self.provider.encrypt(b)[0] for b in blobs]
+        self.assertEqual(blobs, self.provider.decrypt_multi(encrypted_blobs))
+
+    def test_keys_are_loaded_again_when_the_repository_changes(self):
+        load_keys = self.useFixture(fixtures.MockPatchObject(
+            fernet_utils.FernetUtils, 'load_keys', autospec=True,
+            side_effect=fernet_utils.FernetUtils.load_keys)).mock
+
+        blob = uuid.uuid4().hex
+        encrypted_blob, primary_key_hash = self.provider.encrypt(blob)
+        self.assertEqual(blob, self.provider.decrypt(encrypted_blob))
+        self.assertEqual(1, load_keys.call_count)
+
+        fernet_utils.FernetUtils(
+            CONF.credential.key_repository,
+            credential_fernet.MAX_ACTIVE_KEYS).rotate_keys()
+
+        self.assertEqual(blob, self.provider.decrypt(encrypted_blob))
+        self.assertEqual(2, load_keys.call_count)
+        encrypted_blob, new_primary_key_hash = self.provider.encrypt(blob)
+        self.assertNotEqual(primary_key_hash, new_primary_key_hash)
+        self.assertEqual(2, load_keys.call_count)
+
 
 class TestFernetCredentialProviderWithNullKey(unit.TestCase):
     def setUp(self):
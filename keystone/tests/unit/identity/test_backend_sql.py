@@ -136,7 +136,9 @@ class DisableInactiveUserTests(test_backend_sql.SqlTests):
 
     def _get_user_ref(self, user_id):
         with sql.session_for_read() as session:
-            return session.query(model.User).get(user_id)
+            query = session.query(model.User)
+            query = query.options(*model.user_loader_options())
+            return query.get(user_id)
 
     def _create_user(self, user_dict, last_active_at):
         user_dict['id'] = uuid.uuid4().hex
@@ -177,6 +177,32 @@ class TestDatabaseDomainConfigs(unit.TestCase):
         self.assertEqual(CONF.ldap.use_tls, res.ldap.use_tls)
         self.assertEqual(CONF.ldap.query_scope, res.ldap.query_scope)
 
+    def test_config_only_read_when_version_changes(self):
+        self.config_fixture.config(domain_specific_drivers_enabled=True,
+                                   domain_configurations_from_database=True,
+                                   group='identity')
+        domain = unit.new_domain_ref()
+        self.resource_api.create_domain(domain['id'], domain)
+        conf = {'ldap': {'url': uuid.uuid4().hex},
+                'identity': {'driver': 'ldap'}}
+        self.domain_config_api.create_config(domain['id'], conf)
+        domain_config = identity.DomainConfigs()
+        domain_config.setup_domain_drivers(None, self.resource_api)
+
+        with mock.patch.object(
+                self.domain_config_api, 'get_config_with_sensitive_info',
+                wraps=self.domain_config_api.get_config_with_sensitive_info
+        ) as get_config:
+            res = domain_config.get_domain_conf(domain['id'])
+            self.assertEqual(conf['ldap']['url'], res.ldap.url)
+            self.assertFalse(get_config.called)
+
+            conf['ldap']['url'] = uuid.uuid4().hex
+            self.domain_config_api.update_config(domain['id'], conf)
+            res = domain_config.get_domain_conf(domain['id'])
+            self.assertEqual(conf['ldap']['url'], res.ldap.url)
+            self.assertEqual(1, get_config.call_count)
+
 
 class TestShadowUsers(unit.TestCase):
 
@@ -10,6 +10,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import uuid
 
 from keystone.common import sql
 from keystone.resource.config_backends import sql as config_sql
@@ -35,6 +36,11 @@ class SqlDomainConfigModels(core_sql.BaseBackendSqlModels):
                 ('value', sql.JsonBlob, None))
         self.assertExpectedSchema('sensitive_config', cols)
 
+    def test_version_model(self):
+        cols = (('domain_id', sql.String, 64),
+                ('version', sql.Integer, None))
+        self.assertExpectedSchema('domain_config_version', cols)
+
 
 class SqlDomainConfigDriver(unit.BaseTestCase,
                             test_core.DomainConfigDriverTests):
@@ -43,6 +49,25 @@ class SqlDomainConfigDriver(unit.BaseTestCase,
         self.useFixture(database.Database())
         self.driver = config_sql.DomainConfig()
 
+    def test_config_version_changes_on_every_write(self):
+        domain = uuid.uuid4().hex
+        config = {'group': uuid.uuid4().hex, 'option': uuid.uuid4().hex,
+                  'value': uuid.uuid4().hex, 'sensitive': False}
+        self.assertEqual(0, self.driver.get_config_version(domain))
+
+        self.driver.create_config_options(domain, [config])
+        self.assertEqual(1, self.driver.get_config_version(domain))
+
+        config['value'] = uuid.uuid4().hex
+        self.driver.update_config_options(domain, [config])
+        self.assertEqual(2, self.driver.get_config_version(domain))
+
+        self.driver.delete_config_options(domain)
+        self.assertEqual(3, self.driver.get_config_version(domain))
+
+        # Other domains are unaffected.
+        self.assertEqual(0, self.driver.get_config_version(uuid.uuid4().hex))
+
 
 class SqlDomainConfig(core_sql.BaseBackendSqlTests,
                       test_core.DomainConfigTests):
@@ -14,6 +14,8 @@
 import datetime
 import uuid
 
+import fixtures
+import mock
 from oslo_utils import timeutils
 import six
 
@@ -40,8 +42,9 @@ class KvsToken(unit.TestCase, token_tests.TokenTests):
 
     def _update_user_token_index_direct(self, user_key, token_id, new_data):
         persistence = self.token_provider_api._persistence
-        token_list = persistence.driver._get_user_token_list_with_expiry(
-            user_key)
+        shard_key = persistence.driver._user_index_shard_key(user_key,
+                                                             token_id)
+        token_list = persistence.driver._store.get(shard_key)
         # Update the user-index so that the expires time is _actually_ expired
         # since we do not do an explicit get on the token, we only reference
         # the data in the user index (to save extra round-trips to the kvs
@@ -50,10 +53,14 @@ class KvsToken(unit.TestCase, token_tests.TokenTests):
             if data[0] == token_id:
                 token_list[i] = new_data
                 break
-        self.token_provider_api._persistence.driver._store.set(user_key,
-                                                               token_list)
+        persistence.driver._store.set(shard_key, token_list)
 
     def test_cleanup_user_index_on_create(self):
+        # NOTE: Each shard of the index is cleaned up when a token is added to
+        # it, so keep all the tokens in the same one.
+        self.useFixture(fixtures.MockPatchObject(
+            self.token_provider_api._persistence.driver, 'user_index_shards',
+            1))
         user_id = six.text_type(uuid.uuid4().hex)
         valid_token_id, data = self.create_token_sample_data(user_id=user_id)
         expired_token_id, expired_data = self.create_token_sample_data(
@@ -65,7 +72,9 @@ class KvsToken(unit.TestCase, token_tests.TokenTests):
         # get expired tokens as well as valid tokens.
         token_persistence = self.token_provider_api._persistence
         user_key = token_persistence.driver._prefix_user_id(user_id)
-        user_token_list = token_persistence.driver._store.get(user_key)
+        user_token_list = (
+            token_persistence.driver._get_user_token_list_with_expiry(
+                user_key))
         valid_token_ref = token_persistence.get_token(valid_token_id)
         expired_token_ref = token_persistence.get_token(expired_token_id)
         expected_user_token_list = [
@@ -88,7 +97,9 @@ class KvsToken(unit.TestCase, token_tests.TokenTests):
                                            subsecond=True)),
             (valid_token_id_2, utils.isotime(valid_token_ref_2['expires'],
                                              subsecond=True))]
-        user_token_list = token_persistence.driver._store.get(user_key)
+        user_token_list = (
+            token_persistence.driver._get_user_token_list_with_expiry(
+                user_key))
         self.assertEqual(expected_user_token_list, user_token_list)
 
         # Test that revoked tokens are removed from the list on create.
@@ -100,9 +111,37 @@ class KvsToken(unit.TestCase, token_tests.TokenTests):
                                            subsecond=True)),
             (new_token_id, utils.isotime(new_token_ref['expires'],
                                          subsecond=True))]
-        user_token_list = token_persistence.driver._store.get(user_key)
+        user_token_list = (
+            token_persistence.driver._get_user_token_list_with_expiry(
+                user_key))
         self.assertEqual(expected_user_token_list, user_token_list)
 
+    def test_create_token_writes_token_and_index_at_once(self):
+        driver = self.token_provider_api._persistence.driver
+        user_id = six.text_type(uuid.uuid4().hex)
+        with mock.patch.object(driver._store, 'set_multi',
+                               wraps=driver._store.set_multi) as set_multi:
+            token_id, data = self.create_token_sample_data(user_id=user_id)
+        self.assertEqual(1, set_multi.call_count)
+        user_key = driver._prefix_user_id(user_id)
+        self.assertItemsEqual(
+            [driver._prefix_token_id(token_id),
+             driver._user_index_shard_key(user_key, token_id)],
+            set_multi.call_args[0][0].keys())
+
+    def test_user_index_is_sharded(self):
+        driver = self.token_provider_api._persistence.driver
+        user_id = six.text_type(uuid.uuid4().hex)
+        user_key = driver._prefix_user_id(user_id)
+        token_ids = [self.create_token_sample_data(user_id=user_id)[0]
+                     for i in range(driver.user_index_shards * 2)]
+        shard_keys = set(driver._user_index_shard_key(user_key, token_id)
+                         for token_id in token_ids)
+        self.assertGreater(len(shard_keys), 1)
+        self.assertItemsEqual(token_ids,
+                              driver._get_user_token_list(user_key))
+        self.assertItemsEqual(token_ids, driver._list_tokens(user_id))
+
 
 class KvsTokenCacheInvalidation(unit.TestCase,
                                 token_tests.TokenCacheInvalidation):
@@ -1966,6 +1966,33 @@ class LDAPLimitTests(unit.TestCase, identity_tests.LimitTests):
         config_files.append(unit.dirs.tests_conf('backend_ldap.conf'))
         return config_files
 
+    def _test_list_entity_paginated(self, entity):
+        list_entities = self._list_entities(entity)
+        expected_ids = sorted(ref['id'] for ref in list_entities())
+
+        ids = []
+        marker = None
+        while True:
+            hints = driver_hints.Hints()
+            hints.set_limit(3)
+            if marker is not None:
+                hints.set_marker(marker)
+            page = list_entities(hints=hints)
+            self.assertLessEqual(len(page), 3)
+            ids.extend(ref['id'] for ref in page)
+            if not hints.limit['truncated']:
+                break
+            marker = page[-1]['id']
+        self.assertEqual(expected_ids, ids)
+        # The entities were listed in several pages.
+        self.assertGreater(len(ids), 6)
+
+    def test_list_users_paginated(self):
+        self._test_list_entity_paginated('user')
+
+    def test_list_groups_paginated(self):
+        self._test_list_entity_paginated('group')
+
 
 class LDAPIdentityEnabledEmulation(LDAPIdentity):
     def setUp(self):
@@ -24,6 +24,7 @@ import sqlalchemy
 from sqlalchemy import exc
 from testtools import matchers
 
+from keystone.catalog.backends import sql as catalog_sql
 from keystone.common import driver_hints
 from keystone.common import sql
 import keystone.conf
@@ -256,6 +257,82 @@ class SqlIdentity(SqlTests,
                                                        new_user_dict['id'])
             self.assertIsNone(new_user_ref.password)
 
+    def test_create_users(self):
+        user_dicts = [
+            unit.new_user_ref(domain_id=CONF.identity.default_domain_id)
+            for i in range(3)]
+        user_dicts[1]['password'] = None
+        new_users = self.identity_api.create_users(user_dicts)
+        self.assertEqual([u['name'] for u in user_dicts],
+                         [u['name'] for u in new_users])
+        for user_dict, new_user in zip(user_dicts, new_users):
+            self.assertNotIn('password', new_user)
+            with sql.session_for_read() as session:
+                user_ref = self.identity_api._get_user(session,
+                                                       new_user['id'])
+                if user_dict['password'] is None:
+                    self.assertIsNone(user_ref.password)
+                else:
+                    self.assertNotEqual(user_dict['password'],
+                                        user_ref.password)
+        self.identity_api.authenticate(self.make_request(),
+                                       user_id=new_users[0]['id'],
+                                       password=user_dicts[0]['password'])
+
+    def test_create_users_conflict(self):
+        user_dict = unit.new_user_ref(
+            domain_id=CONF.identity.default_domain_id)
+        self.assertRaises(exception.Conflict,
+                          self.identity_api.create_users,
+                          [user_dict, user_dict.copy()])
+        self.assertRaises(exception.UserNotFound,
+                          self.identity_api.get_user_by_name,
+                          user_dict['name'], user_dict['domain_id'])
+
+    def test_add_users_to_groups(self):
+        domain_id = CONF.identity.default_domain_id
+        groups = [self.identity_api.create_group(
+            unit.new_group_ref(domain_id=domain_id)) for i in range(2)]
+        users = self.identity_api.create_users(
+            [unit.new_user_ref(domain_id=domain_id) for i in range(2)])
+        self.identity_api.add_user_to_group(users[0]['id'], groups[0]['id'])
+        memberships = [(user['id'], group['id'])
+                       for user in users for group in groups]
+        # Existing memberships are ignored.
+        self.identity_api.add_users_to_groups(memberships)
+        for user in users:
+            user_groups = self.identity_api.list_groups_for_user(user['id'])
+            self.assertItemsEqual([g['id'] for g in groups],
+                                  [g['id'] for g in user_groups])
+
+    def test_add_users_to_groups_returns_not_found(self):
+        domain_id = CONF.identity.default_domain_id
+        group = self.identity_api.create_group(
+            unit.new_group_ref(domain_id=domain_id))
+        self.assertRaises(exception.UserNotFound,
+                          self.identity_api.add_users_to_groups,
+                          [(uuid.uuid4().hex, group['id'])])
+
+    def test_list_users_from_ids(self):
+        domain_id = CONF.identity.default_domain_id
+        users = self.identity_api.create_users(
+            [unit.new_user_ref(domain_id=domain_id) for i in range(3)])
+        user_ids = [user['id'] for user in users[:2]] + [uuid.uuid4().hex]
+        # Unknown IDs are skipped.
+        user_refs = self.identity_api.list_users_from_ids(user_ids)
+        self.assertItemsEqual(user_ids[:2], [u['id'] for u in user_refs])
+        for user_ref in user_refs:
+            self.assertEqual(domain_id, user_ref['domain_id'])
+            self.assertNotIn('password', user_ref)
+
+    def test_list_groups_from_ids(self):
+        domain_id = CONF.identity.default_domain_id
+        groups = [self.identity_api.create_group(
+            unit.new_group_ref(domain_id=domain_id)) for i in range(3)]
+        group_ids = [group['id'] for group in groups[:2]] + [uuid.uuid4().hex]
+        group_refs = self.identity_api.list_groups_from_ids(group_ids)
+        self.assertItemsEqual(group_ids[:2], [g['id'] for g in group_refs])
+
     def test_delete_user_with_project_association(self):
         user = unit.new_user_ref(domain_id=CONF.identity.default_domain_id)
         user = self.identity_api.create_user(user)
@@ -629,6 +706,54 @@ class SqlIdentity(SqlTests,
         self.assertNotEqual(len(first_call_users), len(second_call_users))
         self.assertEqual(first_call_counter, counter.calls)
 
+    def test_list_users_is_a_single_statement(self):
+        for i in range(3):
+            user = unit.new_user_ref(domain_id=CONF.identity.default_domain_id)
+            self.identity_api.create_user(user)
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sqlalchemy.event.listen(sqlalchemy.engine.Engine,
+                                'before_cursor_execute', count)
+        self.addCleanup(sqlalchemy.event.remove, sqlalchemy.engine.Engine,
+                        'before_cursor_execute', count)
+        users = self.identity_api.driver.list_users(driver_hints.Hints())
+        self.assertGreaterEqual(len(users), 3)
+        self.assertEqual(1, len(statements))
+
+    def test_list_users_matches_get_user(self):
+        self.config_fixture.config(group='security_compliance',
+                                   disable_user_account_days_inactive=90)
+        user = unit.new_user_ref(domain_id=CONF.identity.default_domain_id,
+                                 default_project_id=uuid.uuid4().hex,
+                                 arbitrary_attr=uuid.uuid4().hex)
+        user = self.identity_api.create_user(user)
+        nonlocal_user = unit.new_user_ref(
+            domain_id=CONF.identity.default_domain_id)
+        nonlocal_user = self.shadow_users_api.create_nonlocal_user(
+            nonlocal_user)
+        users = dict((u['id'], u) for u in
+                     self.identity_api.driver.list_users(driver_hints.Hints()))
+        for user_id in (user['id'], nonlocal_user['id']):
+            self.assertEqual(self.identity_api.driver.get_user(user_id),
+                             users[user_id])
+
+    def test_iter_users_matches_list_users(self):
+        for i in range(3):
+            user = unit.new_user_ref(domain_id=CONF.identity.default_domain_id)
+            self.identity_api.create_user(user)
+        hints = driver_hints.Hints()
+        hints.add_filter('domain_id', CONF.identity.default_domain_id)
+        users = self.identity_api.driver.iter_users(hints)
+        # The users are only read, and the filters satisfied, on iteration.
+        self.assertEqual(1, len(hints.filters))
+        users = list(users)
+        self.assertEqual([], hints.filters)
+        self.assertItemsEqual(
+            self.identity_api.driver.list_users(driver_hints.Hints()), users)
+
 
 class SqlTrust(SqlTests, trust_tests.TrustTests):
     pass
@@ -956,6 +1081,44 @@ class SqlFilterTests(SqlTests, identity_tests.FilterTests):
         groups = self.identity_api.list_groups()
         self.assertGreater(len(groups), 0)
 
+    def _list_service_ids(self, hints):
+        refs = self.catalog_api.driver.list_services(hints)
+        # The filters must have been applied in SQL.
+        self.assertEqual([], hints.filters)
+        return set(ref['id'] for ref in refs)
+
+    def test_filter_on_extra_attributes(self):
+        with sql.session_for_read() as session:
+            query = session.query(catalog_sql.Service)
+            if sql.core._json_dialect(query) is None:
+                self.skipTest('The database has no JSON functions')
+
+        prefix = uuid.uuid4().hex
+        services = []
+        for name, public in (('alpha', True), ('beta', False),
+                             ('gamma', 'yes')):
+            ref = unit.new_service_ref(name=prefix + name, public=public)
+            services.append(self.catalog_api.create_service(ref['id'], ref))
+
+        hints = driver_hints.Hints()
+        hints.add_filter('name', prefix + 'beta')
+        self.assertEqual({services[1]['id']}, self._list_service_ids(hints))
+
+        # Booleans are compared to the value taken as a boolean, strings to
+        # the value as it is.
+        hints = driver_hints.Hints()
+        hints.add_filter('public', 'true')
+        self.assertEqual({services[0]['id']}, self._list_service_ids(hints))
+        hints = driver_hints.Hints()
+        hints.add_filter('public', 'yes')
+        self.assertEqual({services[0]['id'], services[2]['id']},
+                         self._list_service_ids(hints))
+
+        hints = driver_hints.Hints()
+        hints.add_filter('name', prefix.upper() + 'GAM',
+                         comparator='startswith')
+        self.assertEqual({services[2]['id']}, self._list_service_ids(hints))
+
 
 class SqlLimitTests(SqlTests, identity_tests.LimitTests):
     def setUp(self):
@@ -1066,6 +1229,39 @@ class SqlCredential(SqlTests):
             self.user_foo['id'], type=cred['type'])
         self._validateCredentialList(credentials, [cred])
 
+    def test_list_credentials_decrypts_in_bulk(self):
+        with mock.patch.object(
+                self.credential_api.credential_provider_api,
+                'decrypt_multi',
+                wraps=self.credential_api.credential_provider_api.decrypt_multi
+        ) as decrypt_multi:
+            credentials = self.credential_api.list_credentials()
+        self._validateCredentialList(credentials, self.credentials)
+        self.assertEqual(1, decrypt_multi.call_count)
+
+    def test_decrypted_blobs_are_kept_in_memory(self):
+        self.config_fixture.config(group='credential',
+                                   decrypted_cache_time=60)
+        with mock.patch.object(
+                self.credential_api.credential_provider_api,
+                'decrypt_multi',
+                wraps=self.credential_api.credential_provider_api.decrypt_multi
+        ) as decrypt_multi:
+            first = self.credential_api.list_credentials()
+            second = self.credential_api.list_credentials()
+        self.assertEqual(1, decrypt_multi.call_count)
+        self.assertEqual(
+            sorted((c['id'], c['blob']) for c in first),
+            sorted((c['id'], c['blob']) for c in second))
+
+        # A changed credential has a new encrypted blob, so is decrypted.
+        credential = self.credentials[0]
+        blob = uuid.uuid4().hex
+        self.credential_api.update_credential(credential['id'],
+                                              {'blob': blob})
+        self.assertEqual(
+            blob, self.credential_api.get_credential(credential['id'])['blob'])
+
     def test_create_credential_is_encrypted_when_stored(self):
         credential = unit.new_credential_ref(user_id=uuid.uuid4().hex)
         credential_id = credential['id']
@@ -0,0 +1,62 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import fixtures
+
+from keystone.tests.benchmarks import list_truncation
+from keystone.tests.benchmarks import revocation_writes
+from keystone.tests.benchmarks import suite
+from keystone.tests import unit
+
+
+class BenchmarksTestCase(unit.BaseTestCase):
+    """Run each benchmark once, with tiny sizes, to keep them working."""
+
+    def setUp(self):
+        super(BenchmarksTestCase, self).setUp()
+        self.stdout = self.useFixture(fixtures.StringStream('stdout')).stream
+        self.useFixture(fixtures.MonkeyPatch('sys.stdout', self.stdout))
+
+    def output(self):
+        self.stdout.seek(0)
+        return self.stdout.read()
+
+    def test_suite(self):
+        suite.main(['--json', '--repeat', '1', '--services', '1',
+                    '--projects', '1', '--groups', '1', '--rules', '2',
+                    '--users', '1'])
+        results = json.loads(self.output())['results']
+        for provider in suite.PROVIDERS:
+            for operation in ('issue', 'validate', 'revoke'):
+                self.assertEqual(
+                    1, results['tokens.%s.%s' % (provider, operation)][
+                        'samples'])
+        for name in ('catalog.get_v3_catalog', 'assignments.list_effective',
+                     'assignments.roles_for_project', 'mapping.process',
+                     'ldap.list_users'):
+            self.assertEqual(1, results[name]['samples'])
+
+    def test_list_truncation(self):
+        list_truncation.main(['--rows', '20', '--limit', '1',
+                              '--repeat', '1'])
+        self.assertIn('one domain', self.output())
+
+    def test_revocation_writes(self):
+        revocation_writes.main(['--events', '10', '--repeat', '2'])
+        self.assertIn('revoke_and_prune', self.output())
+
+    def test_stats(self):
+        self.assertEqual(2, suite.median([3, 1, 2]))
+        self.assertEqual({'samples': 4, 'min': 1, 'median': 3, 'p90': 4,
+                          'max': 4}, suite.stats([4, 2, 3, 1]))
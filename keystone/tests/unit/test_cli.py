@@ -19,18 +19,22 @@ import fixtures
 import mock
 from oslo_config import fixture as config_fixture
 from oslo_log import log
+from oslo_serialization import jsonutils
 from oslotest import mockpatch
 from six.moves import range
 from testtools import matchers
 
 from keystone.cmd import cli
 from keystone.common import dependency
+from keystone.common import fernet_utils
 from keystone.common.sql import upgrades
 import keystone.conf
+from keystone.credential.providers import fernet as credential_fernet
 from keystone.i18n import _
 from keystone.identity.mapping_backends import mapping as identity_mapping
 from keystone.tests import unit
 from keystone.tests.unit import default_fixtures
+from keystone.tests.unit import ksfixtures
 from keystone.tests.unit.ksfixtures import database
 from keystone.tests.unit.ksfixtures import ldapdb
 
@@ -61,6 +65,13 @@ class CliTestCase(unit.SQLDriverOverrides, unit.TestCase):
         cli.TokenFlush.main()
         self.assertIn("token_flush command had no effect", log_info.output)
 
+    def test_revocation_flush(self):
+        self.useFixture(database.Database())
+        self.load_backends()
+        log_info = self.useFixture(fixtures.FakeLogger(level=log.INFO))
+        cli.RevocationFlush.main()
+        self.assertIn('Deleted 0 expired revocation events', log_info.output)
+
 
 class CliNoConfigTestCase(unit.BaseTestCase):
 
@@ -302,6 +313,125 @@ class CliBootStrapTestCaseWithEnvironment(CliBootStrapTestCase):
         self._do_test_bootstrap(bootstrap)
 
 
+class CliUserImportTestCase(unit.SQLDriverOverrides, unit.TestCase):
+
+    def setUp(self):
+        self.useFixture(database.Database())
+        super(CliUserImportTestCase, self).setUp()
+        self.load_backends()
+        self.load_fixtures(default_fixtures)
+
+    def config_files(self):
+        self.config_fixture.register_cli_opt(cli.command_opt)
+        config_files = super(CliUserImportTestCase, self).config_files()
+        config_files.append(unit.dirs.tests_conf('backend_sql.conf'))
+        return config_files
+
+    def config(self, config_files):
+        CONF(args=['user_import', '--file', '-'], project='keystone',
+             default_config_files=config_files)
+
+    def test_import_users(self):
+        domain = unit.new_domain_ref()
+        self.resource_api.create_domain(domain['id'], domain)
+        group = unit.new_group_ref(domain_id=domain['id'])
+        group = self.identity_api.create_group(group)
+        users = [
+            {'name': uuid.uuid4().hex, 'password': uuid.uuid4().hex},
+            {'name': uuid.uuid4().hex, 'password': uuid.uuid4().hex,
+             'domain_name': domain['name'], 'groups': [group['name']]},
+            {'name': uuid.uuid4().hex, 'domain_id': domain['id'],
+             'groups': [group['name']], 'enabled': False},
+        ]
+        stream = ['%s\n' % jsonutils.dumps(user) for user in users]
+
+        dependency.reset()  # backends are loaded again in the command handler
+        importer = cli.UserImport()
+        self.assertEqual(3, importer.import_users(stream, batch_size=2))
+
+        user = self.identity_api.get_user_by_name(
+            users[0]['name'], CONF.identity.default_domain_id)
+        self.identity_api.authenticate(self.make_request(),
+                                       user_id=user['id'],
+                                       password=users[0]['password'])
+        members = self.identity_api.list_users_in_group(group['id'])
+        self.assertItemsEqual([users[1]['name'], users[2]['name']],
+                              [u['name'] for u in members])
+        user = self.identity_api.get_user_by_name(users[2]['name'],
+                                                  domain['id'])
+        self.assertFalse(user['enabled'])
+
+
+class CliCredentialMigrateTestCase(unit.SQLDriverOverrides, unit.TestCase):
+
+    def setUp(self):
+        self.useFixture(database.Database())
+        super(CliCredentialMigrateTestCase, self).setUp()
+        self.useFixture(
+            ksfixtures.KeyRepository(
+                self.config_fixture,
+                'credential',
+                credential_fernet.MAX_ACTIVE_KEYS
+            )
+        )
+        self.load_backends()
+
+    def config_files(self):
+        self.config_fixture.register_cli_opt(cli.command_opt)
+        config_files = super(CliCredentialMigrateTestCase, self).config_files()
+        config_files.append(unit.dirs.tests_conf('backend_sql.conf'))
+        return config_files
+
+    def config(self, config_files):
+        CONF(args=['credential_migrate'], project='keystone',
+             default_config_files=config_files)
+
+    def test_migrate_credentials(self):
+        credentials = []
+        for i in range(5):
+            credential = unit.new_credential_ref(user_id=uuid.uuid4().hex)
+            self.credential_api.create_credential(credential['id'],
+                                                  credential)
+            credentials.append(credential)
+
+        fernet_utils.FernetUtils(
+            CONF.credential.key_repository,
+            credential_fernet.MAX_ACTIVE_KEYS).rotate_keys()
+        crypto, keys = credential_fernet.get_multi_fernet_keys()
+        primary_key_hash = credential_fernet.primary_key_hash(keys)
+
+        dependency.reset()  # backends are loaded again in the command handler
+        migrator = cli.CredentialMigrate()
+        self.assertEqual(5, migrator.migrate_credentials(batch_size=2))
+
+        for credential in credentials:
+            ref = self.credential_api.driver.get_credential(credential['id'])
+            self.assertEqual(primary_key_hash, ref['key_hash'])
+            self.assertEqual(
+                credential['blob'],
+                self.credential_api.get_credential(credential['id'])['blob'])
+
+        # Everything has been migrated, so there is nothing left to do.
+        self.assertEqual(0, migrator.migrate_credentials(batch_size=2))
+
+    def test_credentials_changed_during_migration_are_left_alone(self):
+        credential = unit.new_credential_ref(user_id=uuid.uuid4().hex)
+        self.credential_api.create_credential(credential['id'], credential)
+        old = self.credential_api.driver.get_credential(credential['id'])
+
+        blob = uuid.uuid4().hex
+        self.credential_api.update_credential(credential['id'],
+                                              {'blob': blob})
+        updated = self.credential_api.driver.update_encrypted_blobs([
+            {'id': credential['id'],
+             'old_encrypted_blob': old['encrypted_blob'],
+             'encrypted_blob': old['encrypted_blob'],
+             'key_hash': old['key_hash']}])
+        self.assertEqual(0, updated)
+        self.assertEqual(
+            blob, self.credential_api.get_credential(credential['id'])['blob'])
+
+
 class CliDomainConfigAllTestCase(unit.SQLDriverOverrides, unit.TestCase):
 
     def setUp(self):
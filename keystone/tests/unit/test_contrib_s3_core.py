@@ -12,9 +12,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import uuid
 
+import fixtures
+
 from keystone.contrib import s3
+from keystone.contrib.s3 import core as s3_core
 from keystone import exception
 from keystone.tests import unit
 
@@ -69,6 +73,29 @@ class S3ContribCore(unit.TestCase):
         self.assertIsNone(self.controller.check_signature(creds_ref,
                                                           credentials))
 
+    def test_signing_key_v4_is_reused(self):
+        self.config_fixture.config(group='ec2', credential_cache_time=60)
+        signing_keys = collections.OrderedDict()
+        self.useFixture(fixtures.MockPatchObject(
+            s3_core, '_SIGNING_KEYS', signing_keys))
+        creds_ref = {'secret':
+                     u'e7a7a2240136494986991a6598d9fb9f'}
+        credentials = {'token':
+                       'QVdTNC1ITUFDLVNIQTI1NgoyMDE1MDgyNFQxMTIwNDFaCjIw'
+                       'MTUwODI0L1JlZ2lvbk9uZS9zMy9hd3M0X3JlcXVlc3QKZjIy'
+                       'MTU1ODBlZWI5YTE2NzM1MWJkOTNlODZjM2I2ZjA0YTkyOGY1'
+                       'YzU1MjBhMzkzNWE0NTM1NDBhMDk1NjRiNQ==',
+                       'signature':
+                       '730ba8f58df6ffeadd78f402e990b2910d60'
+                       'bc5c2aec63619734f096a4dd77be'}
+
+        self.controller.check_signature(creds_ref, credentials)
+        self.assertEqual(1, len(signing_keys))
+        # The signature is still correct when the derived key is reused.
+        self.assertIsNone(self.controller.check_signature(creds_ref,
+                                                          credentials))
+        self.assertEqual(1, len(signing_keys))
+
     def test_bad_signature_v4(self):
         creds_ref = {'secret':
                      u'e7a7a2240136494986991a6598d9fb9f'}
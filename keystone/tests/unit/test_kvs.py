@@ -413,6 +413,20 @@ class KVSTest(unit.TestCase):
         self.assertIsInstance(kvs._region.backend.driver,
                               TestMemcacheDriver)
 
+    def test_kvs_memcached_manager_defaults_to_pooled_backend(self):
+        self.config_fixture.config(group='memcache', pool_maxsize=20,
+                                   pool_unused_timeout=30)
+        with mock.patch.dict(memcached.VALID_DOGPILE_BACKENDS,
+                             pooled_memcached=mock.Mock()) as backends:
+            kvs = self._get_kvs_region()
+            kvs.configure('openstack.kvs.Memcached', pool_unused_timeout=45)
+        arguments = backends['pooled_memcached'].call_args[0][0]
+        self.assertEqual(20, arguments['pool_maxsize'])
+        self.assertEqual(45, arguments['pool_unused_timeout'])
+        self.assertEqual(
+            self.config_fixture.conf.memcache.pool_connection_get_timeout,
+            arguments['pool_connection_get_timeout'])
+
     def test_kvs_memcached_manager_invalid_dogpile_memcached_backend(self):
         # Invalid dogpile memcache backend should raise ValueError
         kvs = self._get_kvs_region()
@@ -161,6 +161,103 @@ class RevokeTests(object):
                           self.revoke_api.check_token,
                           token_values)
 
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_prune_expired_events_in_batches(self, mock_utcnow):
+        self.config_fixture.config(group='revoke', prune_interval=0,
+                                   prune_batch_size=2)
+        now = datetime.datetime.utcnow()
+        mock_utcnow.return_value = now
+        for i in range(3):
+            self.revoke_api.revoke_by_user(user_id=_new_id())
+
+        # The events are kept until every token they apply to has expired.
+        self.assertEqual(0, self.revoke_api.prune_expired_events())
+        mock_utcnow.return_value = now + datetime.timedelta(hours=2)
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        self.assertEqual(4, len(self.revoke_api.list_events()))
+
+        self.assertEqual(3, self.revoke_api.prune_expired_events())
+        self.assertEqual(1, len(self.revoke_api.list_events()))
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_revoke_prunes_expired_events_periodically(self, mock_utcnow):
+        self.config_fixture.config(group='revoke', prune_interval=300)
+        now = datetime.datetime.utcnow()
+        mock_utcnow.return_value = now
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        mock_utcnow.return_value = now + datetime.timedelta(hours=2)
+        self.revoke_api._last_prune = 0
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        self.assertEqual(1, len(self.revoke_api.list_events()))
+
+        # Not again until [revoke] prune_interval has elapsed.
+        mock_utcnow.return_value = now + datetime.timedelta(hours=4)
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        self.assertEqual(2, len(self.revoke_api.list_events()))
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_revoke_prunes_by_default(self, mock_utcnow):
+        now = datetime.datetime.utcnow()
+        mock_utcnow.return_value = now
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        mock_utcnow.return_value = now + datetime.timedelta(hours=2)
+        self.revoke_api._last_prune = 0
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        self.assertEqual(1, len(self.revoke_api.list_events()))
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_revoke_does_not_prune_when_disabled(self, mock_utcnow):
+        self.config_fixture.config(group='revoke', prune_interval=0)
+        now = datetime.datetime.utcnow()
+        mock_utcnow.return_value = now
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        mock_utcnow.return_value = now + datetime.timedelta(hours=2)
+        self.revoke_api._last_prune = 0
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        self.assertEqual(2, len(self.revoke_api.list_events()))
+
+    def test_revoke_when_pruning_fails(self):
+        self.revoke_api._last_prune = 0
+        with mock.patch.object(self.revoke_api.driver,
+                               'prune_expired_events',
+                               side_effect=exception.UnexpectedError()):
+            self.revoke_api.revoke_by_user(user_id=_new_id())
+        self.assertEqual(1, len(self.revoke_api.list_events()))
+
+    @mock.patch.object(timeutils, 'utcnow')
+    def test_check_token_since_epoch(self, mock_utcnow):
+        now = datetime.datetime.utcnow().replace(microsecond=0)
+        mock_utcnow.return_value = now
+        token_values = _sample_blank_token()
+        token_values['expires_at'] = utils.isotime(_future_time(),
+                                                   subsecond=True)
+        token_values['audit_chain_id'] = _new_id()
+        self.assertIsNone(self.revoke_api.check_token(token_values))
+
+        self.revoke_api.revoke_by_audit_chain_id(
+            token_values['audit_chain_id'])
+        self.assertRaises(exception.TokenNotFound,
+                          self.revoke_api.check_token, token_values)
+        # Events revoked shortly before the epoch are still checked.
+        self.assertRaises(exception.TokenNotFound,
+                          self.revoke_api.check_token, token_values,
+                          now + datetime.timedelta(seconds=30))
+
+        # Older ones aren't, the token was checked against them already.
+        later = now + datetime.timedelta(minutes=10)
+        mock_utcnow.return_value = later
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        self.assertEqual(later,
+                         self.revoke_api.check_token(token_values, later))
+
+    def test_snapshot(self):
+        self.revoke_api.revoke_by_user(user_id=_new_id())
+        with self.revoke_api.snapshot():
+            self.assertEqual(1, len(self.revoke_api.list_events()))
+            self.revoke_api.revoke_by_user(user_id=_new_id())
+            self.assertEqual(1, len(self.revoke_api.list_events()))
+        self.assertEqual(2, len(self.revoke_api.list_events()))
+
 
 class SqlRevokeTests(test_backend_sql.SqlTests, RevokeTests):
     def config_overrides(self):
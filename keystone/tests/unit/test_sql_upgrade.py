@@ -1784,6 +1784,18 @@ class FullMigration(SqlMigrateBase, unit.TestCase):
             self.assertEqual('DATETIME', str(password.c.created_at.type))
         self.assertFalse(password.c.created_at.nullable)
 
+    def test_migration_010_add_domain_config_version(self):
+        self.expand(9)
+        self.migrate(9)
+        self.contract(9)
+        self.assertTableDoesNotExist('domain_config_version')
+        self.expand(10)
+        self.migrate(10)
+        self.contract(10)
+        self.assertTableExists('domain_config_version')
+        self.assertTableColumns('domain_config_version',
+                                ['domain_id', 'version'])
+
 
 class MySQLOpportunisticFullMigration(FullMigration):
     FIXTURE = test_base.MySQLOpportunisticFixture
@@ -14,9 +14,11 @@
 
 import datetime
 
+import mock
 from oslo_utils import timeutils
 from six.moves import reload_module
 
+from keystone import assignment
 from keystone.common import dependency
 from keystone.common import utils
 import keystone.conf
@@ -791,6 +793,25 @@ class TestTokenProvider(unit.TestCase):
         self.assertIsNone(
             self.token_provider_api._is_valid_token(create_v3_token()))
 
+    def test_scope_cache_enabled(self):
+        self.assertFalse(token.provider.scope_cache_enabled())
+        self.config_fixture.config(group='token', scope_cache_time=600)
+        self.assertTrue(token.provider.scope_cache_enabled())
+        self.config_fixture.config(group='role', caching=False)
+        self.assertFalse(token.provider.scope_cache_enabled())
+
+    def test_scope_callback_only_invalidates_cached_scopes(self):
+        with mock.patch.object(assignment.COMPUTED_ASSIGNMENTS_REGION,
+                               'invalidate') as invalidate:
+            self.token_provider_api._invalidate_scope_callback(
+                'identity', 'user', 'updated', {'resource_info': 'user_id'})
+            self.assertFalse(invalidate.called)
+
+            self.config_fixture.config(group='token', scope_cache_time=600)
+            self.token_provider_api._invalidate_scope_callback(
+                'identity', 'user', 'updated', {'resource_info': 'user_id'})
+            invalidate.assert_called_once_with()
+
     def test_no_token_raises_token_not_found(self):
         self.assertRaises(
             exception.TokenNotFound,
@@ -1706,6 +1706,43 @@ class AssignmentInheritanceTestCase(test_v3.RestfulTestCase,
         self.assertRoleAssignmentInListResponse(rs_user, expected_entity3)
         self.assertRoleAssignmentInListResponse(rs_role, expected_entity1)
 
+    def test_list_role_assignments_compact(self):
+        """Call ``GET /role_assignments?effective&compact``.
+
+        Test Plan:
+
+        - Assign a role to a user on a project, both directly and via a group
+        - Check the effective listing has both assignments, with links
+        - Check the compact listing has a single assignment, without links
+
+        """
+        role = unit.new_role_ref()
+        self.role_api.create_role(role['id'], role)
+        user = unit.create_user(self.identity_api, domain_id=self.domain_id)
+        group = self.identity_api.create_group(
+            unit.new_group_ref(domain_id=self.domain_id))
+        self.identity_api.add_user_to_group(user['id'], group['id'])
+        self.assignment_api.create_grant(role['id'], user_id=user['id'],
+                                         project_id=self.project_id)
+        self.assignment_api.create_grant(role['id'], group_id=group['id'],
+                                         project_id=self.project_id)
+
+        collection_url = (
+            '/role_assignments?effective&user.id=%(user_id)s&'
+            'scope.project.id=%(project_id)s' % {
+                'user_id': user['id'], 'project_id': self.project_id})
+        r = self.get(collection_url)
+        self.assertValidRoleAssignmentListResponse(
+            r, expected_length=2, resource_url=collection_url)
+
+        r = self.get(collection_url + '&compact')
+        entities = r.result['role_assignments']
+        self.assertEqual(1, len(entities))
+        self.assertValidRoleAssignment(entities[0])
+        self.assertNotIn('links', entities[0])
+        self.assertEqual(user['id'], entities[0]['user']['id'])
+        self.assertEqual(role['id'], entities[0]['role']['id'])
+
     def test_list_role_assignments_for_disabled_inheritance_extension(self):
         """Call ``GET /role_assignments with inherited domain grants``.
 
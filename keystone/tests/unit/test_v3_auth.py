@@ -12,6 +12,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import copy
 import datetime
 import itertools
@@ -19,6 +20,7 @@ import operator
 import re
 import uuid
 
+import fixtures
 import freezegun
 from keystoneclient.common import cms
 import mock
@@ -1578,6 +1580,134 @@ class TokenAPITests(object):
             headers={'X-Subject-Token': v3_token})
         self.assertValidProjectScopedTokenResponse(r, require_catalog=False)
 
+    def test_validate_token_minimal(self):
+        v3_token = self.get_requested_token(self.build_authentication_request(
+            user_id=self.user['id'],
+            password=self.user['password'],
+            project_id=self.project['id']))
+        r = self.get('/auth/tokens?minimal',
+                     headers={'X-Subject-Token': v3_token})
+        token = r.result['token']
+        self.assertEqual({'id': self.user['id'],
+                          'domain': {'id': self.user['domain_id']}},
+                         token['user'])
+        self.assertEqual({'id': self.project['id'],
+                          'domain': {'id': self.project['domain_id']}},
+                         token['project'])
+        self.assertEqual([self.role_id],
+                         [role['id'] for role in token['roles']])
+        self.assertIn('expires_at', token)
+        self.assertNotIn('catalog', token)
+        self.assertNotIn('service_providers', token)
+
+        # The full token data is still returned without the flag.
+        r = self.get('/auth/tokens', headers={'X-Subject-Token': v3_token})
+        self.assertValidProjectScopedTokenResponse(r)
+
+    def test_issue_token_with_scope_cache(self):
+        self.config_fixture.config(group='token', scope_cache_time=600)
+        auth_data = self.build_authentication_request(
+            user_id=self.user['id'],
+            password=self.user['password'],
+            project_id=self.project['id'])
+        r = self.v3_create_token(auth_data)
+        self.assertValidProjectScopedTokenResponse(r)
+        self.assertEqual([self.role_id],
+                         [role['id'] for role in r.result['token']['roles']])
+
+        # Granting a role and renaming the project show in the next token.
+        role = unit.new_role_ref()
+        self.role_api.create_role(role['id'], role)
+        self.assignment_api.add_role_to_user_and_project(
+            self.user['id'], self.project['id'], role['id'])
+        name = uuid.uuid4().hex
+        self.patch('/projects/%s' % self.project['id'],
+                   body={'project': {'name': name}})
+
+        r = self.v3_create_token(auth_data)
+        self.assertValidProjectScopedTokenResponse(r)
+        token = r.result['token']
+        self.assertEqual(sorted([self.role_id, role['id']]),
+                         sorted(r['id'] for r in token['roles']))
+        self.assertEqual(name, token['project']['name'])
+
+    def test_validate_tokens(self):
+        v3_token = self.get_requested_token(self.build_authentication_request(
+            user_id=self.user['id'],
+            password=self.user['password'],
+            project_id=self.project['id']))
+        revoked_token = self.get_requested_token(
+            self.build_authentication_request(
+                user_id=self.user['id'],
+                password=self.user['password']))
+        self.delete('/auth/tokens',
+                    headers={'X-Subject-Token': revoked_token})
+
+        r = self.post('/auth/tokens/validate?nocatalog',
+                      body={'tokens': [v3_token, revoked_token,
+                                       uuid.uuid4().hex, v3_token]},
+                      expected_status=http_client.OK)
+        results = r.result['tokens']
+        self.assertEqual(4, len(results))
+        for result in (results[0], results[3]):
+            self.assertEqual(self.user['id'], result['token']['user']['id'])
+            self.assertEqual(self.project['id'],
+                             result['token']['project']['id'])
+            self.assertNotIn('catalog', result['token'])
+        for result in (results[1], results[2]):
+            self.assertNotIn('token', result)
+            self.assertEqual(http_client.NOT_FOUND, result['error']['code'])
+
+        # The catalog is still included in the validation of a single token.
+        r = self.get('/auth/tokens', headers={'X-Subject-Token': v3_token})
+        self.assertIn('catalog', r.result['token'])
+
+    def test_validate_tokens_trustor_disabled(self):
+        trustee_user, trust = self._create_trust()
+        trust_scoped_token = self._get_trust_scoped_token(trustee_user, trust)
+        self.identity_api.update_user(self.user['id'], {'enabled': False})
+        admin_token = self.get_admin_token()
+
+        r = self.admin_request(
+            path='/v3/auth/tokens/validate', method='POST',
+            headers={'X-Auth-Token': admin_token},
+            body={'tokens': [admin_token, trust_scoped_token]},
+            expected_status=http_client.OK)
+        results = r.result['tokens']
+        self.assertIn('token', results[0])
+        self.assertNotIn('token', results[1])
+        self.assertEqual(http_client.NOT_FOUND, results[1]['error']['code'])
+
+    def test_validate_tokens_renders_each_error(self):
+        validate_v3_token = self.token_provider_api.validate_v3_token
+
+        def validate(token_id, minimal=False):
+            if token_id == self.v3_token:
+                raise exception.Forbidden('Trustor is disabled.')
+            return validate_v3_token(token_id, minimal)
+
+        self.useFixture(fixtures.MockPatchObject(
+            self.token_provider_api, 'validate_v3_token',
+            side_effect=validate))
+        r = self.post('/auth/tokens/validate',
+                      body={'tokens': [self.v3_token, uuid.uuid4().hex]},
+                      expected_status=http_client.OK)
+        results = r.result['tokens']
+        self.assertEqual(http_client.FORBIDDEN, results[0]['error']['code'])
+        self.assertEqual('Forbidden', results[0]['error']['title'])
+        self.assertEqual(http_client.NOT_FOUND, results[1]['error']['code'])
+
+    def test_validate_tokens_too_many(self):
+        self.config_fixture.config(group='token', max_batch_validation=1)
+        self.post('/auth/tokens/validate',
+                  body={'tokens': [self.v3_token, self.v3_token]},
+                  expected_status=http_client.BAD_REQUEST)
+
+    def test_validate_tokens_requires_a_list(self):
+        self.post('/auth/tokens/validate',
+                  body={'tokens': self.v3_token},
+                  expected_status=http_client.BAD_REQUEST)
+
     def test_is_admin_token_by_ids(self):
         self.config_fixture.config(
             group='resource',
@@ -5209,6 +5339,78 @@ class TestAuthTOTP(test_v3.RestfulTestCase):
         reg = re.compile(r'^-?[0-9]+$')
         self.assertTrue(reg.match(passcode))
 
+    def test_with_a_passcode_from_a_previous_time_step(self):
+        creds = self._make_credentials('totp')
+        secret = creds[-1]['blob']
+
+        time = self.useFixture(fixture.TimeFixture())
+        auth_data = self._make_auth_data_by_id(
+            totp._generate_totp_passcode(secret))
+        time.advance_time_seconds(30)
+
+        self.v3_create_token(auth_data,
+                             expected_status=http_client.UNAUTHORIZED)
+
+        self.config_fixture.config(group='totp', skew_windows=1)
+        self.v3_create_token(auth_data, expected_status=http_client.CREATED)
+
+    def test_cached_secrets_are_invalidated(self):
+        self.config_fixture.config(group='totp', secret_cache_time=300)
+        creds = self._make_credentials('totp')
+        secret = creds[-1]['blob']
+
+        self.useFixture(fixture.TimeFixture())
+        auth_data = self._make_auth_data_by_id(
+            totp._generate_totp_passcode(secret))
+
+        with mock.patch.object(
+                self.credential_api, 'list_credentials_for_user',
+                wraps=self.credential_api.list_credentials_for_user
+        ) as list_credentials:
+            self.v3_create_token(auth_data,
+                                 expected_status=http_client.CREATED)
+            self.v3_create_token(auth_data,
+                                 expected_status=http_client.CREATED)
+            self.assertEqual(1, list_credentials.call_count)
+
+        self.delete('/credentials/%s' % creds[-1]['id'],
+                    expected_status=http_client.NO_CONTENT)
+        self.v3_create_token(auth_data,
+                             expected_status=http_client.UNAUTHORIZED)
+
+    def test_passcodes_not_kept_without_secret_cache(self):
+        self.useFixture(fixtures.MockPatchObject(
+            totp, '_PASSCODES', collections.OrderedDict()))
+        secret = self._make_credentials('totp')[-1]['blob']
+        auth_data = self._make_auth_data_by_id(
+            totp._generate_totp_passcode(secret))
+
+        self.v3_create_token(auth_data, expected_status=http_client.CREATED)
+        self.assertEqual({}, dict(totp._PASSCODES))
+
+    def test_kept_passcodes_follow_secret_changes(self):
+        self.config_fixture.config(group='totp', secret_cache_time=300)
+        self.useFixture(fixtures.MockPatchObject(
+            totp, '_PASSCODES', collections.OrderedDict()))
+        credential = self._make_credentials('totp')[-1]
+        self.useFixture(fixture.TimeFixture())
+        old_auth_data = self._make_auth_data_by_id(
+            totp._generate_totp_passcode(credential['blob']))
+        self.v3_create_token(old_auth_data,
+                             expected_status=http_client.CREATED)
+        self.assertEqual([credential['id']],
+                         [key[0] for key in totp._PASSCODES])
+
+        new_secret = unit.new_totp_credential(credential['user_id'])['blob']
+        self.patch('/credentials/%s' % credential['id'],
+                   body={'credential': {'blob': new_secret}})
+        self.v3_create_token(
+            self._make_auth_data_by_id(
+                totp._generate_totp_passcode(new_secret)),
+            expected_status=http_client.CREATED)
+        self.v3_create_token(old_auth_data,
+                             expected_status=http_client.UNAUTHORIZED)
+
 
 class TestFetchRevocationList(object):
     """Test fetch token revocation list on the v3 Identity API."""
@@ -17,6 +17,7 @@ import json
 import uuid
 
 from keystoneclient.contrib.ec2 import utils as ec2_utils
+import mock
 from six.moves import http_client
 from testtools import matchers
 
@@ -451,6 +452,7 @@ class TestCredentialEc2(CredentialBaseTestCase):
             body={'ec2Credentials': sig_ref},
             expected_status=http_client.OK)
         self.assertValidTokenResponse(r)
+        return r
 
     def test_ec2_credential_signature_validate(self):
         """Test signature validation with a v3 ec2 credential."""
@@ -475,6 +477,34 @@ class TestCredentialEc2(CredentialBaseTestCase):
         self._validate_signature(access=cred_blob['access'],
                                  secret=cred_blob['secret'])
 
+    def test_ec2_credential_is_kept_in_memory(self):
+        self.config_fixture.config(group='ec2', credential_cache_time=60)
+        ec2_cred = self._get_ec2_cred()
+        with mock.patch.object(
+                self.credential_api.driver, 'get_credential',
+                wraps=self.credential_api.driver.get_credential
+        ) as get_credential:
+            for i in range(2):
+                self._validate_signature(access=ec2_cred['access'],
+                                         secret=ec2_cred['secret'])
+            self.assertEqual(1, get_credential.call_count)
+
+    def test_ec2_token_is_reused(self):
+        self.config_fixture.config(group='ec2', token_cache_time=60)
+        ec2_cred = self._get_ec2_cred()
+        r = self._validate_signature(access=ec2_cred['access'],
+                                     secret=ec2_cred['secret'])
+        token_id = r.headers['X-Subject-Token']
+        r = self._validate_signature(access=ec2_cred['access'],
+                                     secret=ec2_cred['secret'])
+        self.assertEqual(token_id, r.headers['X-Subject-Token'])
+
+        # A revoked token is not handed out again.
+        self.delete('/auth/tokens', headers={'X-Subject-Token': token_id})
+        r = self._validate_signature(access=ec2_cred['access'],
+                                     secret=ec2_cred['secret'])
+        self.assertNotEqual(token_id, r.headers['X-Subject-Token'])
+
     def _get_ec2_cred_uri(self):
         return '/users/%s/credentials/OS-EC2' % self.user_id
 
@@ -17,6 +17,7 @@ import datetime
 
 import freezegun
 from oslo_serialization import jsonutils
+from six.moves import http_client
 from six.moves import range
 
 import keystone.conf
@@ -428,6 +429,67 @@ class IdentityTestListLimitCase(IdentityTestFilteredCase):
         """
         self._test_entity_list_limit('policy', 'policy')
 
+    def _test_entity_pagination(self, entity):
+        """GET /<entities>?limit=<n> (paginated).
+
+        Test Plan:
+
+        - For the specified type of entity:
+            - Update policy for no protection on api
+            - Fetch all the entities, a page of 3 at a time, by following the
+              next links
+            - Check that each entity is returned exactly once, in ID order
+
+        """
+        if entity == 'policy':
+            plural = 'policies'
+        else:
+            plural = '%ss' % entity
+
+        self._set_policy({"identity:list_%s" % plural: []})
+        r = self.get('/%s' % plural, auth=self.auth)
+        expected_ids = sorted(ref['id'] for ref in r.result.get(plural))
+
+        ids = []
+        url = '/%s?limit=3' % plural
+        while url:
+            r = self.get(url, auth=self.auth)
+            page = r.result.get(plural)
+            self.assertLessEqual(len(page), 3)
+            ids.extend(ref['id'] for ref in page)
+            next_url = r.result['links']['next']
+            url = next_url and next_url.split('/v3', 1)[1]
+        self.assertEqual(expected_ids, ids)
+
+    def test_users_pagination(self):
+        self._test_entity_pagination('user')
+
+    def test_groups_pagination(self):
+        self._test_entity_pagination('group')
+
+    def test_projects_pagination(self):
+        self._test_entity_pagination('project')
+
+    def test_non_driver_pagination(self):
+        self._test_entity_pagination('policy')
+
+    def test_pagination_limit_below_list_limit(self):
+        self._set_policy({"identity:list_services": []})
+        self.config_fixture.config(list_limit=5)
+        r = self.get('/services?limit=2', auth=self.auth)
+        self.assertEqual(2, len(r.result.get('services')))
+        self.assertIs(r.result.get('truncated'), True)
+
+        r = self.get('/services?limit=8', auth=self.auth)
+        self.assertEqual(5, len(r.result.get('services')))
+
+    def test_pagination_invalid_limit(self):
+        self._set_policy({"identity:list_services": []})
+        self.get('/services?limit=0', auth=self.auth,
+                 expected_status=http_client.BAD_REQUEST)
+        self.get('/services?limit=x', auth=self.auth,
+                 expected_status=http_client.BAD_REQUEST)
+
     def test_no_limit(self):
         """Check truncated attribute not set when list not limited."""
         self._set_policy({"identity:list_services": []})
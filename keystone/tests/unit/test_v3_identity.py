@@ -312,6 +312,19 @@ class IdentityTestCase(test_v3.RestfulTestCase):
         self.assertValidUserListResponse(r, ref=user,
                                          resource_url=resource_url)
 
+    def test_list_users_streamed(self):
+        """Call ``GET & HEAD /users`` with streamed responses."""
+        self.config_fixture.config(response_streaming=True)
+        user = unit.new_user_ref(self.domain_id)
+        user = self.identity_api.create_user(user)
+        resource_url = '/users?domain_id=%(domain_id)s' % {
+            'domain_id': self.domain_id}
+        r = self.get(resource_url)
+        self.assertIsNone(r.headers.get('Content-Length'))
+        self.assertValidUserListResponse(r, ref=user,
+                                         resource_url=resource_url)
+        self.head(resource_url, expected_status=http_client.OK)
+
     def test_get_head_user(self):
         """Call ``GET & HEAD /users/{user_id}``."""
         resource_url = '/users/%(user_id)s' % {
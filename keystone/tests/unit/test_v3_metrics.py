@@ -0,0 +1,55 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from six.moves import http_client
+
+from keystone.common import metrics
+from keystone.tests import unit
+from keystone.tests.unit import test_v3
+
+
+class MetricsTestCase(test_v3.RestfulTestCase, test_v3.JsonHomeTestMixin):
+
+    JSON_HOME_DATA = {
+        'http://docs.openstack.org/api/openstack-identity/3/rel/metrics': {
+            'href': '/metrics',
+        },
+    }
+
+    def config_overrides(self):
+        super(MetricsTestCase, self).config_overrides()
+        self.config_fixture.config(group='metrics', enabled=True)
+
+    def setUp(self):
+        super(MetricsTestCase, self).setUp()
+        self.addCleanup(metrics.reset)
+
+    def test_get_metrics(self):
+        self.get('/projects/%s' % self.project_id)
+        r = self.get('/metrics', response_content_type='text/plain')
+        body = r.result.decode('utf-8')
+        self.assertIn('# TYPE keystone_manager_call_seconds histogram', body)
+        self.assertIn(
+            'method="keystone.resource.core.Manager.get_project"', body)
+        self.assertIn('# TYPE keystone_sql_session_seconds histogram', body)
+
+    def test_get_metrics_requires_admin(self):
+        user = unit.create_user(self.identity_api, domain_id=self.domain_id)
+        role = unit.new_role_ref()
+        self.role_api.create_role(role['id'], role)
+        self.assignment_api.create_grant(role['id'], user_id=user['id'],
+                                         project_id=self.project_id)
+        token = self.get_requested_token(self.build_authentication_request(
+            user_id=user['id'], password=user['password'],
+            project_id=self.project_id))
+        self.get('/metrics', token=token,
+                 expected_status=http_client.FORBIDDEN)
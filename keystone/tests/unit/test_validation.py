@@ -13,6 +13,8 @@
 
 import uuid
 
+import fixtures
+import mock
 import six
 
 from keystone.assignment import schema as assignment_schema
@@ -2126,3 +2128,118 @@ class PasswordValidationTestCase(unit.TestCase):
         self.config_fixture.config(group='security_compliance',
                                    password_regex='[\S]+')
         validators.validate_password(password)
+
+
+class LazyValidateTestCase(unit.TestCase):
+
+    def test_validator_is_reused_for_a_schema(self):
+        self.useFixture(fixtures.MockPatchObject(
+            validation, '_SCHEMA_VALIDATORS', {}))
+        with mock.patch.object(validators, 'SchemaValidator',
+                               wraps=validators.SchemaValidator) as m:
+            validation.lazy_validate(entity_create, {'name': 'a'})
+            validation.lazy_validate(entity_create, {'name': 'b'})
+            self.assertRaises(exception.SchemaValidationError,
+                              validation.lazy_validate,
+                              entity_create, {'name': 'a' * 256})
+            self.assertEqual(1, m.call_count)
+
+    def test_fast_validator_is_used_when_configured(self):
+        self.config_fixture.config(json_schema_validator='fastjsonschema')
+        fast_validate = mock.Mock()
+        fastjsonschema = mock.Mock(JsonSchemaException=ValueError)
+        fastjsonschema.compile.return_value = fast_validate
+        schema_validator = validators.SchemaValidator(entity_create)
+
+        with mock.patch.object(validators, 'fastjsonschema', fastjsonschema):
+            schema_validator.validate({'name': 'a'})
+            fast_validate.assert_called_once_with({'name': 'a'})
+
+            # When it rejects a body, jsonschema provides the error.
+            fast_validate.side_effect = ValueError()
+            self.assertRaises(exception.SchemaValidationError,
+                              schema_validator.validate, {'name': 'a' * 256})
+            # And has the final say on whether the body is valid.
+            schema_validator.validate({'name': 'b'})
+        self.assertEqual(1, fastjsonschema.compile.call_count)
+
+
+class FastValidatorTestCase(unit.TestCase):
+    """Check that fastjsonschema accepts no more than jsonschema does."""
+
+    SCHEMA_MODULES = (assignment_schema, catalog_schema, credential_schema,
+                      federation_schema, identity_schema, oauth1_schema,
+                      policy_schema, resource_schema, trust_schema)
+
+    VALUES = (None, True, False, 0, -1, 1.5, 2 ** 64, '', ' ', 'a' * 256,
+              u'☃', 'http://localhost/v3', 'not a url', '127.0.0.1',
+              '::1', 'user@example.com', '2016-01-01T00:00:00Z',
+              '2016-01-01', '12:00:00', '[', [], ['a'], [{}], [1, 1], {},
+              {'id': uuid.uuid4().hex}, {'name': 'a'})
+
+    def setUp(self):
+        super(FastValidatorTestCase, self).setUp()
+        if validators.fastjsonschema is None:
+            self.skipTest('fastjsonschema is not installed')
+        self.config_fixture.config(json_schema_validator='fastjsonschema')
+
+    def _schemas(self):
+        for module in self.SCHEMA_MODULES:
+            for name, value in sorted(vars(module).items()):
+                if isinstance(value, dict) and value.get('type') == 'object':
+                    yield '%s.%s' % (module.__name__, name), value
+
+    def _bodies(self, schema):
+        """Build bodies differing from a valid one by a single property."""
+        properties = schema.get('properties', {})
+        accepted = {}
+        for name, property_schema in properties.items():
+            validator = validators.SchemaValidator.validator_cls(
+                property_schema,
+                format_checker=validators.SchemaValidator.format_checker)
+            for value in self.VALUES:
+                if validator.is_valid(value):
+                    accepted[name] = value
+                    break
+        base = dict((name, accepted[name])
+                    for name in schema.get('required', [])
+                    if name in accepted)
+
+        yield base
+        yield dict(base, **{uuid.uuid4().hex: 'a'})
+        for name in properties:
+            for value in self.VALUES:
+                body = dict(base)
+                body[name] = value
+                yield body
+
+    def test_fast_validator_agrees_with_jsonschema(self):
+        for name, schema in self._schemas():
+            schema_validator = validators.SchemaValidator(schema)
+            fast_validator = schema_validator._get_fast_validator()
+            self.assertIsNotNone(fast_validator, name)
+            for body in self._bodies(schema):
+                try:
+                    fast_validator(body)
+                except validators.fastjsonschema.JsonSchemaException:
+                    continue
+                self.assertTrue(schema_validator.validator.is_valid(body),
+                                '%s accepted by fastjsonschema: %r' %
+                                (name, body))
+
+    def test_fast_validator_checks_formats_as_jsonschema_does(self):
+        values = ('a', '-a', 'a_b', '(', '1.2.3', '256.1.1.1', '127.0.0.1',
+                  '1::1::1', '::1', '25:00:00', '12:00:00', '2016-02-30',
+                  '2016-01-01', 'user@example.com')
+        for format_name in validators.SchemaValidator.format_checker.checkers:
+            schema_validator = validators.SchemaValidator(
+                {'type': 'string', 'format': format_name})
+            fast_validator = schema_validator._get_fast_validator()
+            for value in values:
+                try:
+                    fast_validator(value)
+                except validators.fastjsonschema.JsonSchemaException:
+                    continue
+                self.assertTrue(schema_validator.validator.is_valid(value),
+                                '%r accepted by fastjsonschema as %s' %
+                                (value, format_name))
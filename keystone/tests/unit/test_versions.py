@@ -181,6 +181,8 @@ FEDERATED_IDP_SPECIFIC_WEBSSO = ('/auth/OS-FEDERATION/identity_providers/'
 V3_JSON_HOME_RESOURCES = {
     json_home.build_v3_resource_relation('auth_tokens'): {
         'href': '/auth/tokens'},
+    json_home.build_v3_resource_relation('auth_tokens_validate'): {
+        'href': '/auth/tokens/validate'},
     json_home.build_v3_resource_relation('auth_catalog'): {
         'href': '/auth/catalog'},
     json_home.build_v3_resource_relation('auth_projects'): {
@@ -280,6 +282,7 @@ V3_JSON_HOME_RESOURCES = {
         'href-template': '/groups/{group_id}/users',
         'href-vars': {'group_id': json_home.Parameters.GROUP_ID, }},
     json_home.build_v3_resource_relation('groups'): {'href': '/groups'},
+    json_home.build_v3_resource_relation('metrics'): {'href': '/metrics'},
     json_home.build_v3_resource_relation('policies'): {
         'href': '/policies'},
     json_home.build_v3_resource_relation('policy'): {
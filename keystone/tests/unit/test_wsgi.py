@@ -186,6 +186,35 @@ class ApplicationTest(BaseWSGITest):
         self.assertNotEqual('0', resp.headers.get('Content-Length'))
         self.assertEqual('application/json', resp.headers.get('Content-Type'))
 
+    def test_render_response_streamed(self):
+        users = [{'id': uuid.uuid4().hex} for i in range(250)]
+        links = {'self': 'http://localhost/v3/users'}
+
+        resp = wsgi.render_response(
+            body={'users': (user for user in users), 'links': links})
+        self.assertEqual(http_client.OK, resp.status_int)
+        self.assertIsNone(resp.headers.get('Content-Length'))
+        self.assertEqual('application/json', resp.headers.get('Content-Type'))
+        self.assertEqual(
+            jsonutils.dump_as_bytes({'users': users, 'links': links}),
+            resp.body)
+
+    def test_render_response_streamed_head(self):
+        read = []
+
+        def users():
+            read.append(True)
+            yield {'id': uuid.uuid4().hex}
+
+        resp = wsgi.render_response(body={'users': users(), 'links': {}},
+                                    method='HEAD')
+        self.assertEqual(http_client.OK, resp.status_int)
+        self.assertEqual(b'', resp.body)
+        self.assertIsNone(resp.headers.get('Content-Length'))
+        self.assertEqual('application/json', resp.headers.get('Content-Type'))
+        # The collection was never read.
+        self.assertEqual([], read)
+
     def test_application_local_config(self):
         class FakeApp(wsgi.Application):
             def __init__(self, *args, **kwargs):
@@ -16,6 +16,8 @@ import hashlib
 import os
 import uuid
 
+import freezegun
+import mock
 import msgpack
 from oslo_utils import timeutils
 from six.moves import urllib
@@ -217,6 +219,64 @@ class TestValidate(unit.TestCase):
         }
         self.assertEqual(exp_trust_info, token['OS-TRUST:trust'])
 
+    def test_validate_v3_token_validation_cache(self):
+        self.config_fixture.config(group='token', validation_cache_time=60)
+        user_ref = unit.new_user_ref(CONF.identity.default_domain_id)
+        user_ref = self.identity_api.create_user(user_ref)
+        time = datetime.datetime.utcnow().replace(microsecond=0)
+        with freezegun.freeze_time(time) as frozen_datetime:
+            token_id, token_data_ = self.token_provider_api.issue_v3_token(
+                user_ref['id'], ['password'])
+            self.revoke_api.revoke_by_user(user_id=uuid.uuid4().hex)
+
+            with mock.patch.object(
+                    self.token_provider_api, 'validate_non_persistent_token',
+                    wraps=self.token_provider_api.validate_non_persistent_token
+            ) as validate:
+                token_data = self.token_provider_api.validate_v3_token(
+                    token_id)
+                self.assertEqual(
+                    token_data,
+                    self.token_provider_api.validate_v3_token(token_id))
+                self.assertEqual(1, validate.call_count)
+
+                # The events recorded since the token was validated are
+                # checked.
+                frozen_datetime.tick(delta=datetime.timedelta(seconds=1))
+                self.revoke_api.revoke_by_user(user_id=user_ref['id'])
+                self.assertRaises(exception.TokenNotFound,
+                                  self.token_provider_api.validate_v3_token,
+                                  token_id)
+                self.assertEqual(1, validate.call_count)
+
+    def test_validate_v3_token_validation_cache_domain_disabled(self):
+        self.config_fixture.config(group='token', validation_cache_time=60)
+        domain_ref = unit.new_domain_ref()
+        self.resource_api.create_domain(domain_ref['id'], domain_ref)
+        user_ref = self.identity_api.create_user(
+            unit.new_user_ref(domain_ref['id']))
+        token_id, token_data_ = self.token_provider_api.issue_v3_token(
+            user_ref['id'], ['password'])
+        self.token_provider_api.validate_v3_token(token_id)
+
+        domain_ref['enabled'] = False
+        self.resource_api.update_domain(domain_ref['id'], domain_ref)
+        self.assertRaises(exception.TokenNotFound,
+                          self.token_provider_api.validate_v3_token,
+                          token_id)
+
+    def test_validate_v3_token_validation_cache_copies(self):
+        self.config_fixture.config(group='token', validation_cache_time=60)
+        user_ref = unit.new_user_ref(CONF.identity.default_domain_id)
+        user_ref = self.identity_api.create_user(user_ref)
+        token_id, token_data_ = self.token_provider_api.issue_v3_token(
+            user_ref['id'], ['password'])
+        token_data = self.token_provider_api.validate_v3_token(token_id)
+        del token_data['token']['user']
+        self.assertIn('user',
+                      self.token_provider_api.validate_v3_token(
+                          token_id)['token'])
+
     def test_validate_v3_token_validation_error_exc(self):
         # When the token format isn't recognized, TokenNotFound is raised.
 
@@ -28,3 +28,30 @@ class TestRandomStrings(unit.BaseTestCase):
 
         b = provider.random_urlsafe_str_to_bytes(s)
         self.assertIsInstance(b, six.binary_type)
+
+
+class TestMinimalTokenData(unit.BaseTestCase):
+    def test_minimal_token_data(self):
+        token_data = {'token': {
+            'methods': ['password'],
+            'user': {'id': 'u', 'name': 'user',
+                     'domain': {'id': 'd', 'name': 'domain'}},
+            'project': {'id': 'p', 'name': 'project',
+                        'domain': {'id': 'd', 'name': 'domain'}},
+            'is_domain': False,
+            'roles': [{'id': 'r', 'name': 'role'}],
+            'catalog': [],
+            'service_providers': [],
+            'audit_ids': ['a'],
+            'expires_at': '2016-01-01T00:00:00.000000Z',
+            'issued_at': '2015-12-31T23:00:00.000000Z'}}
+        self.assertEqual({'token': {
+            'methods': ['password'],
+            'user': {'id': 'u', 'domain': {'id': 'd'}},
+            'project': {'id': 'p', 'domain': {'id': 'd'}},
+            'is_domain': False,
+            'roles': [{'id': 'r', 'name': 'role'}],
+            'audit_ids': ['a'],
+            'expires_at': '2016-01-01T00:00:00.000000Z',
+            'issued_at': '2015-12-31T23:00:00.000000Z'}},
+            provider.minimal_token_data(token_data))
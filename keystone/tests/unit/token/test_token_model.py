@@ -13,9 +13,11 @@
 import copy
 import uuid
 
+import mock
 from oslo_utils import timeutils
 from six.moves import range
 
+from keystone.common import utils
 import keystone.conf
 from keystone import exception
 from keystone.federation import constants as federation_constants
@@ -243,6 +245,22 @@ class TestKeystoneTokenModel(core.TestCase):
         self.assertIsNone(token_data.audit_id)
         self.assertIsNone(token_data.audit_chain_id)
 
+    def test_token_model_times_are_parsed_once(self):
+        token_data = token_model.KeystoneToken(uuid.uuid4().hex,
+                                               self.v3_sample_token)
+        with mock.patch.object(token_model, '_parse_and_normalize_time',
+                               wraps=token_model._parse_and_normalize_time
+                               ) as parse:
+            expires = token_data.expires
+            self.assertEqual(expires, token_data.expires)
+            self.assertEqual(1, parse.call_count)
+
+            # Replacing a top level value resets the parsed times.
+            new_expires = timeutils.utcnow().replace(microsecond=0)
+            token_data['expires_at'] = utils.isotime(new_expires)
+            self.assertEqual(new_expires, token_data.expires)
+            self.assertEqual(2, parse.call_count)
+
     def test_token_model_unknown(self):
         self.assertRaises(exception.UnsupportedTokenVersionException,
                           token_model.KeystoneToken,
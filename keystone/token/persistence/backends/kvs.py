@@ -16,6 +16,7 @@
 from __future__ import absolute_import
 import copy
 import threading
+import zlib
 
 from oslo_log import log
 from oslo_utils import timeutils
@@ -46,6 +47,10 @@ class Token(token.persistence.TokenDriverBase):
 
     revocation_key = 'revocation-list'
     kvs_backend = 'openstack.kvs.Memory'
+    # The index of the tokens of each user is split across this many keys,
+    # chosen by token ID, so that tokens issued to the same user concurrently
+    # rarely wait for the same lock, and each key stays short.
+    user_index_shards = 16
 
     def __init__(self, backing_store=None, **kwargs):
         super(Token, self).__init__()
@@ -76,6 +81,18 @@ class Token(token.persistence.TokenDriverBase):
             user_id = user_id.encode('utf-8')
         return 'usertokens-%s' % user_id
 
+    def _user_index_keys(self, user_key):
+        # NOTE: The unsharded index written by earlier releases is still read
+        # until the tokens in it expire.
+        return [user_key] + ['%s-%d' % (user_key, shard)
+                             for shard in range(self.user_index_shards)]
+
+    def _user_index_shard_key(self, user_key, token_id):
+        if isinstance(token_id, six.text_type):
+            token_id = token_id.encode('utf-8')
+        shard = (zlib.crc32(token_id) & 0xffffffff) % self.user_index_shards
+        return '%s-%d' % (user_key, shard)
+
     def _get_key_or_default(self, key, default=None):
         try:
             return self._store.get(key)
@@ -119,10 +136,12 @@ class Token(token.persistence.TokenDriverBase):
         # built.
         expires_str = utils.isotime(data_copy['expires'], subsecond=True)
 
-        self._set_key(ptk, data_copy)
         user_id = data['user']['id']
         user_key = self._prefix_user_id(user_id)
-        self._update_user_token_list(user_key, token_id, expires_str)
+        # NOTE: The token is written along with the user's index, in a single
+        # call to the backend.
+        self._update_user_token_list(user_key, token_id, expires_str,
+                                     {ptk: data_copy})
         if CONF.trust.enabled and data.get('trust_id'):
             # NOTE(morganfainberg): If trusts are enabled and this is a trust
             # scoped token, we add the token to the trustee list as well.  This
@@ -150,10 +169,17 @@ class Token(token.persistence.TokenDriverBase):
     def _get_user_token_list_with_expiry(self, user_key):
         """Return user token list with token expiry.
 
+        The shards of the user's index are read in a single call.
+
         :return: the tuples in the format (token_id, token_expiry)
         :rtype: list
         """
-        return self._get_key_or_default(user_key, default=[])
+        token_list = []
+        for shard in self._store.get_multi_or_default(
+                self._user_index_keys(user_key), default=[]):
+            if isinstance(shard, list):
+                token_list.extend(shard)
+        return token_list
 
     def _get_user_token_list(self, user_key):
         """Return a list of token_ids for the user_key."""
@@ -163,14 +189,28 @@ class Token(token.persistence.TokenDriverBase):
         # list of token_ids are returned.
         return [t[0] for t in token_list]
 
-    def _update_user_token_list(self, user_key, token_id, expires_isotime_str):
+    def _update_user_token_list(self, user_key, token_id, expires_isotime_str,
+                                mapping=None):
+        """Add a token to the shard of the user's index it belongs to.
+
+        The shard and the revocation list are read in a single call, and the
+        shard is written along with any other values in `mapping` in another
+        one, while holding the lock of the shard only.
+
+        """
         current_time = self._get_current_time()
-        revoked_token_list = set([t['id'] for t in
-                                  self.list_revoked_tokens()])
+        shard_key = self._user_index_shard_key(user_key, token_id)
+
+        with self._store.get_lock(shard_key) as lock:
+            token_list, revoked_list = self._store.get_multi_or_default(
+                [shard_key, self.revocation_key], default=[])
+            if not isinstance(token_list, list):
+                token_list = []
+            if not isinstance(revoked_list, list):
+                revoked_list = []
+            revoked_token_list = set([t['id'] for t in revoked_list])
 
-        with self._store.get_lock(user_key) as lock:
             filtered_list = []
-            token_list = self._get_user_token_list_with_expiry(user_key)
             for item in token_list:
                 try:
                     item_id, expires = self._format_token_index_item(item)
@@ -195,7 +235,14 @@ class Token(token.persistence.TokenDriverBase):
                     continue
                 filtered_list.append(item)
             filtered_list.append((token_id, expires_isotime_str))
-            self._set_key(user_key, filtered_list, lock)
+
+            mapping = dict(mapping or {})
+            mapping[shard_key] = filtered_list
+            # NOTE: set_multi doesn't check the lock, so check it here like
+            # set does.
+            if lock.expired:
+                raise kvs.LockTimeout(target=shard_key)
+            self._store.set_multi(mapping)
             return filtered_list
 
     def _get_current_time(self):
@@ -335,6 +382,8 @@ class Token(token.persistence.TokenDriverBase):
         user_key = self._prefix_user_id(user_id)
         token_list = self._get_user_token_list_with_expiry(user_key)
         current_time = self._get_current_time()
+        token_ids = []
+        seen = set()
         for item in token_list:
             try:
                 token_id, expires = self._format_token_index_item(item)
@@ -343,14 +392,15 @@ class Token(token.persistence.TokenDriverBase):
                 # from the `_format_token_index_item` method.
                 continue
 
-            if expires < current_time:
+            if expires < current_time or token_id in seen:
                 continue
+            seen.add(token_id)
+            token_ids.append(token_id)
 
-            try:
-                token_ref = self.get_token(token_id)
-            except exception.TokenNotFound:  # nosec(tkelsey)
-                # NOTE(morganfainberg): Token doesn't exist, skip it.
-                continue
+        # NOTE: Tokens which don't exist anymore are skipped.
+        token_refs = self._store.get_multi_or_default(
+            [self._prefix_token_id(token_id) for token_id in token_ids])
+        for token_id, token_ref in zip(token_ids, token_refs):
             if token_ref:
                 if tenant_id is not None:
                     if not self._token_match_tenant(token_ref, tenant_id):
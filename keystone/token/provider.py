@@ -16,20 +16,25 @@
 
 import abc
 import base64
+import collections
 import copy
 import datetime
 import sys
+import threading
+import time
 import uuid
 
 from oslo_log import log
 from oslo_utils import timeutils
 import six
 
+from keystone import assignment
 from keystone.common import cache
 from keystone.common import dependency
 from keystone.common import manager
 import keystone.conf
 from keystone import exception
+from keystone.federation import constants as federation_constants
 from keystone.i18n import _, _LE
 from keystone.models import token_model
 from keystone import notifications
@@ -46,6 +51,14 @@ MEMOIZE_TOKENS = cache.get_memoization_decorator(
     group='token',
     region=TOKENS_REGION)
 
+# The maximum number of validated tokens kept in memory by each manager.
+_VALIDATED_SIZE = 10000
+
+# The attributes of v3 token data kept as they are by minimal_token_data().
+_MINIMAL_TOKEN_KEYS = ('methods', 'roles', 'expires_at', 'issued_at',
+                       'audit_ids', 'is_domain', 'is_admin_project', 'bind',
+                       'OS-TRUST:trust', 'OS-OAUTH1')
+
 # NOTE(morganfainberg): This is for compatibility in case someone was relying
 # on the old location of the UnsupportedTokenVersionException for their code.
 UnsupportedTokenVersionException = exception.UnsupportedTokenVersionException
@@ -56,6 +69,18 @@ V3 = token_model.V3
 VERSIONS = token_model.VERSIONS
 
 
+def scope_cache_enabled():
+    """Whether the scope, user and roles of tokens are cached.
+
+    They are cached in the computed assignments region, so like the role
+    assignments it memoizes, only if `[cache] enabled` and `[role] caching`
+    are set, in addition to `[token] scope_cache_time`.
+
+    """
+    return bool(CONF.token.scope_cache_time and CONF.cache.enabled and
+                CONF.role.caching)
+
+
 def base64_encode(s):
     """Encode a URL-safe string.
 
@@ -126,6 +151,36 @@ def audit_info(parent_audit_id):
     return [audit_id]
 
 
+def minimal_token_data(token_data):
+    """Return the minimal view of v3 token data.
+
+    The minimal view only has the IDs of the user, of the scope and of their
+    domains, the roles, the dates and what's needed to check delegation and
+    revocation. It has no names, catalog or service providers.
+
+    """
+    token = token_data['token']
+    minimal = dict((key, token[key]) for key in _MINIMAL_TOKEN_KEYS
+                   if key in token)
+
+    user = token['user']
+    minimal['user'] = {'id': user['id'],
+                       'domain': {'id': user['domain']['id']}}
+    if federation_constants.FEDERATION in user:
+        minimal['user'][federation_constants.FEDERATION] = (
+            user[federation_constants.FEDERATION])
+
+    if 'project' in token:
+        project = token['project']
+        minimal['project'] = {'id': project['id'], 'domain': None}
+        # Projects acting as a domain do not have a domain.
+        if project['domain']:
+            minimal['project']['domain'] = {'id': project['domain']['id']}
+    if 'domain' in token:
+        minimal['domain'] = {'id': token['domain']['id']}
+    return {'token': minimal}
+
+
 @dependency.provider('token_provider_api')
 @dependency.requires('assignment_api', 'revoke_api')
 class Manager(manager.Manager):
@@ -148,6 +203,10 @@ class Manager(manager.Manager):
     def __init__(self):
         super(Manager, self).__init__(CONF.token.provider)
         self._register_callback_listeners()
+        # Non-persistent tokens validated recently, with the revocation epoch
+        # they were last checked against, see _validate_non_persistent().
+        self._validated = collections.OrderedDict()
+        self._validated_lock = threading.Lock()
 
     def _register_callback_listeners(self):
         # This is used by the @dependency.provider decorator to register the
@@ -178,6 +237,32 @@ class Manager(manager.Manager):
                 notifications.register_event_callback(event, resource_type,
                                                       callback_fns)
 
+        # NOTE: The token data helper caches the scope, user and roles of
+        # tokens in the computed assignments region, which is invalidated
+        # whenever role assignments change. Names and whether tokens may be
+        # revoked change along with users, projects, domains and roles. The
+        # region also holds the computed role assignments, so it is only
+        # invalidated when the scope is cached.
+        scope_callbacks = {
+            notifications.ACTIONS.deleted: ['role', 'user', 'project',
+                                            'domain'],
+            notifications.ACTIONS.disabled: ['user', 'project', 'domain'],
+            notifications.ACTIONS.updated: ['role', 'user', 'project',
+                                            'domain'],
+            notifications.ACTIONS.internal: [
+                notifications.INVALIDATE_USER_TOKEN_PERSISTENCE,
+                notifications.INVALIDATE_USER_PROJECT_TOKEN_PERSISTENCE],
+        }
+        for event, resource_types in scope_callbacks.items():
+            for resource_type in resource_types:
+                notifications.register_event_callback(
+                    event, resource_type, self._invalidate_scope_callback)
+
+    def _invalidate_scope_callback(self, service, resource_type, operation,
+                                   payload):
+        if scope_cache_enabled():
+            assignment.COMPUTED_ASSIGNMENTS_REGION.invalidate()
+
     @property
     def _needs_persistence(self):
         return self.driver.needs_persistence()
@@ -207,15 +292,71 @@ class Manager(manager.Manager):
             except exception.TokenNotFound:
                 six.reraise(*exc_info)
 
-    def validate_token(self, token_id):
+    def validate_token(self, token_id, minimal=False):
+        """Validate a v2 or v3 token.
+
+        :param minimal: whether to only return the minimal view of v3 token
+                        data, see minimal_token_data()
+
+        """
+        if token_id and not self._needs_persistence:
+            return self._validate_non_persistent(token_id, minimal)
         unique_id = utils.generate_unique_id(token_id)
         # NOTE(morganfainberg): Ensure we never use the long-form token_id
         # (PKI) as part of the cache_key.
         token = self._validate_token(unique_id)
         self._is_valid_token(token)
+        if minimal and self.get_token_version(token) == V3:
+            return minimal_token_data(token)
         return token
 
-    def check_revocation_v2(self, token):
+    def _validate_non_persistent(self, token_id, minimal=False):
+        """Validate a non-persistent token and check it isn't revoked.
+
+        If `[token] validation_cache_time` is set, the token is kept in memory
+        for that many seconds once validated, along with the revocation epoch
+        it was checked against. Validating it again then only checks it
+        against the revocation events recorded since. Each caller gets its own
+        copy of the kept token, which it may modify.
+
+        """
+        # NOTE: The arguments are also the cache key of the memoized
+        # validation, see invalidate_individual_token_cache().
+        key = (token_id, True) if minimal else (token_id,)
+        cache_time = CONF.token.validation_cache_time
+        if not cache_time:
+            token = self.validate_non_persistent_token(*key)
+            self._is_valid_token(token)
+            return token
+
+        now = time.time()
+        with self._validated_lock:
+            expires, token, epoch = self._validated.get(key, (0, None, None))
+        if expires <= now:
+            expires = now + cache_time
+            token = self.validate_non_persistent_token(*key)
+            epoch = None
+        try:
+            epoch = self._is_valid_token(token, revocation_epoch=epoch)
+        except exception.TokenNotFound:
+            self._forget_validated(token_id)
+            raise
+        with self._validated_lock:
+            self._validated.pop(key, None)
+            self._validated[key] = (expires, token, epoch)
+            while len(self._validated) > _VALIDATED_SIZE:
+                self._validated.popitem(last=False)
+        return copy.deepcopy(token)
+
+    def _forget_validated(self, token_id=None):
+        with self._validated_lock:
+            if token_id is None:
+                self._validated.clear()
+            else:
+                self._validated.pop((token_id,), None)
+                self._validated.pop((token_id, True), None)
+
+    def check_revocation_v2(self, token, revocation_epoch=None):
         try:
             token_data = token['access']
         except KeyError:
@@ -223,7 +364,7 @@ class Manager(manager.Manager):
 
         token_values = self.revoke_api.model.build_token_values_v2(
             token_data, CONF.identity.default_domain_id)
-        self.revoke_api.check_token(token_values)
+        return self.revoke_api.check_token(token_values, revocation_epoch)
 
     def validate_v2_token(self, token_id):
         # NOTE(lbragstad): Only go to the persistence backend if the token
@@ -244,29 +385,43 @@ class Manager(manager.Manager):
             # is one where the token providers just handle data and the
             # controller layers handle interpreting the token data in a format
             # that makes sense for the request.
-            v3_token_ref = self.validate_non_persistent_token(token_id)
+            v3_token_ref = self._validate_non_persistent(token_id)
             v2_token_data_helper = providers.common.V2TokenDataHelper()
-            token = v2_token_data_helper.v3_to_v2_token(v3_token_ref, token_id)
+            return v2_token_data_helper.v3_to_v2_token(v3_token_ref, token_id)
 
         self._is_valid_token(token)
         return token
 
-    def check_revocation_v3(self, token):
+    def check_revocation_v3(self, token, revocation_epoch=None):
         try:
             token_data = token['token']
         except KeyError:
             raise exception.TokenNotFound(_('Failed to validate token'))
         token_values = self.revoke_api.model.build_token_values(token_data)
-        self.revoke_api.check_token(token_values)
+        return self.revoke_api.check_token(token_values, revocation_epoch)
+
+    def check_revocation(self, token, revocation_epoch=None):
+        """Check a token hasn't been revoked.
+
+        :param revocation_epoch: the epoch returned when the token was last
+                                 checked, to only check it against the events
+                                 recorded since
+        :returns: the revocation epoch the token has been checked against
 
-    def check_revocation(self, token):
+        """
         version = self.get_token_version(token)
         if version == V2:
-            return self.check_revocation_v2(token)
+            return self.check_revocation_v2(token, revocation_epoch)
         else:
-            return self.check_revocation_v3(token)
+            return self.check_revocation_v3(token, revocation_epoch)
+
+    def validate_v3_token(self, token_id, minimal=False):
+        """Validate a token and return it as v3 token data.
+
+        :param minimal: whether to only return the minimal view of the token
+                        data, see minimal_token_data()
 
-    def validate_v3_token(self, token_id):
+        """
         if not token_id:
             raise exception.TokenNotFound(_('No token in the request'))
 
@@ -276,23 +431,56 @@ class Manager(manager.Manager):
             # Otherwise the information about the token must be in the token
             # id.
             if not self._needs_persistence:
-                token_ref = self.validate_non_persistent_token(token_id)
-            else:
-                unique_id = utils.generate_unique_id(token_id)
-                # NOTE(morganfainberg): Ensure we never use the long-form
-                # token_id (PKI) as part of the cache_key.
-                token_ref = self._persistence.get_token(unique_id)
-                token_ref = self._validate_v3_token(token_ref)
+                return self._validate_non_persistent(token_id, minimal)
+            unique_id = utils.generate_unique_id(token_id)
+            # NOTE(morganfainberg): Ensure we never use the long-form
+            # token_id (PKI) as part of the cache_key.
+            token_ref = self._persistence.get_token(unique_id)
+            token_ref = self._validate_v3_token(token_ref)
             self._is_valid_token(token_ref)
+            if minimal:
+                return minimal_token_data(token_ref)
             return token_ref
         except exception.Unauthorized as e:
             LOG.debug('Unable to validate token: %s', e)
             raise exception.TokenNotFound(token_id=token_id)
 
     @MEMOIZE_TOKENS
-    def validate_non_persistent_token(self, token_id):
+    def validate_non_persistent_token(self, token_id, minimal=False):
+        if minimal:
+            return minimal_token_data(
+                self.driver.validate_non_persistent_token(token_id,
+                                                          minimal=True))
         return self.driver.validate_non_persistent_token(token_id)
 
+    def validate_v3_tokens(self, token_ids, minimal=False):
+        """Validate several tokens at once.
+
+        Every token is checked against the same list of revocation events, and
+        a token appearing more than once is only validated once.
+
+        :param token_ids: the token IDs to validate
+        :param minimal: whether to only return the minimal view of the token
+                        data, see minimal_token_data()
+        :returns: a list with the token data of each token, in the same order,
+                  or the :class:`keystone.exception.Error` raised validating
+                  the tokens which aren't valid
+
+        """
+        results = {}
+        with self.revoke_api.snapshot():
+            for token_id in token_ids:
+                if token_id in results:
+                    continue
+                try:
+                    results[token_id] = self.validate_v3_token(token_id,
+                                                               minimal)
+                except exception.Error as e:
+                    # NOTE: One token failing to validate, for example because
+                    # its trustor is disabled, mustn't fail the whole batch.
+                    results[token_id] = e
+        return [results[token_id] for token_id in token_ids]
+
     @MEMOIZE_TOKENS
     def _validate_token(self, token_id):
         if not token_id:
@@ -322,8 +510,13 @@ class Manager(manager.Manager):
     def _validate_v3_token(self, token_id):
         return self.driver.validate_v3_token(token_id)
 
-    def _is_valid_token(self, token):
-        """Verify the token is valid format and has not expired."""
+    def _is_valid_token(self, token, revocation_epoch=None):
+        """Verify the token is valid format and has not expired.
+
+        :returns: the revocation epoch the token has been checked against, see
+                  check_revocation()
+
+        """
         current_time = timeutils.normalize_time(timeutils.utcnow())
 
         try:
@@ -342,9 +535,8 @@ class Manager(manager.Manager):
             raise exception.TokenNotFound(_('Failed to validate token'))
 
         if current_time < expiry:
-            self.check_revocation(token)
             # Token has not expired and has not been revoked.
-            return None
+            return self.check_revocation(token, revocation_epoch)
         else:
             raise exception.TokenNotFound(_('Failed to validate token'))
 
@@ -455,6 +647,8 @@ class Manager(manager.Manager):
         # tokens, but we include the invalidation in case this ever changes
         # in the future.
         self.validate_non_persistent_token.invalidate(self, token_id)
+        self.validate_non_persistent_token.invalidate(self, token_id, True)
+        self._forget_validated(token_id)
 
     def revoke_token(self, token_id, revoke_chain=False):
         token_ref = token_model.KeystoneToken(
@@ -487,6 +681,7 @@ class Manager(manager.Manager):
         if CONF.token.cache_on_issue:
             # NOTE(amakarov): preserving behavior
             TOKENS_REGION.invalidate()
+        self._forget_validated()
 
     def _delete_user_tokens_callback(self, service, resource_type, operation,
                                      payload):
@@ -496,6 +691,7 @@ class Manager(manager.Manager):
         if CONF.token.cache_on_issue:
             # NOTE(amakarov): preserving behavior
             TOKENS_REGION.invalidate()
+        self._forget_validated()
 
     def _delete_domain_tokens_callback(self, service, resource_type,
                                        operation, payload):
@@ -505,6 +701,7 @@ class Manager(manager.Manager):
         if CONF.token.cache_on_issue:
             # NOTE(amakarov): preserving behavior
             TOKENS_REGION.invalidate()
+        self._forget_validated()
 
     def _delete_user_project_tokens_callback(self, service, resource_type,
                                              operation, payload):
@@ -516,6 +713,7 @@ class Manager(manager.Manager):
         if CONF.token.cache_on_issue:
             # NOTE(amakarov): preserving behavior
             TOKENS_REGION.invalidate()
+        self._forget_validated()
 
     def _delete_project_tokens_callback(self, service, resource_type,
                                         operation, payload):
@@ -527,6 +725,7 @@ class Manager(manager.Manager):
         if CONF.token.cache_on_issue:
             # NOTE(amakarov): preserving behavior
             TOKENS_REGION.invalidate()
+        self._forget_validated()
 
     def _delete_user_oauth_consumer_tokens_callback(self, service,
                                                     resource_type, operation,
@@ -539,6 +738,7 @@ class Manager(manager.Manager):
         if CONF.token.cache_on_issue:
             # NOTE(amakarov): preserving behavior
             TOKENS_REGION.invalidate()
+        self._forget_validated()
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -630,11 +830,15 @@ class Provider(object):
         raise exception.NotImplemented()  # pragma: no cover
 
     @abc.abstractmethod
-    def validate_non_persistent_token(self, token_id):
+    def validate_non_persistent_token(self, token_id, minimal=False):
         """Validate a given non-persistent token id and return the token_data.
 
         :param token_id: the token id
         :type token_id: string
+        :param minimal: whether the caller only needs the attributes of the
+                        minimal view of the token data, so that the others
+                        may be left out
+        :type minimal: bool
         :returns: token data
         :raises keystone.exception.TokenNotFound: When the token is invalid
         """
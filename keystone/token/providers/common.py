@@ -12,11 +12,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import copy
+
 from oslo_log import log
 from oslo_serialization import jsonutils
 import six
 from six.moves.urllib import parse
 
+from keystone import assignment
 from keystone.common import controller as common_controller
 from keystone.common import dependency
 from keystone.common import utils
@@ -560,10 +563,81 @@ class V3TokenDataHelper(object):
             LOG.error(msg)
             raise exception.UnexpectedError(msg)
 
+    def _populate_minimal_scope(self, token_data, domain_id, project_id):
+        if 'domain' in token_data or 'project' in token_data:
+            return
+
+        if domain_id:
+            token_data['domain'] = {'id': domain_id}
+        if project_id:
+            project_ref = self.resource_api.get_project(project_id)
+            token_data['project'] = {'id': project_ref['id'], 'domain': None}
+            if project_ref['domain_id'] is not None:
+                token_data['project']['domain'] = {
+                    'id': project_ref['domain_id']}
+            token_data['is_domain'] = project_ref['is_domain']
+
+    def _populate_minimal_user(self, token_data, user_id, trust):
+        if 'user' in token_data or (CONF.trust.enabled and trust):
+            # The checks of the trust are made along with the user.
+            return self._populate_user(token_data, user_id, trust)
+
+        user_ref = self.identity_api.get_user(user_id)
+        token_data['user'] = {'id': user_ref['id'],
+                              'domain': {'id': user_ref['domain_id']}}
+
+    def _populate_scope_data(self, token_data, user_id, domain_id,
+                             project_id, trust, access_token, minimal):
+        """Populate the scope, user and roles of the token."""
+        # NOTE: Whether the project is the admin project depends on names.
+        if minimal and not (CONF.resource.admin_project_name and
+                            CONF.resource.admin_project_domain_name):
+            self._populate_minimal_scope(token_data, domain_id, project_id)
+        else:
+            self._populate_scope(token_data, domain_id, project_id)
+            if token_data.get('project'):
+                self._populate_is_admin_project(token_data)
+        if minimal:
+            self._populate_minimal_user(token_data, user_id, trust)
+        else:
+            self._populate_user(token_data, user_id, trust)
+        self._populate_roles(token_data, user_id, domain_id, project_id, trust,
+                             access_token)
+
+    def _get_scope_data(self, user_id, domain_id, project_id, minimal):
+        """Get the scope, user and roles of a token, from the cache if any.
+
+        They are cached for `[token] scope_cache_time` seconds in the computed
+        assignments region, which is invalidated whenever they may change,
+        see :func:`keystone.token.provider.scope_cache_enabled`.
+
+        """
+        def create():
+            scope_data = {}
+            self._populate_scope_data(scope_data, user_id, domain_id,
+                                      project_id, None, None, minimal)
+            return scope_data
+
+        key = 'token scope:%s:%s:%s:%s' % (user_id, domain_id, project_id,
+                                           minimal)
+        scope_data = assignment.COMPUTED_ASSIGNMENTS_REGION.get_or_create(
+            key, create, expiration_time=CONF.token.scope_cache_time)
+        # NOTE: The token data is changed once built, when removing the
+        # catalog for instance, so it must not share the cached objects.
+        return copy.deepcopy(scope_data)
+
     def get_token_data(self, user_id, method_names, domain_id=None,
                        project_id=None, expires=None, trust=None, token=None,
                        include_catalog=True, bind=None, access_token=None,
-                       issued_at=None, audit_info=None):
+                       issued_at=None, audit_info=None, minimal=False):
+        """Build the data of a v3 token.
+
+        :param minimal: whether to only populate the attributes kept by
+                        :func:`keystone.token.provider.minimal_token_data`,
+                        which spares looking up names, the catalog and the
+                        service providers
+
+        """
         token_data = {'methods': method_names}
 
         # We've probably already written these to the token
@@ -575,18 +649,21 @@ class V3TokenDataHelper(object):
         if bind:
             token_data['bind'] = bind
 
-        self._populate_scope(token_data, domain_id, project_id)
-        if token_data.get('project'):
-            self._populate_is_admin_project(token_data)
-        self._populate_user(token_data, user_id, trust)
-        self._populate_roles(token_data, user_id, domain_id, project_id, trust,
-                             access_token)
+        if (provider.scope_cache_enabled() and not token and not trust and
+                not access_token):
+            token_data.update(self._get_scope_data(user_id, domain_id,
+                                                   project_id, minimal))
+        else:
+            self._populate_scope_data(token_data, user_id, domain_id,
+                                      project_id, trust, access_token,
+                                      minimal)
         self._populate_audit_info(token_data, audit_info)
 
-        if include_catalog:
+        if include_catalog and not minimal:
             self._populate_service_catalog(token_data, user_id, domain_id,
                                            project_id, trust)
-        self._populate_service_providers(token_data)
+        if not minimal:
+            self._populate_service_providers(token_data)
         self._populate_token_dates(token_data, expires=expires,
                                    issued_at=issued_at)
         self._populate_oauth_section(token_data, access_token)
@@ -784,7 +861,7 @@ class BaseProvider(provider.Provider):
                 token_data, token_id)
         return token_data
 
-    def validate_non_persistent_token(self, token_id):
+    def validate_non_persistent_token(self, token_id, minimal=False):
         try:
             (user_id, methods, audit_ids, domain_id, project_id, trust_id,
                 federated_info, access_token_id, issued_at, expires_at) = (
@@ -824,7 +901,8 @@ class BaseProvider(provider.Provider):
             trust=trust_ref,
             token=token_dict,
             access_token=access_token,
-            audit_info=audit_ids)
+            audit_info=audit_ids,
+            minimal=minimal)
 
     def validate_v3_token(self, token_ref):
         # FIXME(gyee): performance or correctness? Should we return the
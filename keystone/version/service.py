@@ -29,6 +29,7 @@ from keystone.endpoint_policy import routers as endpoint_policy_routers
 from keystone.federation import routers as federation_routers
 from keystone.i18n import _LW
 from keystone.identity import routers as identity_routers
+from keystone.metrics import routers as metrics_routers
 from keystone.oauth1 import routers as oauth1_routers
 from keystone.policy import routers as policy_routers
 from keystone.resource import routers as resource_routers
@@ -142,6 +143,7 @@ def v3_app_factory(global_conf, **local_conf):
                        federation_routers,
                        oauth1_routers,
                        endpoint_policy_routers,
+                       metrics_routers,
                        # TODO(morganfainberg): Remove the simple_cert router
                        # when PKI and PKIZ tokens are removed.
                        simple_cert_ext]